@@ -1,10 +1,23 @@
 import os
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
 
 from facefusion.types import AppContext
 
+APP_CONTEXT : ContextVar[Optional[AppContext]] = ContextVar('app_context', default = None)
+
 
 def detect_app_context() -> AppContext:
+	app_context = APP_CONTEXT.get()
+
+	if app_context:
+		return app_context
+	return walk_app_context()
+
+
+def walk_app_context() -> AppContext:
 	frame = sys._getframe(1)
 
 	while frame:
@@ -14,3 +27,18 @@ def detect_app_context() -> AppContext:
 			return 'ui'
 		frame = frame.f_back
 	return 'cli'
+
+
+def set_app_context(app_context : AppContext) -> None:
+	APP_CONTEXT.set(app_context)
+
+
+@contextmanager
+def pin_app_context() -> Iterator[AppContext]:
+	app_context = detect_app_context()
+	app_context_token = APP_CONTEXT.set(app_context)
+
+	try:
+		yield app_context
+	finally:
+		APP_CONTEXT.reset(app_context_token)
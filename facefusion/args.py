@@ -46,19 +46,25 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('temp_path', args.get('temp_path'))
 	apply_state_item('jobs_path', args.get('jobs_path'))
 	apply_state_item('source_paths', args.get('source_paths'))
+	apply_state_item('source_face_profile', args.get('source_face_profile'))
 	apply_state_item('target_path', args.get('target_path'))
 	apply_state_item('output_path', args.get('output_path'))
 	# patterns
 	apply_state_item('source_pattern', args.get('source_pattern'))
+	apply_state_item('source_face_profile_pattern', args.get('source_face_profile_pattern'))
 	apply_state_item('target_pattern', args.get('target_pattern'))
 	apply_state_item('output_pattern', args.get('output_pattern'))
 	# face detector
 	apply_state_item('face_detector_model', args.get('face_detector_model'))
 	apply_state_item('face_detector_size', args.get('face_detector_size'))
 	apply_state_item('face_detector_angles', args.get('face_detector_angles'))
+	apply_state_item('face_detector_angle_mode', args.get('face_detector_angle_mode'))
 	apply_state_item('face_detector_score', args.get('face_detector_score'))
+	apply_state_item('face_detector_interval', args.get('face_detector_interval'))
+	apply_state_item('face_detector_proxy_size', args.get('face_detector_proxy_size'))
 	# face landmarker
 	apply_state_item('face_landmarker_model', args.get('face_landmarker_model'))
+	apply_state_item('face_landmarker_mode', args.get('face_landmarker_mode'))
 	apply_state_item('face_landmarker_score', args.get('face_landmarker_score'))
 	# face selector
 	apply_state_item('face_selector_mode', args.get('face_selector_mode'))
@@ -70,6 +76,8 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('reference_face_position', args.get('reference_face_position'))
 	apply_state_item('reference_face_distance', args.get('reference_face_distance'))
 	apply_state_item('reference_frame_number', args.get('reference_frame_number'))
+	apply_state_item('reference_face_cluster_path', args.get('reference_face_cluster_path'))
+	apply_state_item('reference_face_cluster_index', args.get('reference_face_cluster_index'))
 	# face masker
 	apply_state_item('face_occluder_model', args.get('face_occluder_model'))
 	apply_state_item('face_parser_model', args.get('face_parser_model'))
@@ -83,6 +91,8 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('trim_frame_end', args.get('trim_frame_end'))
 	apply_state_item('temp_frame_format', args.get('temp_frame_format'))
 	apply_state_item('keep_temp', args.get('keep_temp'))
+	apply_state_item('video_pipeline', args.get('video_pipeline'))
+	apply_state_item('face_track_cache', args.get('face_track_cache'))
 	# output creation
 	apply_state_item('output_image_quality', args.get('output_image_quality'))
 	if is_image(args.get('target_path')):
@@ -120,21 +130,34 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	# execution
 	apply_state_item('execution_device_id', args.get('execution_device_id'))
 	apply_state_item('execution_providers', args.get('execution_providers'))
+	apply_state_item('execution_backend', args.get('execution_backend'))
 	apply_state_item('execution_thread_count', args.get('execution_thread_count'))
 	apply_state_item('execution_queue_count', args.get('execution_queue_count'))
+	apply_state_item('execution_batch_size', args.get('execution_batch_size'))
+	apply_state_item('execution_reader_thread_count', args.get('execution_reader_thread_count'))
+	apply_state_item('execution_analyser_thread_count', args.get('execution_analyser_thread_count'))
+	apply_state_item('execution_writer_thread_count', args.get('execution_writer_thread_count'))
+	apply_state_item('execution_stage_queue_depth', args.get('execution_stage_queue_depth'))
 	# download
 	apply_state_item('download_providers', args.get('download_providers'))
 	apply_state_item('download_scope', args.get('download_scope'))
 	# benchmark
 	apply_state_item('benchmark_resolutions', args.get('benchmark_resolutions'))
 	apply_state_item('benchmark_cycle_count', args.get('benchmark_cycle_count'))
+	apply_state_item('benchmark_face_count', args.get('benchmark_face_count'))
+	# face cluster
+	apply_state_item('face_cluster_sample_count', args.get('face_cluster_sample_count'))
+	apply_state_item('face_cluster_distance', args.get('face_cluster_distance'))
 	# memory
 	apply_state_item('video_memory_strategy', args.get('video_memory_strategy'))
 	apply_state_item('system_memory_limit', args.get('system_memory_limit'))
 	# misc
 	apply_state_item('log_level', args.get('log_level'))
 	apply_state_item('halt_on_error', args.get('halt_on_error'))
+	apply_state_item('profile_output', args.get('profile_output'))
 	# jobs
 	apply_state_item('job_id', args.get('job_id'))
 	apply_state_item('job_status', args.get('job_status'))
 	apply_state_item('step_index', args.get('step_index'))
+	apply_state_item('segment_frame_total', args.get('segment_frame_total'))
+	apply_state_item('step_worker_count', args.get('step_worker_count'))
@@ -0,0 +1,171 @@
+import threading
+from typing import ContextManager, List, Union
+
+import numpy
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.types import BatchInputs, BatchOutputs, BatchQueue, BatchQueueSet, BatchRequest
+
+BATCH_LOCK : threading.Lock = threading.Lock()
+BATCH_CONDITION : threading.Condition = threading.Condition(BATCH_LOCK)
+BATCH_QUEUE_SET : BatchQueueSet = {}
+BATCH_GATHER_TIMEOUT : float = 0.005
+
+
+def run_batch(inference_session : InferenceSession, batch_inputs : BatchInputs, inference_context : Union[threading.Semaphore, ContextManager[None]]) -> BatchOutputs:
+	batch_queue = get_batch_queue(inference_session)
+
+	if state_manager.get_item('execution_batch_size') > 1 and batch_queue.get('is_batchable'):
+		return queue_batch(inference_session, batch_queue, batch_inputs, inference_context)
+
+	with inference_context:
+		return inference_session.run(None, batch_inputs)
+
+
+def run_stacked(inference_session : InferenceSession, batch_inputs : BatchInputs, inference_context : Union[threading.Semaphore, ContextManager[None]]) -> BatchOutputs:
+	batch_queue = get_batch_queue(inference_session)
+	batch_total = len(next(iter(batch_inputs.values())))
+
+	if batch_total > 1 and batch_queue.get('is_batchable'):
+		try:
+			with inference_context:
+				return inference_session.run(None, batch_inputs)
+		except Exception:
+			batch_queue['is_batchable'] = False
+
+	batch_outputs_list = []
+
+	for batch_index in range(batch_total):
+		with inference_context:
+			batch_outputs_list.append(inference_session.run(None, { name: batch_input[batch_index:batch_index + 1] for name, batch_input in batch_inputs.items() }))
+	return [ numpy.concatenate(batch_outputs) for batch_outputs in zip(*batch_outputs_list) ]
+
+
+def get_batch_queue(inference_session : InferenceSession) -> BatchQueue:
+	with BATCH_LOCK:
+		if id(inference_session) not in BATCH_QUEUE_SET:
+			BATCH_QUEUE_SET[id(inference_session)] =\
+			{
+				'is_batchable': has_dynamic_batch(inference_session),
+				'is_running': False,
+				'requests': []
+			}
+		return BATCH_QUEUE_SET.get(id(inference_session))
+
+
+def has_dynamic_batch(inference_session : InferenceSession) -> bool:
+	for session_input in inference_session.get_inputs():
+		if not session_input.shape or isinstance(session_input.shape[0], int):
+			return False
+	return True
+
+
+def queue_batch(inference_session : InferenceSession, batch_queue : BatchQueue, batch_inputs : BatchInputs, inference_context : Union[threading.Semaphore, ContextManager[None]]) -> BatchOutputs:
+	batch_request : BatchRequest =\
+	{
+		'inputs': batch_inputs,
+		'outputs': None,
+		'exception': None,
+		'event': threading.Event(),
+		'is_leader': False
+	}
+
+	with BATCH_CONDITION:
+		batch_queue['requests'].append(batch_request)
+		if not batch_queue.get('is_running'):
+			batch_queue['is_running'] = True
+			batch_request['is_leader'] = True
+		BATCH_CONDITION.notify_all()
+
+	if not batch_request.get('is_leader'):
+		batch_request.get('event').wait()
+
+	if batch_request.get('is_leader'):
+		try:
+			while batch_request.get('outputs') is None and batch_request.get('exception') is None:
+				with BATCH_CONDITION:
+					BATCH_CONDITION.wait_for(lambda: len(batch_queue.get('requests')) >= state_manager.get_item('execution_batch_size'), timeout = BATCH_GATHER_TIMEOUT)
+					batch_requests = pick_batch_requests(batch_queue.get('requests'), state_manager.get_item('execution_batch_size'))
+				run_batch_requests(inference_session, batch_queue, batch_requests, inference_context)
+		finally:
+			with BATCH_LOCK:
+				if batch_queue.get('requests'):
+					next_batch_request = batch_queue.get('requests')[0]
+					next_batch_request['is_leader'] = True
+					next_batch_request.get('event').set()
+				else:
+					batch_queue['is_running'] = False
+
+	if batch_request.get('exception'):
+		raise batch_request.get('exception')
+	return batch_request.get('outputs')
+
+
+def pick_batch_requests(batch_requests : List[BatchRequest], batch_size : int) -> List[BatchRequest]:
+	picked_batch_requests : List[BatchRequest] = []
+
+	for batch_request in list(batch_requests):
+		if len(picked_batch_requests) < batch_size:
+			if not picked_batch_requests or has_same_signature(picked_batch_requests[0], batch_request):
+				picked_batch_requests.append(batch_request)
+				batch_requests.remove(batch_request)
+	return picked_batch_requests
+
+
+def has_same_signature(batch_request : BatchRequest, other_batch_request : BatchRequest) -> bool:
+	batch_inputs = batch_request.get('inputs')
+	other_batch_inputs = other_batch_request.get('inputs')
+
+	if batch_inputs.keys() == other_batch_inputs.keys():
+		return all(batch_inputs.get(name).shape[1:] == other_batch_inputs.get(name).shape[1:] and batch_inputs.get(name).dtype == other_batch_inputs.get(name).dtype for name in batch_inputs)
+	return False
+
+
+def run_batch_requests(inference_session : InferenceSession, batch_queue : BatchQueue, batch_requests : List[BatchRequest], inference_context : Union[threading.Semaphore, ContextManager[None]]) -> None:
+	try:
+		if len(batch_requests) > 1:
+			try:
+				batch_inputs = merge_batch_inputs(batch_requests)
+
+				with inference_context:
+					batch_outputs = inference_session.run(None, batch_inputs)
+				split_batch_outputs(batch_requests, batch_outputs)
+			except Exception:
+				batch_queue['is_batchable'] = False
+
+				for batch_request in batch_requests:
+					batch_request['outputs'] = None
+
+		for batch_request in batch_requests:
+			if batch_request.get('outputs') is None:
+				try:
+					with inference_context:
+						batch_request['outputs'] = inference_session.run(None, batch_request.get('inputs'))
+				except Exception as exception:
+					batch_request['exception'] = exception
+	finally:
+		for batch_request in batch_requests:
+			if batch_request.get('outputs') is None and batch_request.get('exception') is None:
+				batch_request['exception'] = RuntimeError('batch request was not processed')
+			if not batch_request.get('is_leader'):
+				batch_request.get('event').set()
+
+
+def merge_batch_inputs(batch_requests : List[BatchRequest]) -> BatchInputs:
+	batch_inputs : BatchInputs = {}
+
+	for name in batch_requests[0].get('inputs'):
+		batch_inputs[name] = numpy.concatenate([ batch_request.get('inputs').get(name) for batch_request in batch_requests ])
+	return batch_inputs
+
+
+def split_batch_outputs(batch_requests : List[BatchRequest], batch_outputs : BatchOutputs) -> None:
+	batch_sizes = [ len(next(iter(batch_request.get('inputs').values()))) for batch_request in batch_requests ]
+	batch_indices = numpy.cumsum(batch_sizes)[:-1]
+
+	for batch_output in batch_outputs:
+		for batch_request, request_output in zip(batch_requests, numpy.split(batch_output, batch_indices)):
+			if batch_request.get('outputs') is None:
+				batch_request['outputs'] = []
+			batch_request.get('outputs').append(request_output)
@@ -7,9 +7,11 @@ from typing import Generator, List
 
 import facefusion.choices
 from facefusion import core, state_manager
+from facefusion.app_context import pin_app_context
 from facefusion.cli_helper import render_table
 from facefusion.download import conditional_download, resolve_download_url
-from facefusion.filesystem import get_file_extension
+from facefusion.ffmpeg import stack_video
+from facefusion.filesystem import get_file_extension, get_file_name, is_file
 from facefusion.types import BenchmarkCycleSet
 from facefusion.vision import count_video_frame_total, detect_video_fps, detect_video_resolution, pack_resolution
 
@@ -33,6 +35,7 @@ def pre_check() -> bool:
 def run() -> Generator[List[BenchmarkCycleSet], None, None]:
 	benchmark_resolutions = state_manager.get_item('benchmark_resolutions')
 	benchmark_cycle_count = state_manager.get_item('benchmark_cycle_count')
+	benchmark_face_count = state_manager.get_item('benchmark_face_count')
 
 	state_manager.init_item('source_paths', [ '.assets/examples/source.jpg', '.assets/examples/source.mp3' ])
 	state_manager.init_item('face_landmarker_score', 0)
@@ -41,10 +44,15 @@ def run() -> Generator[List[BenchmarkCycleSet], None, None]:
 	state_manager.init_item('output_video_preset', 'ultrafast')
 	state_manager.init_item('video_memory_strategy', 'tolerant')
 
+	if isinstance(benchmark_face_count, int) and benchmark_face_count > 1:
+		state_manager.init_item('face_selector_mode', 'many')
+
 	benchmarks = []
 	target_paths = [facefusion.choices.benchmark_set.get(benchmark_resolution) for benchmark_resolution in benchmark_resolutions if benchmark_resolution in facefusion.choices.benchmark_set]
 
 	for target_path in target_paths:
+		if isinstance(benchmark_face_count, int) and benchmark_face_count > 1:
+			target_path = suggest_stack_path(target_path, benchmark_face_count)
 		state_manager.set_item('target_path', target_path)
 		state_manager.set_item('output_path', suggest_output_path(state_manager.get_item('target_path')))
 		benchmarks.append(cycle(benchmark_cycle_count))
@@ -58,13 +66,14 @@ def cycle(cycle_count : int) -> BenchmarkCycleSet:
 	state_manager.set_item('output_video_resolution', pack_resolution(output_video_resolution))
 	state_manager.set_item('output_video_fps', detect_video_fps(state_manager.get_item('target_path')))
 
-	core.conditional_process()
-
-	for index in range(cycle_count):
-		start_time = perf_counter()
+	with pin_app_context():
 		core.conditional_process()
-		end_time = perf_counter()
-		process_times.append(end_time - start_time)
+
+		for index in range(cycle_count):
+			start_time = perf_counter()
+			core.conditional_process()
+			end_time = perf_counter()
+			process_times.append(end_time - start_time)
 
 	average_run = round(statistics.mean(process_times), 2)
 	fastest_run = round(min(process_times), 2)
@@ -82,6 +91,15 @@ def cycle(cycle_count : int) -> BenchmarkCycleSet:
 	}
 
 
+def suggest_stack_path(target_path : str, stack_total : int) -> str:
+	target_file_extension = get_file_extension(target_path)
+	stack_path = os.path.join(tempfile.gettempdir(), get_file_name(target_path) + '-' + str(stack_total) + 'x' + target_file_extension)
+
+	if is_file(stack_path) or stack_video(target_path, stack_path, stack_total):
+		return stack_path
+	return target_path
+
+
 def suggest_output_path(target_path : str) -> str:
 	target_file_extension = get_file_extension(target_path)
 	return os.path.join(tempfile.gettempdir(), hashlib.sha1().hexdigest()[:8] + target_file_extension)
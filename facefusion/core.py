@@ -3,6 +3,7 @@ import shutil
 import signal
 import sys
 from time import time
+from typing import List, Optional
 
 import numpy
 
@@ -12,20 +13,26 @@ from facefusion.common_helper import get_first
 from facefusion.content_analyser import analyse_image, analyse_video
 from facefusion.download import conditional_download_hashes, conditional_download_sources
 from facefusion.exit_helper import hard_exit, signal_exit
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
-from facefusion.face_selector import sort_and_filter_faces
+from facefusion.face_analyser import clear_face_detector_angle, get_many_faces, get_one_face
+from facefusion.face_cluster import cluster_faces, collect_cluster_faces, find_cluster_reference, get_cluster_face, load_face_clusters, render_face_clusters, save_face_clusters
+from facefusion.face_profile import get_source_face
+from facefusion.face_selector import clear_reference_matrix, sort_and_filter_faces
 from facefusion.face_store import append_reference_face, clear_reference_faces, get_reference_faces
-from facefusion.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
+from facefusion.face_track import clear_face_track, create_face_track_hash, get_face_track_path, init_face_track, save_face_track
+from facefusion.face_tracker import clear_face_tracker
+from facefusion.ffmpeg import copy_image, detect_video_keyframes, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
 from facefusion.filesystem import filter_audio_paths, get_file_name, is_image, is_video, resolve_file_paths, resolve_file_pattern
+from facefusion.frame_manifest import clear_frame_manifest, create_frame_manifest, create_frame_manifest_hash, finish_frame_manifest_stage, init_frame_manifest, remove_frame_manifest, start_frame_manifest_stage
 from facefusion.jobs import job_helper, job_manager, job_runner
 from facefusion.jobs.job_list import compose_job_list
 from facefusion.memory import limit_system_memory
-from facefusion.processors.core import get_processors_modules
+from facefusion.processors.core import get_processors_modules, multi_process_chain, multi_process_stages, multi_process_stream
+from facefusion.profiler import clear_profile, init_profile, render_profile, save_profile
 from facefusion.program import create_program
 from facefusion.program_helper import validate_args
 from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, move_temp_file, resolve_temp_frame_paths
-from facefusion.types import Args, ErrorCode
-from facefusion.vision import pack_resolution, read_image, read_static_images, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from facefusion.types import Args, ErrorCode, Face, Fps, SegmentRange, VisionFrame
+from facefusion.vision import detect_video_fps, pack_resolution, read_image, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
 
 
 def cli() -> None:
@@ -63,7 +70,13 @@ def route(args : Args) -> None:
 			return hard_exit(2)
 		benchmarker.render()
 
-	if state_manager.get_item('command') in [ 'job-list', 'job-create', 'job-submit', 'job-submit-all', 'job-delete', 'job-delete-all', 'job-add-step', 'job-remix-step', 'job-insert-step', 'job-remove-step' ]:
+	if state_manager.get_item('command') == 'face-cluster':
+		if not common_pre_check():
+			return hard_exit(2)
+		error_code = process_face_cluster()
+		hard_exit(error_code)
+
+	if state_manager.get_item('command') in [ 'job-list', 'job-create', 'job-submit', 'job-submit-all', 'job-delete', 'job-delete-all', 'job-add-step', 'job-add-segments', 'job-remix-step', 'job-insert-step', 'job-remove-step' ]:
 		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
 			hard_exit(1)
 		error_code = route_job_manager(args)
@@ -216,6 +229,16 @@ def route_job_manager(args : Args) -> ErrorCode:
 		logger.error(wording.get('job_step_not_added').format(job_id = state_manager.get_item('job_id')), __name__)
 		return 1
 
+	if state_manager.get_item('command') == 'job-add-segments':
+		step_args = reduce_step_args(args)
+		segment_ranges = detect_segment_ranges(step_args.get('target_path'), step_args.get('output_video_fps'), step_args.get('trim_frame_start'), step_args.get('trim_frame_end'))
+
+		if job_manager.add_segment_steps(state_manager.get_item('job_id'), step_args, segment_ranges):
+			logger.info(wording.get('job_segments_added').format(segment_total = len(segment_ranges), job_id = state_manager.get_item('job_id')), __name__)
+			return 0
+		logger.error(wording.get('job_segments_not_added').format(job_id = state_manager.get_item('job_id')), __name__)
+		return 1
+
 	if state_manager.get_item('command') == 'job-remix-step':
 		step_args = reduce_step_args(args)
 
@@ -243,6 +266,16 @@ def route_job_manager(args : Args) -> ErrorCode:
 	return 1
 
 
+def detect_segment_ranges(target_path : str, output_video_fps : Fps, trim_frame_start : Optional[int], trim_frame_end : Optional[int]) -> List[SegmentRange]:
+	if is_video(target_path):
+		trim_frame_start, trim_frame_end = restrict_trim_frame(target_path, trim_frame_start, trim_frame_end)
+		video_fps = detect_video_fps(target_path)
+		temp_video_fps = restrict_video_fps(target_path, output_video_fps or video_fps)
+		keyframe_numbers = job_helper.filter_keyframe_numbers(detect_video_keyframes(target_path), video_fps, temp_video_fps)
+		return job_helper.create_segment_ranges(keyframe_numbers, trim_frame_start, trim_frame_end, state_manager.get_item('segment_frame_total'))
+	return []
+
+
 def route_job_runner() -> ErrorCode:
 	if state_manager.get_item('command') == 'job-run':
 		logger.info(wording.get('running_job').format(job_id = state_manager.get_item('job_id')), __name__)
@@ -298,6 +331,8 @@ def process_batch(args : Args) -> ErrorCode:
 		if source_paths and target_paths:
 			for index, (source_path, target_path) in enumerate(itertools.product(source_paths, target_paths)):
 				step_args['source_paths'] = [ source_path ]
+				if job_args.get('source_face_profile_pattern'):
+					step_args['source_face_profile'] = job_args.get('source_face_profile_pattern').format(source_name = get_file_name(source_path))
 				step_args['target_path'] = target_path
 				step_args['output_path'] = job_args.get('output_pattern').format(index = index)
 				if not job_manager.add_step(job_id, step_args):
@@ -318,6 +353,7 @@ def process_batch(args : Args) -> ErrorCode:
 
 def process_step(job_id : str, step_index : int, step_args : Args) -> bool:
 	clear_reference_faces()
+	clear_reference_matrix()
 	step_total = job_manager.count_step_total(job_id)
 	step_args.update(collect_job_args())
 	apply_args(step_args, state_manager.set_item)
@@ -331,26 +367,53 @@ def process_step(job_id : str, step_index : int, step_args : Args) -> bool:
 
 def conditional_process() -> ErrorCode:
 	start_time = time()
+	error_code : ErrorCode = 0
 
-	for processor_module in get_processors_modules(state_manager.get_item('processors')):
-		if not processor_module.pre_process('output'):
-			return 2
+	with state_manager.pin_run_config():
+		for processor_module in get_processors_modules(state_manager.get_item('processors')):
+			if not processor_module.pre_process('output'):
+				return 2
+
+		conditional_append_reference_faces()
+		init_profile(bool(state_manager.get_item('profile_output')))
 
-	conditional_append_reference_faces()
+		if is_image(state_manager.get_item('target_path')):
+			error_code = process_image(start_time)
+		if is_video(state_manager.get_item('target_path')):
+			error_code = process_video(start_time)
 
-	if is_image(state_manager.get_item('target_path')):
-		return process_image(start_time)
-	if is_video(state_manager.get_item('target_path')):
-		return process_video(start_time)
+	conditional_save_profile()
+	return error_code
 
-	return 0
+
+def conditional_save_profile() -> None:
+	profile_output = state_manager.get_item('profile_output')
+
+	if profile_output:
+		if save_profile(profile_output):
+			logger.info(wording.get('saving_profile_succeed').format(profile_output = profile_output), __name__)
+		render_profile()
+	clear_profile()
 
 
 def conditional_append_reference_faces() -> None:
+	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces() and state_manager.get_item('reference_face_cluster_path'):
+		face_clusters = load_face_clusters(state_manager.get_item('reference_face_cluster_path'))
+		cluster_faces = face_clusters.get(state_manager.get_item('reference_face_cluster_index'), [])
+		cluster_face = get_cluster_face(cluster_faces)
+
+		for reference_face in cluster_faces:
+			append_reference_face('origin', reference_face)
+
+		if cluster_face:
+			source_face = get_source_face(state_manager.get_item('source_paths'))
+			reference_face, reference_frame = find_cluster_reference(state_manager.get_item('target_path'), cluster_face)
+
+			if source_face and reference_face:
+				append_abstract_reference_faces(source_face, reference_face, reference_frame)
+
 	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces():
-		source_frames = read_static_images(state_manager.get_item('source_paths'))
-		source_faces = get_many_faces(source_frames)
-		source_face = get_average_face(source_faces)
+		source_face = get_source_face(state_manager.get_item('source_paths'))
 		if is_video(state_manager.get_item('target_path')):
 			reference_frame = read_video_frame(state_manager.get_item('target_path'), state_manager.get_item('reference_frame_number'))
 		else:
@@ -360,12 +423,36 @@ def conditional_append_reference_faces() -> None:
 		append_reference_face('origin', reference_face)
 
 		if source_face and reference_face:
-			for processor_module in get_processors_modules(state_manager.get_item('processors')):
-				abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
-				if numpy.any(abstract_reference_frame):
-					abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
-					abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
-					append_reference_face(processor_module.__name__, abstract_reference_face)
+			append_abstract_reference_faces(source_face, reference_face, reference_frame)
+
+
+def append_abstract_reference_faces(source_face : Face, reference_face : Face, reference_frame : VisionFrame) -> None:
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
+		if numpy.any(abstract_reference_frame):
+			abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
+			abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
+			append_reference_face(processor_module.__name__, abstract_reference_face)
+
+
+def process_face_cluster() -> ErrorCode:
+	start_time = time()
+
+	if not is_image(state_manager.get_item('target_path')) and not is_video(state_manager.get_item('target_path')):
+		logger.error(wording.get('choose_image_or_video_target'), __name__)
+		return 1
+
+	logger.info(wording.get('clustering_faces'), __name__)
+	target_faces = collect_cluster_faces(state_manager.get_item('target_path'))
+	face_clusters = cluster_faces(target_faces, state_manager.get_item('face_cluster_distance'))
+
+	if save_face_clusters(state_manager.get_item('output_path'), face_clusters):
+		render_face_clusters(face_clusters)
+		seconds = '{:.2f}'.format((time() - start_time) % 60)
+		logger.info(wording.get('clustering_faces_succeed').format(output_path = state_manager.get_item('output_path'), seconds = seconds), __name__)
+		return 0
+	logger.error(wording.get('clustering_faces_failed'), __name__)
+	return 1
 
 
 def process_image(start_time : float) -> ErrorCode:
@@ -421,48 +508,106 @@ def process_video(start_time : float) -> ErrorCode:
 	if analyse_video(state_manager.get_item('target_path'), trim_frame_start, trim_frame_end):
 		return 3
 
-	logger.debug(wording.get('clearing_temp'), __name__)
-	clear_temp_directory(state_manager.get_item('target_path'))
-	logger.debug(wording.get('creating_temp'), __name__)
-	create_temp_directory(state_manager.get_item('target_path'))
-
 	process_manager.start()
+	clear_face_tracker()
+	clear_face_detector_angle()
 	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
 	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
-	else:
-		if is_process_stopping():
+	if state_manager.get_item('face_track_cache'):
+		face_track_hash = create_face_track_hash(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+		face_track_path = get_face_track_path(state_manager.get_item('target_path'), face_track_hash)
+		if init_face_track(face_track_path, unpack_resolution(temp_video_resolution)):
+			logger.debug(wording.get('loading_face_track_succeed'), __name__)
+
+	if state_manager.get_item('video_pipeline') == 'stream':
+		logger.debug(wording.get('clearing_temp'), __name__)
+		clear_temp_directory(state_manager.get_item('target_path'))
+		logger.debug(wording.get('creating_temp'), __name__)
+		create_temp_directory(state_manager.get_item('target_path'))
+		logger.info(wording.get('streaming_video').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		is_streamed = multi_process_stream(state_manager.get_item('target_path'), state_manager.get_item('source_paths'), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end)
+		conditional_save_face_track()
+		clear_face_tracker()
+		if is_streamed:
+			for processor_module in get_processors_modules(state_manager.get_item('processors')):
+				processor_module.post_process()
+			logger.debug(wording.get('streaming_video_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('streaming_video_failed'), __name__)
 			process_manager.end()
-			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
-		process_manager.end()
-		return 1
-
-	temp_frame_paths = resolve_temp_frame_paths(state_manager.get_item('target_path'))
-	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
-		if is_process_stopping():
-			return 4
+			return 1
 	else:
-		logger.error(wording.get('temp_frames_not_found'), __name__)
-		process_manager.end()
-		return 1
+		frame_manifest_hash = create_frame_manifest_hash(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+		if init_frame_manifest(state_manager.get_item('target_path'), frame_manifest_hash):
+			logger.info(wording.get('resuming_frames'), __name__)
+		else:
+			logger.debug(wording.get('clearing_temp'), __name__)
+			clear_temp_directory(state_manager.get_item('target_path'))
+			logger.debug(wording.get('creating_temp'), __name__)
+			create_temp_directory(state_manager.get_item('target_path'))
+			remove_frame_manifest()
+			logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+			if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+				create_frame_manifest()
+				logger.debug(wording.get('extracting_frames_succeed'), __name__)
+			else:
+				clear_frame_manifest()
+				if is_process_stopping():
+					process_manager.end()
+					return 4
+				logger.error(wording.get('extracting_frames_failed'), __name__)
+				process_manager.end()
+				return 1
+
+		temp_frame_paths = resolve_temp_frame_paths(state_manager.get_item('target_path'))
+		if temp_frame_paths:
+			if state_manager.get_item('video_pipeline') == 'fused':
+				logger.info(wording.get('processing'), __name__)
+				if start_frame_manifest_stage('fused'):
+					multi_process_chain(state_manager.get_item('source_paths'), temp_frame_paths)
+					conditional_finish_frame_manifest_stage('fused')
+				for processor_module in get_processors_modules(state_manager.get_item('processors')):
+					processor_module.post_process()
+			elif state_manager.get_item('video_pipeline') == 'staged':
+				logger.info(wording.get('processing'), __name__)
+				if start_frame_manifest_stage('staged'):
+					multi_process_stages(state_manager.get_item('source_paths'), temp_frame_paths)
+					conditional_finish_frame_manifest_stage('staged')
+				for processor_module in get_processors_modules(state_manager.get_item('processors')):
+					processor_module.post_process()
+			else:
+				for processor_module in get_processors_modules(state_manager.get_item('processors')):
+					logger.info(wording.get('processing'), processor_module.__name__)
+					processor_stage = processor_module.__name__.split('.')[-1]
+					if start_frame_manifest_stage(processor_stage):
+						clear_face_tracker()
+						processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+						conditional_finish_frame_manifest_stage(processor_stage)
+					processor_module.post_process()
+			conditional_save_face_track()
+			clear_face_tracker()
+			clear_frame_manifest()
+			if is_process_stopping():
+				return 4
+		else:
+			clear_frame_manifest()
+			logger.error(wording.get('temp_frames_not_found'), __name__)
+			process_manager.end()
+			return 1
 
-	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
-	if merge_video(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('merging_video_succeed'), __name__)
-	else:
-		if is_process_stopping():
+		logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+		if merge_video(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('merging_video_failed'), __name__)
 			process_manager.end()
-			return 4
-		logger.error(wording.get('merging_video_failed'), __name__)
-		process_manager.end()
-		return 1
+			return 1
 
 	if state_manager.get_item('output_audio_volume') == 0:
 		logger.info(wording.get('skipping_audio'), __name__)
@@ -506,6 +651,18 @@ def process_video(start_time : float) -> ErrorCode:
 	return 0
 
 
+def conditional_save_face_track() -> None:
+	if state_manager.get_item('face_track_cache'):
+		if save_face_track():
+			logger.debug(wording.get('saving_face_track_succeed'), __name__)
+		clear_face_track()
+
+
+def conditional_finish_frame_manifest_stage(stage : str) -> None:
+	if process_manager.is_processing():
+		finish_frame_manifest_stage(stage)
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
@@ -1,66 +1,129 @@
+import threading
 from typing import List, Optional
 
+import cv2
 import numpy
 
 from facefusion import state_manager
 from facefusion.common_helper import get_first
-from facefusion.face_classifier import classify_face
-from facefusion.face_detector import detect_faces, detect_rotated_faces
-from facefusion.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
-from facefusion.face_landmarker import detect_face_landmark, estimate_face_landmark_68_5
-from facefusion.face_recognizer import calc_embedding
+from facefusion.face_classifier import classify_faces
+from facefusion.face_detector import create_empty_face_detection, detect_faces_batch, detect_rotated_faces_batch, merge_face_detections
+from facefusion.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold, transform_points
+from facefusion.face_landmarker import detect_face_landmarks, estimate_face_landmarks_68_5, select_face_landmark_indices
+from facefusion.face_recognizer import calc_embeddings
 from facefusion.face_store import get_static_faces, set_static_faces
-from facefusion.types import BoundingBox, Face, FaceLandmark5, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
+from facefusion.face_track import get_track_faces, set_track_faces
+from facefusion.face_tracker import get_tracker_faces, inherit_faces, set_tracker_faces, transform_face
+from facefusion.types import Angle, BoundingBoxes, Face, FaceAttribute, FaceDetection, FaceLandmarkSet, FaceLandmarks5, FaceScoreSet, FaceScores, Matrix, StateKey, VisionFrame
 
+FACE_DETECTOR_ANGLE = threading.local()
+FACE_DETECTOR_ANGLE_PASS : int = 0
 
-def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5]) -> List[Face]:
+
+def create_faces(vision_frame : VisionFrame, proxy_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_scores : FaceScores, face_landmarks_5 : FaceLandmarks5, face_attributes : List[FaceAttribute]) -> List[Face]:
 	faces = []
 	nms_threshold = get_nms_threshold(state_manager.get_item('face_detector_model'), state_manager.get_item('face_detector_angles'))
 	keep_indices = apply_nms(bounding_boxes, face_scores, state_manager.get_item('face_detector_score'), nms_threshold)
 
-	for index in keep_indices:
-		bounding_box = bounding_boxes[index]
-		face_score = face_scores[index]
-		face_landmark_5 = face_landmarks_5[index]
-		face_landmark_5_68 = face_landmark_5
-		face_landmark_68_5 = estimate_face_landmark_68_5(face_landmark_5_68)
-		face_landmark_68 = face_landmark_68_5
-		face_landmark_score_68 = 0.0
-		face_angle = estimate_face_angle(face_landmark_68_5)
+	if len(keep_indices) > 0:
+		bounding_boxes = bounding_boxes[keep_indices]
+		face_scores = face_scores[keep_indices]
+		face_landmarks_5 = face_landmarks_5[keep_indices]
+		face_landmarks_68_5 = estimate_face_landmarks_68_5(face_landmarks_5)
+		face_angles = [ estimate_face_angle(face_landmark_68_5) for face_landmark_68_5 in face_landmarks_68_5 ]
+		face_landmarks_68 = [ (face_landmark_68_5, 0.0) for face_landmark_68_5 in face_landmarks_68_5 ]
 
 		if state_manager.get_item('face_landmarker_score') > 0:
-			face_landmark_68, face_landmark_score_68 = detect_face_landmark(vision_frame, bounding_box, face_angle)
-		if face_landmark_score_68 > state_manager.get_item('face_landmarker_score'):
-			face_landmark_5_68 = convert_to_face_landmark_5(face_landmark_68)
-
-		face_landmark_set : FaceLandmarkSet =\
-		{
-			'5': face_landmark_5,
-			'5/68': face_landmark_5_68,
-			'68': face_landmark_68,
-			'68/5': face_landmark_68_5
-		}
-		face_score_set : FaceScoreSet =\
-		{
-			'detector': face_score,
-			'landmarker': face_landmark_score_68
-		}
-		embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_set.get('5/68'))
-		gender, age, race = classify_face(vision_frame, face_landmark_set.get('5/68'))
-		faces.append(Face(
-			bounding_box = bounding_box,
-			score_set = face_score_set,
-			landmark_set = face_landmark_set,
-			angle = face_angle,
-			embedding = embedding,
-			normed_embedding = normed_embedding,
-			gender = gender,
-			age = age,
-			race = race
-		))
+			landmark_indices = select_face_landmark_indices(bounding_boxes, face_scores, face_landmarks_5)
+
+			if landmark_indices:
+				for face_index, face_landmark_68 in zip(landmark_indices, detect_face_landmarks(proxy_vision_frame, bounding_boxes[landmark_indices], [ face_angles[face_index] for face_index in landmark_indices ])):
+					face_landmarks_68[face_index] = face_landmark_68
+
+		for bounding_box, face_angle, face_landmark_5, face_landmark_68_5, (face_landmark_68, face_landmark_score_68), face_score in zip(bounding_boxes, face_angles, face_landmarks_5, face_landmarks_68_5, face_landmarks_68, face_scores):
+			face_landmark_5_68 = face_landmark_5
+
+			if face_landmark_score_68 > state_manager.get_item('face_landmarker_score'):
+				face_landmark_5_68 = convert_to_face_landmark_5(face_landmark_68)
+
+			face_landmark_set : FaceLandmarkSet =\
+			{
+				'5': face_landmark_5,
+				'5/68': face_landmark_5_68,
+				'68': face_landmark_68,
+				'68/5': face_landmark_68_5
+			}
+			face_score_set : FaceScoreSet =\
+			{
+				'detector': float(face_score),
+				'landmarker': face_landmark_score_68
+			}
+			faces.append(Face(
+				bounding_box = bounding_box,
+				score_set = face_score_set,
+				landmark_set = face_landmark_set,
+				angle = face_angle,
+				embedding = None,
+				normed_embedding = None,
+				gender = None,
+				age = None,
+				race = None
+			))
+	proxy_matrix = create_proxy_matrix(vision_frame, proxy_vision_frame)
+	faces = [ transform_face(face, cv2.invertAffineTransform(proxy_matrix)) for face in faces ]
+	faces = inherit_faces(vision_frame, faces)
+	return complete_proxy_faces(proxy_vision_frame, proxy_matrix, faces, face_attributes)
+
+
+def complete_faces(vision_frame : VisionFrame, faces : List[Face], face_attributes : List[FaceAttribute]) -> List[Face]:
+	if 'embedding' in face_attributes and any(face.embedding is None for face in faces) or 'classification' in face_attributes and any(face.gender is None for face in faces):
+		proxy_vision_frame = create_proxy_frame(vision_frame)
+		return complete_proxy_faces(proxy_vision_frame, create_proxy_matrix(vision_frame, proxy_vision_frame), faces, face_attributes)
+	return faces
+
+
+def complete_proxy_faces(proxy_vision_frame : VisionFrame, proxy_matrix : Matrix, faces : List[Face], face_attributes : List[FaceAttribute]) -> List[Face]:
+	face_landmarks_5_68 = [ transform_points(face.landmark_set.get('5/68'), proxy_matrix) for face in faces ]
+
+	if 'embedding' in face_attributes and any(face.embedding is None for face in faces):
+		face_embeddings = calc_embeddings(proxy_vision_frame, face_landmarks_5_68)
+		faces = [ face._replace(embedding = embedding, normed_embedding = normed_embedding) for face, (embedding, normed_embedding) in zip(faces, face_embeddings) ]
+
+	if 'classification' in face_attributes and any(face.gender is None for face in faces):
+		face_classifications = classify_faces(proxy_vision_frame, face_landmarks_5_68)
+		faces = [ face._replace(gender = gender, age = age, race = race) for face, (gender, age, race) in zip(faces, face_classifications) ]
 	return faces
 
 
+def create_proxy_frame(vision_frame : VisionFrame) -> VisionFrame:
+	face_detector_proxy_size = state_manager.get_item('face_detector_proxy_size')
+
+	if face_detector_proxy_size and vision_frame.shape[0] > face_detector_proxy_size:
+		proxy_scale = face_detector_proxy_size / vision_frame.shape[0]
+		return cv2.resize(vision_frame, None, fx = proxy_scale, fy = proxy_scale, interpolation = cv2.INTER_AREA)
+	return vision_frame
+
+
+def create_proxy_matrix(vision_frame : VisionFrame, proxy_vision_frame : VisionFrame) -> Matrix:
+	scale_x = proxy_vision_frame.shape[1] / vision_frame.shape[1]
+	scale_y = proxy_vision_frame.shape[0] / vision_frame.shape[0]
+	return numpy.array([ [ scale_x, 0, 0 ], [ 0, scale_y, 0 ] ], dtype = numpy.float64)
+
+
+def resolve_face_attributes() -> List[FaceAttribute]:
+	face_attributes : List[FaceAttribute] = []
+	face_selector_keys : List[StateKey] = [ 'face_selector_gender', 'face_selector_race', 'face_selector_age_start', 'face_selector_age_end' ]
+	processors = state_manager.get_item('processors') or []
+
+	if state_manager.get_item('face_selector_mode') == 'reference':
+		face_attributes.append('embedding')
+	if any(state_manager.get_item(face_selector_key) for face_selector_key in face_selector_keys):
+		face_attributes.append('classification')
+	elif 'face_debugger' in processors and set(state_manager.get_item('face_debugger_items')) & { 'age', 'gender', 'race' }:
+		face_attributes.append('classification')
+	return face_attributes
+
+
 def get_one_face(faces : List[Face], position : int = 0) -> Optional[Face]:
 	if faces:
 		position = min(position, len(faces) - 1)
@@ -93,32 +156,103 @@ def get_average_face(faces : List[Face]) -> Optional[Face]:
 	return None
 
 
-def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
-	many_faces : List[Face] = []
+def get_many_faces(vision_frames : List[VisionFrame], face_attributes : Optional[List[FaceAttribute]] = None) -> List[Face]:
+	many_faces : List[List[Face]] = [ [] for _ in vision_frames ]
+	detect_frame_indices : List[int] = []
+
+	if face_attributes is None:
+		face_attributes = resolve_face_attributes()
 
-	for vision_frame in vision_frames:
+	for frame_index, vision_frame in enumerate(vision_frames):
 		if numpy.any(vision_frame):
+			track_faces = get_track_faces(vision_frame)
 			static_faces = get_static_faces(vision_frame)
-			if static_faces:
-				many_faces.extend(static_faces)
+			if isinstance(track_faces, list):
+				many_faces[frame_index] = complete_faces(vision_frame, track_faces, face_attributes)
+				set_track_faces(vision_frame, many_faces[frame_index])
+			elif static_faces:
+				many_faces[frame_index] = complete_faces(vision_frame, static_faces, face_attributes)
+				if many_faces[frame_index] is not static_faces:
+					set_static_faces(vision_frame, many_faces[frame_index])
+				set_track_faces(vision_frame, many_faces[frame_index])
 			else:
-				all_bounding_boxes = []
-				all_face_scores = []
-				all_face_landmarks_5 = []
-
-				for face_detector_angle in state_manager.get_item('face_detector_angles'):
-					if face_detector_angle == 0:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
-					else:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
-					all_bounding_boxes.extend(bounding_boxes)
-					all_face_scores.extend(face_scores)
-					all_face_landmarks_5.extend(face_landmarks_5)
-
-				if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
-					faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5)
-
-					if faces:
-						many_faces.extend(faces)
-						set_static_faces(vision_frame, faces)
-	return many_faces
+				tracker_faces = get_tracker_faces(vision_frame)
+				if isinstance(tracker_faces, list):
+					many_faces[frame_index] = complete_faces(vision_frame, tracker_faces, face_attributes)
+					if many_faces[frame_index]:
+						set_static_faces(vision_frame, many_faces[frame_index])
+					set_track_faces(vision_frame, many_faces[frame_index])
+				else:
+					detect_frame_indices.append(frame_index)
+
+	if detect_frame_indices:
+		proxy_vision_frames = [ create_proxy_frame(vision_frames[frame_index]) for frame_index in detect_frame_indices ]
+
+		for frame_index, proxy_vision_frame, (bounding_boxes, face_scores, face_landmarks_5) in zip(detect_frame_indices, proxy_vision_frames, detect_many_faces(proxy_vision_frames)):
+			vision_frame = vision_frames[frame_index]
+
+			if len(face_scores) > 0 and state_manager.get_item('face_detector_score') > 0:
+				faces = create_faces(vision_frame, proxy_vision_frame, bounding_boxes, face_scores, face_landmarks_5, face_attributes)
+
+				if faces:
+					many_faces[frame_index] = faces
+					set_static_faces(vision_frame, faces)
+				set_track_faces(vision_frame, faces)
+				set_tracker_faces(vision_frame, faces)
+			else:
+				set_track_faces(vision_frame, [])
+				set_tracker_faces(vision_frame, [])
+	return [ face for faces in many_faces for face in faces ]
+
+
+def detect_many_faces(vision_frames : List[VisionFrame]) -> List[FaceDetection]:
+	face_detections : List[FaceDetection] = [ create_empty_face_detection() for _ in vision_frames ]
+
+	if state_manager.get_item('face_detector_angle_mode') == 'adaptive':
+		detect_frame_indices = list(range(len(vision_frames)))
+
+		for face_detector_angle in sort_face_detector_angles(state_manager.get_item('face_detector_angles')):
+			if detect_frame_indices:
+				detect_vision_frames = [ vision_frames[frame_index] for frame_index in detect_frame_indices ]
+
+				for frame_index, face_detection in zip(detect_frame_indices, detect_angle_faces(detect_vision_frames, face_detector_angle)):
+					face_detections[frame_index] = face_detection
+					if len(face_detection[0]) > 0:
+						set_face_detector_angle(face_detector_angle)
+
+				detect_frame_indices = [ frame_index for frame_index in detect_frame_indices if len(face_detections[frame_index][0]) == 0 ]
+	else:
+		for face_detector_angle in state_manager.get_item('face_detector_angles'):
+			face_detections = merge_face_detections(face_detections, detect_angle_faces(vision_frames, face_detector_angle))
+	return face_detections
+
+
+def detect_angle_faces(vision_frames : List[VisionFrame], face_detector_angle : Angle) -> List[FaceDetection]:
+	if face_detector_angle == 0:
+		return detect_faces_batch(vision_frames)
+	return detect_rotated_faces_batch(vision_frames, face_detector_angle)
+
+
+def get_face_detector_angle() -> Optional[Angle]:
+	if getattr(FACE_DETECTOR_ANGLE, 'angle_pass', None) == FACE_DETECTOR_ANGLE_PASS:
+		return FACE_DETECTOR_ANGLE.angle
+	return None
+
+
+def set_face_detector_angle(face_detector_angle : Angle) -> None:
+	FACE_DETECTOR_ANGLE.angle_pass = FACE_DETECTOR_ANGLE_PASS
+	FACE_DETECTOR_ANGLE.angle = face_detector_angle
+
+
+def clear_face_detector_angle() -> None:
+	global FACE_DETECTOR_ANGLE_PASS
+
+	FACE_DETECTOR_ANGLE_PASS += 1
+
+
+def sort_face_detector_angles(face_detector_angles : List[Angle]) -> List[Angle]:
+	face_detector_angle = get_face_detector_angle()
+
+	if face_detector_angle in face_detector_angles:
+		return [ face_detector_angle ] + [ angle for angle in face_detector_angles if angle != face_detector_angle ]
+	return face_detector_angles
@@ -4,11 +4,14 @@ from typing import List, Tuple
 import numpy
 
 from facefusion import inference_manager
+from facefusion.batch_manager import run_stacked
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
+from facefusion.model_helper import create_model_constants
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import Age, DownloadScope, FaceLandmark5, Gender, InferencePool, ModelOptions, ModelSet, Race, VisionFrame
+from facefusion.types import Age, DownloadScope, FaceLandmark5, Gender, InferencePool, ModelConstants, ModelOptions, ModelSet, Prediction, Race, VisionFrame
 
 
 @lru_cache(maxsize = None)
@@ -57,6 +60,11 @@ def get_model_options() -> ModelOptions:
 	return create_static_model_set('full').get('fairface')
 
 
+@lru_cache(maxsize = None)
+def get_model_constants() -> ModelConstants:
+	return create_model_constants(get_model_options())
+
+
 def pre_check() -> bool:
 	model_hash_set = get_model_options().get('hashes')
 	model_source_set = get_model_options().get('sources')
@@ -64,34 +72,31 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
-def classify_face(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmark5) -> Tuple[Gender, Age, Race]:
-	model_template = get_model_options().get('template')
-	model_size = get_model_options().get('size')
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
-	crop_vision_frame, _ = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
-	crop_vision_frame = crop_vision_frame.astype(numpy.float32)[:, :, ::-1] / 255.0
-	crop_vision_frame -= model_mean
-	crop_vision_frame /= model_standard_deviation
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	gender_id, age_id, race_id = forward(crop_vision_frame)
-	gender = categorize_gender(gender_id[0])
-	age = categorize_age(age_id[0])
-	race = categorize_race(race_id[0])
-	return gender, age, race
-
-
-def forward(crop_vision_frame : VisionFrame) -> Tuple[List[int], List[int], List[int]]:
-	face_classifier = get_inference_pool().get('face_classifier')
+@profile_span('classify')
+def classify_faces(temp_vision_frame : VisionFrame, face_landmarks_5 : List[FaceLandmark5]) -> List[Tuple[Gender, Age, Race]]:
+	model_constants = get_model_constants()
+	crop_vision_frames = []
 
-	with conditional_thread_semaphore():
-		race_id, gender_id, age_id = face_classifier.run(None,
-		{
-			'input': crop_vision_frame
-		})
+	for face_landmark_5 in face_landmarks_5:
+		crop_vision_frame, _ = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_constants.get('template'), model_constants.get('size'))
+		crop_vision_frame = crop_vision_frame.astype(numpy.float32)[:, :, ::-1] / 255.0
+		crop_vision_frame -= model_constants.get('mean')
+		crop_vision_frame /= model_constants.get('standard_deviation')
+		crop_vision_frame = crop_vision_frame.transpose(2, 0, 1)
+		crop_vision_frames.append(crop_vision_frame)
+
+	gender_ids, age_ids, race_ids = forward(numpy.stack(crop_vision_frames))
+	return [ (categorize_gender(gender_id), categorize_age(age_id), categorize_race(race_id)) for gender_id, age_id, race_id in zip(gender_ids, age_ids, race_ids) ]
+
+
+def forward(crop_vision_frames : VisionFrame) -> Tuple[Prediction, Prediction, Prediction]:
+	face_classifier = get_inference_pool().get('face_classifier')
+	race_ids, gender_ids, age_ids = run_stacked(face_classifier,
+	{
+		'input': crop_vision_frames
+	}, conditional_thread_semaphore())
 
-	return gender_id, age_id, race_id
+	return gender_ids, age_ids, race_ids
 
 
 def categorize_gender(gender_id : int) -> Gender:
@@ -0,0 +1,117 @@
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.cli_helper import render_table
+from facefusion.face_analyser import get_many_faces
+from facefusion.face_selector import compare_faces, get_face_detector_score
+from facefusion.face_track import pack_track_faces, unpack_track_faces
+from facefusion.filesystem import create_directory, is_file, is_image, is_video
+from facefusion.types import Face, FaceClusterLabels, FaceClusterLinks, FaceClusterSet, TableContents, TableHeaders, VisionFrame
+from facefusion.vision import count_video_frame_total, read_image, read_video_frame
+
+
+def collect_cluster_faces(target_path : str) -> List[Face]:
+	cluster_faces : List[Face] = []
+
+	if is_image(target_path):
+		cluster_faces.extend(get_many_faces([ read_image(target_path) ], [ 'embedding' ]))
+
+	if is_video(target_path):
+		for frame_number in sample_cluster_frame_numbers(count_video_frame_total(target_path), state_manager.get_item('face_cluster_sample_count')):
+			vision_frame = read_video_frame(target_path, frame_number)
+
+			if numpy.any(vision_frame):
+				cluster_faces.extend(get_many_faces([ vision_frame ], [ 'embedding' ]))
+	return [ cluster_face for cluster_face in cluster_faces if cluster_face.normed_embedding is not None ]
+
+
+def sample_cluster_frame_numbers(video_frame_total : int, sample_count : int) -> List[int]:
+	if video_frame_total > 0:
+		return [ int(frame_number) for frame_number in numpy.unique(numpy.linspace(0, video_frame_total - 1, sample_count).astype(numpy.int64)) ]
+	return []
+
+
+def cluster_faces(faces : List[Face], face_cluster_distance : float) -> FaceClusterSet:
+	face_clusters : FaceClusterSet = {}
+
+	if faces:
+		face_matrix = numpy.stack([ face.normed_embedding for face in faces ]).astype(numpy.float32)
+		face_distances = numpy.clip((1 - numpy.matmul(face_matrix, face_matrix.T)) * 0.5, 0, 1)
+		face_labels = link_face_labels(face_distances < face_cluster_distance)
+		cluster_labels, cluster_counts = numpy.unique(face_labels, return_counts = True)
+
+		for cluster_index, cluster_label in enumerate(cluster_labels[numpy.argsort(-cluster_counts, kind = 'stable')]):
+			face_clusters[cluster_index] = [ faces[face_index] for face_index in numpy.flatnonzero(face_labels == cluster_label) ]
+	return face_clusters
+
+
+def link_face_labels(face_links : FaceClusterLinks) -> FaceClusterLabels:
+	face_labels = numpy.arange(len(face_links))
+
+	while True:
+		link_labels = numpy.min(numpy.where(face_links, face_labels, len(face_labels)), axis = 1)
+		link_labels = numpy.minimum(link_labels, face_labels)
+		link_labels = link_labels[link_labels]
+
+		if numpy.array_equal(link_labels, face_labels):
+			return face_labels
+		face_labels = link_labels
+
+
+def save_face_clusters(face_cluster_path : str, face_clusters : FaceClusterSet) -> bool:
+	if face_clusters and create_directory(os.path.dirname(os.path.abspath(face_cluster_path))):
+		temp_face_cluster_path = face_cluster_path + '.tmp'
+
+		with open(temp_face_cluster_path, 'wb') as face_cluster_file:
+			numpy.savez(face_cluster_file, **pack_track_faces(face_clusters)) #type:ignore[arg-type]
+		os.replace(temp_face_cluster_path, face_cluster_path)
+		return True
+	return False
+
+
+def load_face_clusters(face_cluster_path : str) -> FaceClusterSet:
+	if is_file(face_cluster_path):
+		with numpy.load(face_cluster_path) as face_cluster_file:
+			return unpack_track_faces(dict(face_cluster_file))
+	return {}
+
+
+def get_cluster_face(cluster_faces : List[Face]) -> Optional[Face]:
+	if cluster_faces:
+		return max(cluster_faces, key = get_face_detector_score)
+	return None
+
+
+def find_cluster_reference(target_path : str, cluster_face : Face) -> Tuple[Optional[Face], Optional[VisionFrame]]:
+	for reference_frame in read_cluster_reference_frames(target_path):
+		if numpy.any(reference_frame):
+			for reference_face in get_many_faces([ reference_frame ]):
+				if compare_faces(reference_face, cluster_face, state_manager.get_item('reference_face_distance')):
+					return reference_face, reference_frame
+	return None, None
+
+
+def read_cluster_reference_frames(target_path : str) -> Iterator[Optional[VisionFrame]]:
+	if is_image(target_path):
+		yield read_image(target_path)
+
+	if is_video(target_path):
+		for frame_number in [ state_manager.get_item('reference_frame_number') ] + sample_cluster_frame_numbers(count_video_frame_total(target_path), state_manager.get_item('face_cluster_sample_count')):
+			yield read_video_frame(target_path, frame_number)
+
+
+def render_face_clusters(face_clusters : FaceClusterSet) -> None:
+	face_cluster_headers : TableHeaders = [ 'reference face cluster index', 'faces', 'average detector score' ]
+	face_cluster_contents : TableContents = []
+
+	for cluster_index, cluster_faces in face_clusters.items():
+		face_cluster_contents.append(
+		[
+			cluster_index,
+			len(cluster_faces),
+			round(float(numpy.mean([ face.score_set.get('detector') for face in cluster_faces ])), 2)
+		])
+	render_table(face_cluster_headers, face_cluster_contents)
@@ -3,13 +3,15 @@ from typing import List, Sequence, Tuple
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager, state_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_box, transform_bounding_box, transform_points
+from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_boxes, transform_bounding_boxes, transform_points
 from facefusion.filesystem import resolve_relative_path
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import thread_semaphore
-from facefusion.types import Angle, BoundingBox, Detection, DownloadScope, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Score, VisionFrame
+from facefusion.types import AnchorStrides, Anchors, Angle, Detection, DownloadScope, DownloadSet, FaceDetection, InferencePool, ModelSet, VisionFrame
 from facefusion.vision import restrict_frame, unpack_resolution
 
 
@@ -108,203 +110,200 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
-def detect_faces(vision_frame : VisionFrame) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	all_bounding_boxes : List[BoundingBox] = []
-	all_face_scores : List[Score] = []
-	all_face_landmarks_5 : List[FaceLandmark5] = []
+def detect_faces(vision_frame : VisionFrame) -> FaceDetection:
+	return detect_faces_batch([ vision_frame ])[0]
+
+
+@profile_span('detect')
+def detect_faces_batch(vision_frames : List[VisionFrame]) -> List[FaceDetection]:
+	face_detections : List[FaceDetection] = [ create_empty_face_detection() for _ in vision_frames ]
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'retinaface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_retinaface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		face_detections = merge_face_detections(face_detections, detect_with_retinaface(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'scrfd' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_scrfd(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		face_detections = merge_face_detections(face_detections, detect_with_scrfd(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'yolo_face' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_yolo_face(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		face_detections = merge_face_detections(face_detections, detect_with_yolo_face(vision_frames, state_manager.get_item('face_detector_size')))
+
+	return [ (normalize_bounding_boxes(bounding_boxes), face_scores, face_landmarks_5) for bounding_boxes, face_scores, face_landmarks_5 in face_detections ]
+
+
+def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> FaceDetection:
+	return detect_rotated_faces_batch([ vision_frame ], angle)[0]
+
+
+def detect_rotated_faces_batch(vision_frames : List[VisionFrame], angle : Angle) -> List[FaceDetection]:
+	rotated_vision_frames = []
+	rotated_inverse_matrices = []
+	face_detections : List[FaceDetection] = []
+
+	for vision_frame in vision_frames:
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
+		rotated_vision_frames.append(cv2.warpAffine(vision_frame, rotated_matrix, rotated_size))
+		rotated_inverse_matrices.append(cv2.invertAffineTransform(rotated_matrix))
+
+	for rotated_inverse_matrix, (bounding_boxes, face_scores, face_landmarks_5) in zip(rotated_inverse_matrices, detect_faces_batch(rotated_vision_frames)):
+		if len(face_scores) > 0:
+			bounding_boxes = transform_bounding_boxes(bounding_boxes, rotated_inverse_matrix)
+			face_landmarks_5 = transform_points(face_landmarks_5.reshape(-1, 2), rotated_inverse_matrix).reshape(-1, 5, 2)
+		face_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return face_detections
+
+
+def create_empty_face_detection() -> FaceDetection:
+	return numpy.empty((0, 4), dtype = numpy.float32), numpy.empty(0, dtype = numpy.float32), numpy.empty((0, 5, 2), dtype = numpy.float32)
+
 
-	all_bounding_boxes = [ normalize_bounding_box(all_bounding_box) for all_bounding_box in all_bounding_boxes ]
-	return all_bounding_boxes, all_face_scores, all_face_landmarks_5
+def merge_face_detections(face_detections : List[FaceDetection], temp_face_detections : List[FaceDetection]) -> List[FaceDetection]:
+	merged_face_detections : List[FaceDetection] = []
 
+	for (bounding_boxes, face_scores, face_landmarks_5), (temp_bounding_boxes, temp_face_scores, temp_face_landmarks_5) in zip(face_detections, temp_face_detections):
+		merged_face_detections.append(
+		(
+			numpy.concatenate([ bounding_boxes, temp_bounding_boxes ]),
+			numpy.concatenate([ face_scores, temp_face_scores ]),
+			numpy.concatenate([ face_landmarks_5, temp_face_landmarks_5 ])
+		))
+	return merged_face_detections
 
-def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
-	rotated_vision_frame = cv2.warpAffine(vision_frame, rotated_matrix, rotated_size)
-	rotated_inverse_matrix = cv2.invertAffineTransform(rotated_matrix)
-	bounding_boxes, face_scores, face_landmarks_5 = detect_faces(rotated_vision_frame)
-	bounding_boxes = [ transform_bounding_box(bounding_box, rotated_inverse_matrix) for bounding_box in bounding_boxes ]
-	face_landmarks_5 = [ transform_points(face_landmark_5, rotated_inverse_matrix) for face_landmark_5 in face_landmarks_5 ]
-	return bounding_boxes, face_scores, face_landmarks_5
 
+def detect_with_retinaface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ -1, 1 ])
+	detections = forward_with_retinaface(detect_vision_frames)
+	return [ decode_anchor_detection(detection, face_detector_size, detect_ratio) for detection, detect_ratio in zip(detections, detect_ratios) ]
 
-def detect_with_retinaface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+
+def detect_with_scrfd(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ -1, 1 ])
+	detections = forward_with_scrfd(detect_vision_frames)
+	return [ decode_anchor_detection(detection, face_detector_size, detect_ratio) for detection, detect_ratio in zip(detections, detect_ratios) ]
+
+
+def detect_with_yolo_face(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ 0, 1 ])
+	detections = forward_with_yolo_face(detect_vision_frames)
+	return [ decode_yolo_detection(detection, detect_ratio) for detection, detect_ratio in zip(detections, detect_ratios) ]
+
+
+@lru_cache(maxsize = None)
+def create_anchor_set(face_detector_size : str) -> Tuple[Anchors, AnchorStrides]:
 	feature_strides = [ 8, 16, 32 ]
-	feature_map_channel = 3
 	anchor_total = 2
-	face_detector_score = state_manager.get_item('face_detector_score')
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ -1, 1 ])
-	detection = forward_with_retinaface(detect_vision_frame)
-
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= face_detector_score)[0]
-
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_boxes_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmarks_5_raw = detection[index + feature_map_channel * 2] * feature_stride
-
-			for bounding_box_raw in distance_to_bounding_box(anchors, bounding_boxes_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box_raw[0] * ratio_width,
-					bounding_box_raw[1] * ratio_height,
-					bounding_box_raw[2] * ratio_width,
-					bounding_box_raw[3] * ratio_height
-				]))
-
-			for face_score_raw in detection[index][keep_indices]:
-				face_scores.append(face_score_raw[0])
-
-			for face_landmark_raw_5 in distance_to_face_landmark_5(anchors, face_landmarks_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_raw_5 * [ ratio_width, ratio_height ])
-
-	return bounding_boxes, face_scores, face_landmarks_5
-
-
-def detect_with_scrfd(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
-	feature_strides = [ 8, 16, 32 ]
+	anchors = []
+	anchor_strides = []
+
+	for feature_stride in feature_strides:
+		stride_height = face_detector_height // feature_stride
+		stride_width = face_detector_width // feature_stride
+		stride_anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
+		anchors.append(stride_anchors)
+		anchor_strides.append(numpy.full((len(stride_anchors), 1), feature_stride, dtype = numpy.float32))
+
+	return numpy.concatenate(anchors).astype(numpy.float32), numpy.concatenate(anchor_strides)
+
+
+def decode_anchor_detection(detection : List[Detection], face_detector_size : str, detect_ratio : Tuple[float, float]) -> FaceDetection:
 	feature_map_channel = 3
-	anchor_total = 2
 	face_detector_score = state_manager.get_item('face_detector_score')
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ -1, 1 ])
-	detection = forward_with_scrfd(detect_vision_frame)
-
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= face_detector_score)[0]
-
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_boxes_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmarks_5_raw = detection[index + feature_map_channel * 2] * feature_stride
-
-			for bounding_box_raw in distance_to_bounding_box(anchors, bounding_boxes_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box_raw[0] * ratio_width,
-					bounding_box_raw[1] * ratio_height,
-					bounding_box_raw[2] * ratio_width,
-					bounding_box_raw[3] * ratio_height
-				]))
-
-			for face_score_raw in detection[index][keep_indices]:
-				face_scores.append(face_score_raw[0])
-
-			for face_landmark_raw_5 in distance_to_face_landmark_5(anchors, face_landmarks_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_raw_5 * [ ratio_width, ratio_height ])
-
-	return bounding_boxes, face_scores, face_landmarks_5
-
-
-def detect_with_yolo_face(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+	ratio_width, ratio_height = detect_ratio
+	anchors, anchor_strides = create_anchor_set(face_detector_size)
+	face_scores_raw = numpy.concatenate(detection[:feature_map_channel]).ravel()
+	keep_indices = numpy.flatnonzero(face_scores_raw >= face_detector_score)
+
+	if len(keep_indices) > 0:
+		bounding_boxes_raw = numpy.concatenate(detection[feature_map_channel:feature_map_channel * 2])[keep_indices] * anchor_strides[keep_indices]
+		face_landmarks_5_raw = numpy.concatenate(detection[feature_map_channel * 2:feature_map_channel * 3])[keep_indices] * anchor_strides[keep_indices]
+		bounding_boxes = distance_to_bounding_box(anchors[keep_indices], bounding_boxes_raw) * numpy.array([ ratio_width, ratio_height, ratio_width, ratio_height ], dtype = numpy.float32)
+		face_landmarks_5 = distance_to_face_landmark_5(anchors[keep_indices], face_landmarks_5_raw) * numpy.array([ ratio_width, ratio_height ], dtype = numpy.float32)
+		return bounding_boxes, face_scores_raw[keep_indices], face_landmarks_5
+
+	return create_empty_face_detection()
+
+
+def decode_yolo_detection(detection : List[Detection], detect_ratio : Tuple[float, float]) -> FaceDetection:
 	face_detector_score = state_manager.get_item('face_detector_score')
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ 0, 1 ])
-	detection = forward_with_yolo_face(detect_vision_frame)
-	detection = numpy.squeeze(detection).T
-	bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = numpy.split(detection, [ 4, 5 ], axis = 1)
-	keep_indices = numpy.where(face_scores_raw > face_detector_score)[0]
-
-	if numpy.any(keep_indices):
+	ratio_width, ratio_height = detect_ratio
+	detection_raw = numpy.squeeze(detection).T
+	bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = numpy.split(detection_raw, [ 4, 5 ], axis = 1)
+	keep_indices = numpy.flatnonzero(face_scores_raw.ravel() > face_detector_score)
+
+	if len(keep_indices) > 0:
 		bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = bounding_boxes_raw[keep_indices], face_scores_raw[keep_indices], face_landmarks_5_raw[keep_indices]
+		bounding_boxes_raw = numpy.column_stack(
+		[
+			bounding_boxes_raw[:, 0] - bounding_boxes_raw[:, 2] / 2,
+			bounding_boxes_raw[:, 1] - bounding_boxes_raw[:, 3] / 2,
+			bounding_boxes_raw[:, 0] + bounding_boxes_raw[:, 2] / 2,
+			bounding_boxes_raw[:, 1] + bounding_boxes_raw[:, 3] / 2
+		])
+		bounding_boxes = bounding_boxes_raw * numpy.array([ ratio_width, ratio_height, ratio_width, ratio_height ], dtype = numpy.float32)
+		face_landmarks_5 = face_landmarks_5_raw.reshape(-1, 5, 3)[:, :, :2] * numpy.array([ ratio_width, ratio_height ], dtype = numpy.float32)
+		return bounding_boxes, face_scores_raw.ravel(), face_landmarks_5
 
-		for bounding_box_raw in bounding_boxes_raw:
-			bounding_boxes.append(numpy.array(
-			[
-				(bounding_box_raw[0] - bounding_box_raw[2] / 2) * ratio_width,
-				(bounding_box_raw[1] - bounding_box_raw[3] / 2) * ratio_height,
-				(bounding_box_raw[0] + bounding_box_raw[2] / 2) * ratio_width,
-				(bounding_box_raw[1] + bounding_box_raw[3] / 2) * ratio_height
-			]))
+	return create_empty_face_detection()
 
-		face_scores = face_scores_raw.ravel().tolist()
-		face_landmarks_5_raw[:, 0::3] = (face_landmarks_5_raw[:, 0::3]) * ratio_width
-		face_landmarks_5_raw[:, 1::3] = (face_landmarks_5_raw[:, 1::3]) * ratio_height
 
-		for face_landmark_raw_5 in face_landmarks_5_raw:
-			face_landmarks_5.append(numpy.array(face_landmark_raw_5.reshape(-1, 3)[:, :2]))
+def forward_with_retinaface(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
+	face_detector = get_inference_pool().get('retinaface')
+	return forward_detect_frames(face_detector, detect_vision_frames, 3)
 
-	return bounding_boxes, face_scores, face_landmarks_5
 
+def forward_with_scrfd(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
+	face_detector = get_inference_pool().get('scrfd')
+	return forward_detect_frames(face_detector, detect_vision_frames, 3)
 
-def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('retinaface')
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
+def forward_with_yolo_face(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
+	face_detector = get_inference_pool().get('yolo_face')
+	return forward_detect_frames(face_detector, detect_vision_frames, 3)
 
-	return detection
 
+def forward_detect_frames(face_detector : InferenceSession, detect_vision_frames : VisionFrame, detection_rank : int) -> List[List[Detection]]:
+	detections = []
 
-def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('scrfd')
+	if len(detect_vision_frames) > 1 and has_batch_axis(face_detector, detection_rank):
+		with thread_semaphore():
+			detection = face_detector.run(None,
+			{
+				'input': detect_vision_frames
+			})
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
+		for frame_index in range(len(detect_vision_frames)):
+			detections.append([ detection_output[frame_index] for detection_output in detection ])
+		return detections
 
-	return detection
+	for detect_vision_frame in detect_vision_frames:
+		with thread_semaphore():
+			detection = face_detector.run(None,
+			{
+				'input': numpy.expand_dims(detect_vision_frame, axis = 0)
+			})
+		detections.append(detection)
+	return detections
 
 
-def forward_with_yolo_face(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('yolo_face')
+def has_batch_axis(face_detector : InferenceSession, detection_rank : int) -> bool:
+	input_shape = face_detector.get_inputs()[0].shape
+	output_shape = face_detector.get_outputs()[0].shape
+	return not isinstance(input_shape[0], int) and len(output_shape) == detection_rank
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
 
-	return detection
+def prepare_detect_frames(vision_frames : List[VisionFrame], face_detector_size : str) -> Tuple[VisionFrame, List[Tuple[float, float]]]:
+	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
+	detect_vision_frames = []
+	detect_ratios = []
+
+	for vision_frame in vision_frames:
+		temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
+		detect_vision_frames.append(prepare_detect_frame(temp_vision_frame, face_detector_size))
+		detect_ratios.append((vision_frame.shape[1] / temp_vision_frame.shape[1], vision_frame.shape[0] / temp_vision_frame.shape[0]))
+	return numpy.concatenate(detect_vision_frames), detect_ratios
 
 
 def prepare_detect_frame(temp_vision_frame : VisionFrame, face_detector_size : str) -> VisionFrame:
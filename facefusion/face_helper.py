@@ -5,7 +5,8 @@ import cv2
 import numpy
 from cv2.typing import Size
 
-from facefusion.types import Anchors, Angle, BoundingBox, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, Points, Scale, Score, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
+from facefusion.profiler import profile_span
+from facefusion.types import Anchors, Angle, BoundingBox, BoundingBoxes, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, FaceLandmarkChecks, FaceLandmarks5, FaceScores, Mask, Matrix, Points, Scale, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
 
 WARP_TEMPLATE_SET : WarpTemplateSet =\
 {
@@ -98,6 +99,7 @@ def warp_face_by_translation(temp_vision_frame : VisionFrame, translation : Tran
 	return crop_vision_frame, affine_matrix
 
 
+@profile_span('paste_back')
 def paste_back(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
 	paste_bounding_box, paste_matrix = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
 	x_min, y_min, x_max, y_max = paste_bounding_box
@@ -139,6 +141,7 @@ def create_static_anchors(feature_stride : int, anchor_total : int, stride_heigh
 	return anchors
 
 
+@lru_cache(maxsize = None)
 def create_rotated_matrix_and_size(angle : Angle, size : Size) -> Tuple[Matrix, Size]:
 	rotated_matrix = cv2.getRotationMatrix2D((size[0] / 2, size[1] / 2), angle, 1)
 	rotated_size = numpy.dot(numpy.abs(rotated_matrix[:, :2]), size)
@@ -168,6 +171,16 @@ def transform_points(points : Points, matrix : Matrix) -> Points:
 	return points
 
 
+def normalize_bounding_boxes(bounding_boxes : BoundingBoxes) -> BoundingBoxes:
+	return numpy.column_stack(
+	[
+		numpy.minimum(bounding_boxes[:, 0], bounding_boxes[:, 2]),
+		numpy.minimum(bounding_boxes[:, 1], bounding_boxes[:, 3]),
+		numpy.maximum(bounding_boxes[:, 0], bounding_boxes[:, 2]),
+		numpy.maximum(bounding_boxes[:, 1], bounding_boxes[:, 3])
+	])
+
+
 def transform_bounding_box(bounding_box : BoundingBox, matrix : Matrix) -> BoundingBox:
 	points = numpy.array(
 	[
@@ -182,6 +195,25 @@ def transform_bounding_box(bounding_box : BoundingBox, matrix : Matrix) -> Bound
 	return normalize_bounding_box(numpy.array([ x1, y1, x2, y2 ]))
 
 
+def transform_bounding_boxes(bounding_boxes : BoundingBoxes, matrix : Matrix) -> BoundingBoxes:
+	points = bounding_boxes[:, [ 0, 1, 2, 1, 2, 3, 0, 3 ]].reshape(-1, 2)
+	corner_points = transform_points(points, matrix).reshape(-1, 4, 2)
+	return numpy.concatenate([ numpy.min(corner_points, axis = 1), numpy.max(corner_points, axis = 1) ], axis = 1)
+
+
+def calc_bounding_box_iou(bounding_box : BoundingBox, other_bounding_box : BoundingBox) -> float:
+	x1, y1 = numpy.maximum(bounding_box[:2], other_bounding_box[:2])
+	x2, y2 = numpy.minimum(bounding_box[2:], other_bounding_box[2:])
+	intersection_area = max(x2 - x1, 0) * max(y2 - y1, 0)
+	bounding_box_area = (bounding_box[2] - bounding_box[0]) * (bounding_box[3] - bounding_box[1])
+	other_bounding_box_area = (other_bounding_box[2] - other_bounding_box[0]) * (other_bounding_box[3] - other_bounding_box[1])
+	union_area = bounding_box_area + other_bounding_box_area - intersection_area
+
+	if union_area > 0:
+		return float(intersection_area / union_area)
+	return 0.0
+
+
 def distance_to_bounding_box(points : Points, distance : Distance) -> BoundingBox:
 	x1 = points[:, 0] - distance[:, 0]
 	y1 = points[:, 1] - distance[:, 1]
@@ -228,9 +260,19 @@ def estimate_face_angle(face_landmark_68 : FaceLandmark68) -> Angle:
 	return face_angle
 
 
-def apply_nms(bounding_boxes : List[BoundingBox], scores : List[Score], score_threshold : float, nms_threshold : float) -> Sequence[int]:
-	normed_bounding_boxes = [ (x1, y1, x2 - x1, y2 - y1) for (x1, y1, x2, y2) in bounding_boxes ]
-	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes, scores, score_threshold = score_threshold, nms_threshold = nms_threshold)
+def check_face_landmarks_5(bounding_boxes : BoundingBoxes, face_landmarks_5 : FaceLandmarks5) -> FaceLandmarkChecks:
+	face_landmarks_x = face_landmarks_5[:, :, 0]
+	face_landmarks_y = face_landmarks_5[:, :, 1]
+	has_inside_points = numpy.all((face_landmarks_x >= bounding_boxes[:, [0]]) & (face_landmarks_x <= bounding_boxes[:, [2]]) & (face_landmarks_y >= bounding_boxes[:, [1]]) & (face_landmarks_y <= bounding_boxes[:, [3]]), axis = 1)
+	has_ordered_eyes = face_landmarks_x[:, 0] < face_landmarks_x[:, 1]
+	has_ordered_mouth = face_landmarks_x[:, 3] < face_landmarks_x[:, 4]
+	has_ordered_nose = (numpy.max(face_landmarks_y[:, :2], axis = 1) < face_landmarks_y[:, 2]) & (face_landmarks_y[:, 2] < numpy.min(face_landmarks_y[:, 3:], axis = 1))
+	return has_inside_points & has_ordered_eyes & has_ordered_mouth & has_ordered_nose
+
+
+def apply_nms(bounding_boxes : BoundingBoxes, face_scores : FaceScores, score_threshold : float, nms_threshold : float) -> Sequence[int]:
+	normed_bounding_boxes = numpy.concatenate([ bounding_boxes[:, :2], bounding_boxes[:, 2:] - bounding_boxes[:, :2] ], axis = 1).astype(numpy.float32)
+	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes, face_scores.astype(numpy.float32), score_threshold = score_threshold, nms_threshold = nms_threshold) #type:ignore[arg-type]
 	return keep_indices
 
 
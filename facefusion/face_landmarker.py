@@ -1,15 +1,18 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Tuple
 
 import cv2
 import numpy
+from cv2.typing import Size
 
 from facefusion import inference_manager, state_manager
+from facefusion.batch_manager import run_stacked
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_helper import create_rotated_matrix_and_size, estimate_matrix_by_face_landmark_5, transform_points, warp_face_by_translation
+from facefusion.face_helper import check_face_landmarks_5, create_rotated_matrix_and_size, estimate_matrix_by_face_landmark_5, transform_points, warp_face_by_translation
 from facefusion.filesystem import resolve_relative_path
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import Angle, BoundingBox, DownloadScope, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, ModelSet, Prediction, Score, VisionFrame
+from facefusion.types import Angle, BoundingBoxes, DownloadScope, DownloadSet, FaceLandmark5, FaceLandmark68, FaceLandmarks5, FaceScores, InferencePool, Matrix, ModelSet, Prediction, Score, VisionFrame
 
 
 @lru_cache(maxsize = None)
@@ -115,59 +118,99 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
-def detect_face_landmark(vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
-	face_landmark_2dfan4 = None
-	face_landmark_peppa_wutz = None
-	face_landmark_score_2dfan4 = 0.0
-	face_landmark_score_peppa_wutz = 0.0
+def select_face_landmark_indices(bounding_boxes : BoundingBoxes, face_scores : FaceScores, face_landmarks_5 : FaceLandmarks5) -> List[int]:
+	if state_manager.get_item('face_landmarker_mode') == 'adaptive' and not has_face_landmark_68_usage():
+		face_landmark_checks = check_face_landmarks_5(bounding_boxes, face_landmarks_5) & (face_scores > 0.8)
+		return [ int(face_index) for face_index in numpy.flatnonzero(~face_landmark_checks) ]
+	return list(range(len(bounding_boxes)))
+
+
+def has_face_landmark_68_usage() -> bool:
+	processors = state_manager.get_item('processors') or []
+
+	if 'area' in (state_manager.get_item('face_mask_types') or []):
+		return True
+	if set(processors) & { 'face_editor', 'lip_syncer' }:
+		return True
+	if 'face_debugger' in processors and set(state_manager.get_item('face_debugger_items')) & { 'face-landmark-5/68', 'face-landmark-68' }:
+		return True
+	return False
+
+
+@profile_span('landmark')
+def detect_face_landmarks(vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
+	face_landmarks_2dfan4 : List[Tuple[FaceLandmark68, Score]] = [ (None, 0.0) for _ in bounding_boxes ]
+	face_landmarks_peppa_wutz : List[Tuple[FaceLandmark68, Score]] = [ (None, 0.0) for _ in bounding_boxes ]
+	face_landmarks = []
 
 	if state_manager.get_item('face_landmarker_model') in [ 'many', '2dfan4' ]:
-		face_landmark_2dfan4, face_landmark_score_2dfan4 = detect_with_2dfan4(vision_frame, bounding_box, face_angle)
+		face_landmarks_2dfan4 = detect_with_2dfan4(vision_frame, bounding_boxes, face_angles)
 
 	if state_manager.get_item('face_landmarker_model') in [ 'many', 'peppa_wutz' ]:
-		face_landmark_peppa_wutz, face_landmark_score_peppa_wutz = detect_with_peppa_wutz(vision_frame, bounding_box, face_angle)
+		peppa_wutz_indices = [ face_index for face_index, (_, face_landmark_score_2dfan4) in enumerate(face_landmarks_2dfan4) if face_landmark_score_2dfan4 <= 0.8 ]
 
-	if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
-		return face_landmark_2dfan4, face_landmark_score_2dfan4
-	return face_landmark_peppa_wutz, face_landmark_score_peppa_wutz
+		if peppa_wutz_indices:
+			for face_index, face_landmark in zip(peppa_wutz_indices, detect_with_peppa_wutz(vision_frame, bounding_boxes[peppa_wutz_indices], [ face_angles[face_index] for face_index in peppa_wutz_indices ])):
+				face_landmarks_peppa_wutz[face_index] = face_landmark
 
+	for (face_landmark_2dfan4, face_landmark_score_2dfan4), (face_landmark_peppa_wutz, face_landmark_score_peppa_wutz) in zip(face_landmarks_2dfan4, face_landmarks_peppa_wutz):
+		if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
+			face_landmarks.append((face_landmark_2dfan4, face_landmark_score_2dfan4))
+		else:
+			face_landmarks.append((face_landmark_peppa_wutz, face_landmark_score_peppa_wutz))
+	return face_landmarks
 
-def detect_with_2dfan4(temp_vision_frame: VisionFrame, bounding_box: BoundingBox, face_angle: Angle) -> Tuple[FaceLandmark68, Score]:
+
+def detect_with_2dfan4(temp_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
 	model_size = create_static_model_set('full').get('2dfan4').get('size')
-	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
-	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
-	crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
-	crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
-	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
-	face_landmark_68, face_heatmap = forward_with_2dfan4(crop_vision_frame)
-	face_landmark_68 = face_landmark_68[:, :, :2][0] / 64 * 256
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = numpy.amax(face_heatmap, axis = (2, 3))
-	face_landmark_score_68 = numpy.mean(face_landmark_score_68)
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
-
-
-def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
+	crop_vision_frames, affine_matrices, rotated_matrices = prepare_landmark_frames(temp_vision_frame, bounding_boxes, face_angles, model_size)
+	face_landmarks_68, face_heatmaps = forward_with_2dfan4(crop_vision_frames)
+	face_landmarks = []
+
+	for face_landmark_68, face_heatmap, affine_matrix, rotated_matrix in zip(face_landmarks_68, face_heatmaps, affine_matrices, rotated_matrices):
+		face_landmark_68 = face_landmark_68[:, :2] / 64 * 256
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
+		face_landmark_score_68 = numpy.amax(face_heatmap, axis = (1, 2))
+		face_landmark_score_68 = numpy.mean(face_landmark_score_68)
+		face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ])
+		face_landmarks.append((face_landmark_68, face_landmark_score_68))
+	return face_landmarks
+
+
+def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
 	model_size = create_static_model_set('full').get('peppa_wutz').get('size')
-	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
-	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
-	crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
-	crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
-	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	prediction = forward_with_peppa_wutz(crop_vision_frame)
-	face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
+	crop_vision_frames, affine_matrices, rotated_matrices = prepare_landmark_frames(temp_vision_frame, bounding_boxes, face_angles, model_size)
+	predictions = forward_with_peppa_wutz(crop_vision_frames)
+	face_landmarks = []
+
+	for prediction, affine_matrix, rotated_matrix in zip(predictions, affine_matrices, rotated_matrices):
+		face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
+		face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
+		face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ])
+		face_landmarks.append((face_landmark_68, face_landmark_score_68))
+	return face_landmarks
+
+
+def prepare_landmark_frames(temp_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle], model_size : Size) -> Tuple[VisionFrame, List[Matrix], List[Matrix]]:
+	crop_vision_frames = []
+	affine_matrices = []
+	rotated_matrices = []
+
+	for bounding_box, face_angle in zip(bounding_boxes, face_angles):
+		scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
+		translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
+		crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
+		crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
+		crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
+		crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
+		crop_vision_frames.append(crop_vision_frame)
+		affine_matrices.append(affine_matrix)
+		rotated_matrices.append(rotated_matrix)
+	return numpy.stack(crop_vision_frames), affine_matrices, rotated_matrices
 
 
 def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFrame:
@@ -178,45 +221,45 @@ def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFram
 	return crop_vision_frame
 
 
-def estimate_face_landmark_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
-	affine_matrix = estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1))
-	face_landmark_5 = cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
-	face_landmark_68_5 = forward_fan_68_5(face_landmark_5)
-	face_landmark_68_5 = cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2)
-	return face_landmark_68_5
+@profile_span('landmark')
+def estimate_face_landmarks_68_5(face_landmarks_5 : FaceLandmarks5) -> List[FaceLandmark68]:
+	affine_matrices = []
+	temp_face_landmarks_5 = []
 
+	for face_landmark_5 in face_landmarks_5:
+		affine_matrix = estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1))
+		temp_face_landmarks_5.append(cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2))
+		affine_matrices.append(affine_matrix)
 
-def forward_with_2dfan4(crop_vision_frame : VisionFrame) -> Tuple[Prediction, Prediction]:
-	face_landmarker = get_inference_pool().get('2dfan4')
+	face_landmarks_68_5 = forward_fan_68_5(numpy.stack(temp_face_landmarks_5).astype(numpy.float32))
+	return [ cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2) for face_landmark_68_5, affine_matrix in zip(face_landmarks_68_5, affine_matrices) ]
 
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
-		{
-			'input': [ crop_vision_frame ]
-		})
 
-	return prediction
+def forward_with_2dfan4(crop_vision_frames : VisionFrame) -> Tuple[Prediction, Prediction]:
+	face_landmarker = get_inference_pool().get('2dfan4')
+	face_landmarks_68, face_heatmaps = run_stacked(face_landmarker,
+	{
+		'input': crop_vision_frames
+	}, conditional_thread_semaphore())
 
+	return face_landmarks_68, face_heatmaps
 
-def forward_with_peppa_wutz(crop_vision_frame : VisionFrame) -> Prediction:
-	face_landmarker = get_inference_pool().get('peppa_wutz')
 
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
+def forward_with_peppa_wutz(crop_vision_frames : VisionFrame) -> Prediction:
+	face_landmarker = get_inference_pool().get('peppa_wutz')
+	predictions = run_stacked(face_landmarker,
+	{
+		'input': crop_vision_frames
+	}, conditional_thread_semaphore())[0]
 
-	return prediction
+	return predictions
 
 
-def forward_fan_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
+def forward_fan_68_5(face_landmarks_5 : FaceLandmark5) -> FaceLandmark68:
 	face_landmarker = get_inference_pool().get('fan_68_5')
+	face_landmarks_68_5 = run_stacked(face_landmarker,
+	{
+		'input': face_landmarks_5
+	}, conditional_thread_semaphore())[0]
 
-	with conditional_thread_semaphore():
-		face_landmark_68_5 = face_landmarker.run(None,
-		{
-			'input': [ face_landmark_5 ]
-		})[0][0]
-
-	return face_landmark_68_5
+	return face_landmarks_68_5
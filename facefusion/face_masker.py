@@ -6,8 +6,10 @@ import numpy
 
 import facefusion.choices
 from facefusion import inference_manager, state_manager
+from facefusion.batch_manager import run_batch
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.filesystem import resolve_relative_path
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import DownloadScope, DownloadSet, FaceLandmark68, FaceMaskArea, FaceMaskRegion, InferencePool, Mask, ModelSet, Padding, VisionFrame
 
@@ -155,6 +157,7 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
+@profile_span('mask')
 def create_box_mask(crop_vision_frame : VisionFrame, face_mask_blur : float, face_mask_padding : Padding) -> Mask:
 	crop_size = crop_vision_frame.shape[:2][::-1]
 	blur_amount = int(crop_size[0] * 0.5 * face_mask_blur)
@@ -170,6 +173,7 @@ def create_box_mask(crop_vision_frame : VisionFrame, face_mask_blur : float, fac
 	return box_mask
 
 
+@profile_span('mask')
 def create_occlusion_mask(crop_vision_frame : VisionFrame) -> Mask:
 	model_name = state_manager.get_item('face_occluder_model')
 	model_size = create_static_model_set('full').get(model_name).get('size')
@@ -183,6 +187,7 @@ def create_occlusion_mask(crop_vision_frame : VisionFrame) -> Mask:
 	return occlusion_mask
 
 
+@profile_span('mask')
 def create_area_mask(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark68, face_mask_areas : List[FaceMaskArea]) -> Mask:
 	crop_size = crop_vision_frame.shape[:2][::-1]
 	landmark_points = []
@@ -198,6 +203,7 @@ def create_area_mask(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLan
 	return area_mask
 
 
+@profile_span('mask')
 def create_region_mask(crop_vision_frame : VisionFrame, face_mask_regions : List[FaceMaskRegion]) -> Mask:
 	model_name = state_manager.get_item('face_parser_model')
 	model_size = create_static_model_set('full').get(model_name).get('size')
@@ -218,11 +224,10 @@ def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
 	model_name = state_manager.get_item('face_occluder_model')
 	face_occluder = get_inference_pool().get(model_name)
 
-	with conditional_thread_semaphore():
-		occlusion_mask : Mask = face_occluder.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	occlusion_mask : Mask = run_batch(face_occluder,
+	{
+		'input': prepare_vision_frame
+	}, conditional_thread_semaphore())[0][0]
 
 	return occlusion_mask
 
@@ -231,10 +236,9 @@ def forward_parse_face(prepare_vision_frame : VisionFrame) -> Mask:
 	model_name = state_manager.get_item('face_parser_model')
 	face_parser = get_inference_pool().get(model_name)
 
-	with conditional_thread_semaphore():
-		region_mask : Mask = face_parser.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	region_mask : Mask = run_batch(face_parser,
+	{
+		'input': prepare_vision_frame
+	}, conditional_thread_semaphore())[0][0]
 
 	return region_mask
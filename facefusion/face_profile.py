@@ -0,0 +1,213 @@
+import os
+import threading
+from typing import Any, List, Optional
+
+import numpy
+
+from facefusion import face_recognizer, state_manager
+from facefusion.common_helper import get_first
+from facefusion.face_analyser import get_average_face, get_many_faces
+from facefusion.face_helper import warp_face_by_face_landmark_5
+from facefusion.face_selector import sort_faces_by_order
+from facefusion.filesystem import create_directory, filter_image_paths, is_file
+from facefusion.hash_helper import create_hash
+from facefusion.types import Face, FaceProfile, FaceProfileArrays, FaceProfileCropSet, FaceProfileSet, SourceFaceSet, VisionFrame, WarpTemplate
+from facefusion.vision import read_static_image, read_static_images
+
+FACE_PROFILE_SET : FaceProfileSet = {}
+SOURCE_FACE_SET : SourceFaceSet = {}
+FACE_PROFILE_LOCK : threading.Lock = threading.Lock()
+FACE_PROFILE_CROP_SET : FaceProfileCropSet =\
+{
+	'arcface_112_v2': (112, 112),
+	'ffhq_512': (256, 256)
+}
+
+
+def get_face_profile_set() -> FaceProfileSet:
+	return FACE_PROFILE_SET
+
+
+def clear_face_profile_set() -> None:
+	with FACE_PROFILE_LOCK:
+		FACE_PROFILE_SET.clear()
+		SOURCE_FACE_SET.clear()
+
+
+def get_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_face_profile = state_manager.get_item('source_face_profile')
+
+	if source_face_profile:
+		face_profile = get_face_profile(source_face_profile, source_paths)
+
+		if face_profile:
+			return face_profile.get('face')
+		return None
+
+	face_profile_hash = create_face_profile_hash(source_paths)
+
+	with FACE_PROFILE_LOCK:
+		if face_profile_hash not in SOURCE_FACE_SET:
+			SOURCE_FACE_SET[face_profile_hash] = create_source_face(source_paths)
+		return SOURCE_FACE_SET.get(face_profile_hash)
+
+
+def get_source_crop_frame(source_face : Face, warp_template : WarpTemplate) -> VisionFrame:
+	source_face_profile = state_manager.get_item('source_face_profile')
+	source_image_path = get_first(filter_image_paths(state_manager.get_item('source_paths')))
+	crop_width, crop_height = FACE_PROFILE_CROP_SET.get(warp_template)
+
+	if source_face_profile:
+		face_profile = get_face_profile(source_face_profile, state_manager.get_item('source_paths'))
+
+		if face_profile and warp_template in face_profile.get('crop_vision_frames'):
+			if numpy.array_equal(face_profile.get('face').normed_embedding, source_face.normed_embedding) or not source_image_path:
+				return face_profile.get('crop_vision_frames').get(warp_template)
+
+	if source_image_path:
+		source_vision_frame = read_static_image(source_image_path)
+		crop_vision_frame, _ = warp_face_by_face_landmark_5(source_vision_frame, source_face.landmark_set.get('5/68'), warp_template, (crop_width, crop_height))
+		return crop_vision_frame
+	return numpy.zeros((crop_height, crop_width, 3), dtype = numpy.uint8)
+
+
+def get_face_profile(face_profile_path : str, source_paths : List[str]) -> Optional[FaceProfile]:
+	with FACE_PROFILE_LOCK:
+		if face_profile_path not in FACE_PROFILE_SET:
+			face_profile = load_face_profile(face_profile_path)
+
+			if face_profile and filter_image_paths(source_paths) and face_profile.get('source_hash') != create_face_profile_hash(source_paths):
+				face_profile = None
+
+			if not face_profile:
+				face_profile = create_face_profile(source_paths)
+
+				if face_profile:
+					save_face_profile(face_profile_path, face_profile)
+			if face_profile:
+				FACE_PROFILE_SET[face_profile_path] = face_profile
+		return FACE_PROFILE_SET.get(face_profile_path)
+
+
+def create_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_frames = read_static_images(filter_image_paths(source_paths))
+	source_faces = []
+
+	for source_frame in source_frames:
+		temp_faces = get_many_faces([ source_frame ], [ 'embedding' ])
+		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
+		if temp_faces:
+			source_faces.append(get_first(temp_faces))
+	return get_average_face(source_faces)
+
+
+def create_face_profile(source_paths : List[str]) -> Optional[FaceProfile]:
+	source_face = create_source_face(source_paths)
+
+	if source_face:
+		source_vision_frame = read_static_image(get_first(filter_image_paths(source_paths)))
+		face_profile : FaceProfile =\
+		{
+			'face': source_face,
+			'crop_vision_frames': {},
+			'source_hash': create_face_profile_hash(source_paths)
+		}
+
+		for warp_template, crop_size in FACE_PROFILE_CROP_SET.items():
+			face_profile['crop_vision_frames'][warp_template], _ = warp_face_by_face_landmark_5(source_vision_frame, source_face.landmark_set.get('5/68'), warp_template, crop_size)
+		return face_profile
+	return None
+
+
+def create_face_profile_hash(source_paths : List[str]) -> str:
+	face_profile_args : List[Any] =\
+	[
+		state_manager.get_item('face_detector_model'),
+		state_manager.get_item('face_detector_size'),
+		state_manager.get_item('face_detector_angles'),
+		state_manager.get_item('face_detector_score'),
+		state_manager.get_item('face_landmarker_model'),
+		state_manager.get_item('face_landmarker_score'),
+		face_recognizer.get_model_name()
+	]
+
+	for source_path in filter_image_paths(source_paths):
+		with open(source_path, 'rb') as source_file:
+			face_profile_args.append([ os.path.abspath(source_path), create_hash(source_file.read()) ])
+	return create_hash(str(face_profile_args).encode())
+
+
+def load_face_profile(face_profile_path : str) -> Optional[FaceProfile]:
+	if is_file(face_profile_path):
+		with numpy.load(face_profile_path) as face_profile_file:
+			return unpack_face_profile(dict(face_profile_file))
+	return None
+
+
+def save_face_profile(face_profile_path : str, face_profile : FaceProfile) -> bool:
+	if create_directory(os.path.dirname(os.path.abspath(face_profile_path))):
+		temp_face_profile_path = face_profile_path + '.tmp'
+
+		with open(temp_face_profile_path, 'wb') as face_profile_file:
+			numpy.savez(face_profile_file, **pack_face_profile(face_profile)) #type:ignore[arg-type]
+		os.replace(temp_face_profile_path, face_profile_path)
+		return True
+	return False
+
+
+def pack_face_profile(face_profile : FaceProfile) -> FaceProfileArrays:
+	face = face_profile.get('face')
+	face_profile_arrays : FaceProfileArrays =\
+	{
+		'bounding_box': numpy.array(face.bounding_box, dtype = numpy.float32),
+		'detector_score': numpy.array(face.score_set.get('detector'), dtype = numpy.float32),
+		'landmarker_score': numpy.array(face.score_set.get('landmarker'), dtype = numpy.float32),
+		'landmark_5': numpy.array(face.landmark_set.get('5'), dtype = numpy.float32),
+		'landmark_5_68': numpy.array(face.landmark_set.get('5/68'), dtype = numpy.float32),
+		'landmark_68': numpy.array(face.landmark_set.get('68'), dtype = numpy.float32),
+		'landmark_68_5': numpy.array(face.landmark_set.get('68/5'), dtype = numpy.float32),
+		'angle': numpy.array(face.angle, dtype = numpy.int64),
+		'embedding': numpy.array(face.embedding, dtype = numpy.float32),
+		'normed_embedding': numpy.array(face.normed_embedding, dtype = numpy.float32)
+	}
+
+	if face_profile.get('source_hash'):
+		face_profile_arrays['source_hash'] = numpy.array(face_profile.get('source_hash'))
+
+	for warp_template, crop_vision_frame in face_profile.get('crop_vision_frames').items():
+		face_profile_arrays['crop_' + warp_template] = crop_vision_frame
+	return face_profile_arrays
+
+
+def unpack_face_profile(face_profile_arrays : FaceProfileArrays) -> FaceProfile:
+	face_profile : FaceProfile =\
+	{
+		'face': Face(
+			bounding_box = face_profile_arrays.get('bounding_box'),
+			score_set =
+			{
+				'detector': float(face_profile_arrays.get('detector_score')),
+				'landmarker': float(face_profile_arrays.get('landmarker_score'))
+			},
+			landmark_set =
+			{
+				'5': face_profile_arrays.get('landmark_5'),
+				'5/68': face_profile_arrays.get('landmark_5_68'),
+				'68': face_profile_arrays.get('landmark_68'),
+				'68/5': face_profile_arrays.get('landmark_68_5')
+			},
+			angle = int(face_profile_arrays.get('angle')),
+			embedding = face_profile_arrays.get('embedding'),
+			normed_embedding = face_profile_arrays.get('normed_embedding'),
+			gender = None,
+			age = None,
+			race = None
+		),
+		'crop_vision_frames': {},
+		'source_hash': str(face_profile_arrays.get('source_hash')) if 'source_hash' in face_profile_arrays else None
+	}
+
+	for warp_template in FACE_PROFILE_CROP_SET:
+		if 'crop_' + warp_template in face_profile_arrays:
+			face_profile['crop_vision_frames'][warp_template] = face_profile_arrays.get('crop_' + warp_template)
+	return face_profile
@@ -1,14 +1,17 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy
 
 from facefusion import inference_manager
+from facefusion.batch_manager import run_stacked
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
+from facefusion.model_helper import create_model_constants
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import DownloadScope, Embedding, FaceLandmark5, InferencePool, ModelOptions, ModelSet, VisionFrame
+from facefusion.types import DownloadScope, Embedding, FaceLandmark5, InferencePool, ModelConstants, ModelOptions, ModelSet, VisionFrame
 
 
 @lru_cache(maxsize = None)
@@ -40,19 +43,28 @@ def create_static_model_set(download_scope : DownloadScope) -> ModelSet:
 
 
 def get_inference_pool() -> InferencePool:
-	model_names = [ 'arcface' ]
+	model_names = [ get_model_name() ]
 	model_source_set = get_model_options().get('sources')
 
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
 def clear_inference_pool() -> None:
-	model_names = [ 'arcface' ]
+	model_names = [ get_model_name() ]
 	inference_manager.clear_inference_pool(__name__, model_names)
 
 
 def get_model_options() -> ModelOptions:
-	return create_static_model_set('full').get('arcface')
+	return create_static_model_set('full').get(get_model_name())
+
+
+def get_model_name() -> str:
+	return 'arcface'
+
+
+@lru_cache(maxsize = None)
+def get_model_constants() -> ModelConstants:
+	return create_model_constants(get_model_options())
 
 
 def pre_check() -> bool:
@@ -62,26 +74,29 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
-def calc_embedding(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmark5) -> Tuple[Embedding, Embedding]:
-	model_template = get_model_options().get('template')
-	model_size = get_model_options().get('size')
-	crop_vision_frame, matrix = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
-	crop_vision_frame = crop_vision_frame / 127.5 - 1
-	crop_vision_frame = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	embedding = forward(crop_vision_frame)
-	embedding = embedding.ravel()
-	normed_embedding = embedding / numpy.linalg.norm(embedding)
-	return embedding, normed_embedding
+@profile_span('embed')
+def calc_embeddings(temp_vision_frame : VisionFrame, face_landmarks_5 : List[FaceLandmark5]) -> List[Tuple[Embedding, Embedding]]:
+	model_template = get_model_constants().get('template')
+	model_size = get_model_constants().get('size')
+	crop_vision_frames = []
 
+	for face_landmark_5 in face_landmarks_5:
+		crop_vision_frame, _ = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
+		crop_vision_frame = crop_vision_frame / 127.5 - 1
+		crop_vision_frame = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32)
+		crop_vision_frames.append(crop_vision_frame)
 
-def forward(crop_vision_frame : VisionFrame) -> Embedding:
-	face_recognizer = get_inference_pool().get('face_recognizer')
+	embeddings = forward(numpy.stack(crop_vision_frames))
+	embeddings = embeddings.reshape(len(face_landmarks_5), -1)
+	normed_embeddings = embeddings / numpy.linalg.norm(embeddings, axis = 1, keepdims = True)
+	return list(zip(embeddings, normed_embeddings))
 
-	with conditional_thread_semaphore():
-		embedding = face_recognizer.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
 
-	return embedding
+def forward(crop_vision_frames : VisionFrame) -> Embedding:
+	face_recognizer = get_inference_pool().get('face_recognizer')
+	embeddings = run_stacked(face_recognizer,
+	{
+		'input': crop_vision_frames
+	}, conditional_thread_semaphore())[0]
+
+	return embeddings
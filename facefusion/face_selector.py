@@ -1,24 +1,63 @@
-from typing import List
+import threading
+from typing import Dict, List, Tuple
 
 import numpy
 
 from facefusion import state_manager
-from facefusion.types import Face, FaceSelectorOrder, FaceSet, Gender, Race, Score
+from facefusion.types import Embedding, Face, FaceSelectorOrder, FaceSet, Gender, Race, ReferenceMatrix, Score
+
+REFERENCE_MATRIX_SET : Dict[str, Tuple[List[Face], int, ReferenceMatrix]] = {}
+REFERENCE_MATRIX_LOCK : threading.Lock = threading.Lock()
 
 
 def find_similar_faces(faces : List[Face], reference_faces : FaceSet, face_distance : float) -> List[Face]:
 	similar_faces : List[Face] = []
+	faces = [ face for face in faces if face.normed_embedding is not None ]
 
 	if faces and reference_faces:
+		face_matrix = numpy.stack([ face.normed_embedding for face in faces ]).astype(numpy.float32)
+
 		for reference_set in reference_faces:
-			if not similar_faces:
-				for reference_face in reference_faces[reference_set]:
-					for face in faces:
-						if compare_faces(face, reference_face, face_distance):
-							similar_faces.append(face)
+			reference_matrix = get_reference_matrix(reference_set, reference_faces.get(reference_set))
+
+			if not similar_faces and reference_matrix.size:
+				face_distances = numpy.clip((1 - numpy.matmul(reference_matrix, face_matrix.T)) * 0.5, 0, 1)
+				face_matches = numpy.any(face_distances < face_distance, axis = 0)
+				similar_faces = [ face for face, face_match in zip(faces, face_matches) if face_match ]
 	return similar_faces
 
 
+def get_reference_matrix(reference_name : str, reference_faces : List[Face]) -> ReferenceMatrix:
+	reference_total = len(filter_reference_embeddings(reference_faces))
+
+	with REFERENCE_MATRIX_LOCK:
+		reference_matrix_entry = REFERENCE_MATRIX_SET.get(reference_name)
+
+		if reference_matrix_entry and reference_matrix_entry[0] is reference_faces and reference_matrix_entry[1] == reference_total:
+			return reference_matrix_entry[2]
+
+		reference_matrix = create_reference_matrix(reference_faces)
+		REFERENCE_MATRIX_SET[reference_name] = (reference_faces, reference_total, reference_matrix)
+		return reference_matrix
+
+
+def clear_reference_matrix() -> None:
+	with REFERENCE_MATRIX_LOCK:
+		REFERENCE_MATRIX_SET.clear()
+
+
+def filter_reference_embeddings(reference_faces : List[Face]) -> List[Embedding]:
+	return [ reference_face.normed_embedding for reference_face in reference_faces if reference_face and reference_face.normed_embedding is not None ]
+
+
+def create_reference_matrix(reference_faces : List[Face]) -> ReferenceMatrix:
+	reference_embeddings = filter_reference_embeddings(reference_faces)
+
+	if reference_embeddings:
+		return numpy.ascontiguousarray(numpy.stack(reference_embeddings), dtype = numpy.float32)
+	return numpy.empty((0, 0), dtype = numpy.float32)
+
+
 def compare_faces(face : Face, reference_face : Face, face_distance : float) -> bool:
 	current_face_distance = calc_face_distance(face, reference_face)
 	current_face_distance = float(numpy.interp(current_face_distance, [ 0, 2 ], [ 0, 1 ]))
@@ -26,7 +65,7 @@ def compare_faces(face : Face, reference_face : Face, face_distance : float) ->
 
 
 def calc_face_distance(face : Face, reference_face : Face) -> float:
-	if hasattr(face, 'normed_embedding') and hasattr(reference_face, 'normed_embedding'):
+	if face.normed_embedding is not None and reference_face.normed_embedding is not None:
 		return 1 - numpy.dot(face.normed_embedding, reference_face.normed_embedding)
 	return 0
 
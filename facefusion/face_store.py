@@ -1,13 +1,28 @@
+import threading
+from collections import OrderedDict
 from typing import List, Optional
 
+import numpy
+
+from facefusion import process_manager
+from facefusion.frame_manifest import get_frame_manifest
 from facefusion.hash_helper import create_hash
-from facefusion.types import Face, FaceSet, FaceStore, VisionFrame
+from facefusion.types import Face, FaceSet, FaceStore, FaceStoreStats, VisionFrame
 
 FACE_STORE : FaceStore =\
 {
-	'static_faces': {},
+	'static_faces': OrderedDict(),
+	'static_face_stats':
+	{
+		'hits': 0,
+		'misses': 0,
+		'evictions': 0,
+		'size': 0
+	},
 	'reference_faces': {}
 }
+FACE_STORE_LOCK : threading.Lock = threading.Lock()
+STATIC_FACES_LIMIT : int = 256 * 1024 * 1024
 
 
 def get_face_store() -> FaceStore:
@@ -15,22 +30,44 @@ def get_face_store() -> FaceStore:
 
 
 def get_static_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
-	vision_area = crop_vision_area(vision_frame)
-	vision_hash = create_hash(vision_area.tobytes())
-	if vision_hash in FACE_STORE['static_faces']:
-		return FACE_STORE['static_faces'][vision_hash]
+	vision_hash = create_vision_hash(vision_frame)
+
+	with FACE_STORE_LOCK:
+		if vision_hash in FACE_STORE['static_faces']:
+			FACE_STORE['static_faces'].move_to_end(vision_hash)
+			FACE_STORE['static_face_stats']['hits'] += 1
+			return FACE_STORE['static_faces'][vision_hash]
+		FACE_STORE['static_face_stats']['misses'] += 1
 	return None
 
 
 def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
-	vision_area = crop_vision_area(vision_frame)
-	vision_hash = create_hash(vision_area.tobytes())
-	if vision_hash:
+	vision_hash = create_vision_hash(vision_frame)
+	faces_size = calc_faces_size(faces)
+
+	with FACE_STORE_LOCK:
+		if vision_hash in FACE_STORE['static_faces']:
+			FACE_STORE['static_face_stats']['size'] -= calc_faces_size(FACE_STORE['static_faces'].pop(vision_hash))
 		FACE_STORE['static_faces'][vision_hash] = faces
+		FACE_STORE['static_face_stats']['size'] += faces_size
+
+		while FACE_STORE['static_face_stats']['size'] > STATIC_FACES_LIMIT and len(FACE_STORE['static_faces']) > 1:
+			_, evicted_faces = FACE_STORE['static_faces'].popitem(last = False)
+			FACE_STORE['static_face_stats']['size'] -= calc_faces_size(evicted_faces)
+			FACE_STORE['static_face_stats']['evictions'] += 1
 
 
 def clear_static_faces() -> None:
-	FACE_STORE['static_faces'].clear()
+	with FACE_STORE_LOCK:
+		FACE_STORE['static_faces'].clear()
+		FACE_STORE['static_face_stats']['hits'] = 0
+		FACE_STORE['static_face_stats']['misses'] = 0
+		FACE_STORE['static_face_stats']['evictions'] = 0
+		FACE_STORE['static_face_stats']['size'] = 0
+
+
+def get_static_face_stats() -> FaceStoreStats:
+	return FACE_STORE.get('static_face_stats')
 
 
 def get_reference_faces() -> Optional[FaceSet]:
@@ -49,8 +86,20 @@ def clear_reference_faces() -> None:
 	FACE_STORE['reference_faces'].clear()
 
 
-def crop_vision_area(vision_frame : VisionFrame) -> VisionFrame:
+def create_vision_hash(vision_frame : VisionFrame) -> str:
 	height, width = vision_frame.shape[:2]
-	center_y, center_x = height // 2, width // 2
-	vision_area = vision_frame[center_y - 16 : center_y + 16, center_x - 16 : center_x + 16]
-	return vision_area
+	frame_number = process_manager.get_frame_number()
+	vision_hash = create_hash(numpy.ascontiguousarray(vision_frame).data)
+
+	if isinstance(frame_number, int):
+		return str(frame_number) + '-' + str(get_frame_manifest().get('stage')) + '-' + vision_hash
+	return str(width) + 'x' + str(height) + '-' + vision_hash
+
+
+def calc_faces_size(faces : List[Face]) -> int:
+	faces_size = 0
+
+	for face in faces:
+		face_arrays = [ face.bounding_box, face.embedding, face.normed_embedding, *face.landmark_set.values() ]
+		faces_size += sum(face_array.nbytes for face_array in face_arrays if isinstance(face_array, numpy.ndarray))
+	return faces_size
@@ -0,0 +1,178 @@
+import os
+from typing import List, Optional
+
+import numpy
+
+from facefusion import process_manager, state_manager
+from facefusion.face_landmarker import has_face_landmark_68_usage
+from facefusion.filesystem import create_directory, get_file_name, get_file_size, is_file
+from facefusion.hash_helper import create_hash
+from facefusion.types import Embedding, Face, FaceTrack, FaceTrackArrays, FaceTrackSet, Fps, Resolution, VisionFrame
+
+FACE_TRACK : FaceTrack =\
+{
+	'path': None,
+	'resolution': None,
+	'faces': {}
+}
+
+
+def get_face_track() -> FaceTrack:
+	return FACE_TRACK
+
+
+def init_face_track(face_track_path : str, resolution : Resolution) -> bool:
+	FACE_TRACK['path'] = face_track_path
+	FACE_TRACK['resolution'] = resolution
+	FACE_TRACK['faces'].clear()
+	return load_face_track(face_track_path)
+
+
+def clear_face_track() -> None:
+	FACE_TRACK['path'] = None
+	FACE_TRACK['resolution'] = None
+	FACE_TRACK['faces'].clear()
+
+
+def get_track_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
+	frame_number = resolve_track_frame_number(vision_frame)
+
+	if isinstance(frame_number, int):
+		return FACE_TRACK['faces'].get(frame_number)
+	return None
+
+
+def set_track_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	frame_number = resolve_track_frame_number(vision_frame)
+
+	if isinstance(frame_number, int):
+		FACE_TRACK['faces'][frame_number] = faces
+
+
+def resolve_track_frame_number(vision_frame : VisionFrame) -> Optional[int]:
+	frame_number = process_manager.get_frame_number()
+
+	if FACE_TRACK['resolution'] and isinstance(frame_number, int):
+		width, height = FACE_TRACK['resolution']
+		if vision_frame.shape[:2] == (height, width):
+			return frame_number
+	return None
+
+
+def create_face_track_hash(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> str:
+	face_track_args =\
+	[
+		os.path.abspath(target_path),
+		get_file_size(target_path),
+		os.path.getmtime(target_path),
+		temp_video_resolution,
+		temp_video_fps,
+		trim_frame_start,
+		trim_frame_end,
+		state_manager.get_item('face_detector_model'),
+		state_manager.get_item('face_detector_size'),
+		state_manager.get_item('face_detector_angles'),
+		state_manager.get_item('face_detector_angle_mode'),
+		state_manager.get_item('face_detector_score'),
+		state_manager.get_item('face_detector_interval'),
+		state_manager.get_item('face_detector_proxy_size'),
+		state_manager.get_item('face_landmarker_model'),
+		state_manager.get_item('face_landmarker_mode'),
+		state_manager.get_item('face_landmarker_score'),
+		has_face_landmark_68_usage()
+	]
+	return create_hash(str(face_track_args).encode())
+
+
+def get_face_track_path(target_path : str, face_track_hash : str) -> str:
+	face_track_name = get_file_name(target_path) + '-' + face_track_hash + '.npz'
+	return os.path.join(state_manager.get_item('temp_path'), 'facefusion', face_track_name)
+
+
+def load_face_track(face_track_path : str) -> bool:
+	if is_file(face_track_path):
+		with numpy.load(face_track_path) as face_track_file:
+			FACE_TRACK['faces'].update(unpack_track_faces(dict(face_track_file)))
+		return True
+	return False
+
+
+def save_face_track() -> bool:
+	face_track_path = FACE_TRACK.get('path')
+
+	if face_track_path and FACE_TRACK['faces'] and create_directory(os.path.dirname(face_track_path)):
+		with open(face_track_path, 'wb') as face_track_file:
+			numpy.savez(face_track_file, **pack_track_faces(FACE_TRACK['faces'])) #type:ignore[arg-type]
+		return True
+	return False
+
+
+def pack_track_faces(track_faces : FaceTrackSet) -> FaceTrackArrays:
+	frame_numbers = sorted(track_faces.keys())
+	faces = [ face for frame_number in frame_numbers for face in track_faces.get(frame_number) ]
+	embedding_size = max([ len(face.embedding) for face in faces if face.embedding is not None ], default = 0)
+	face_counts = [ len(track_faces.get(frame_number)) for frame_number in frame_numbers ]
+
+	face_track_arrays : FaceTrackArrays =\
+	{
+		'frame_numbers': numpy.array(frame_numbers, dtype = numpy.int64),
+		'face_counts': numpy.array(face_counts, dtype = numpy.int64),
+		'bounding_boxes': numpy.array([ face.bounding_box for face in faces ], dtype = numpy.float32).reshape(-1, 4),
+		'detector_scores': numpy.array([ face.score_set.get('detector') for face in faces ], dtype = numpy.float32),
+		'landmarker_scores': numpy.array([ face.score_set.get('landmarker') for face in faces ], dtype = numpy.float32),
+		'landmarks_5': numpy.array([ face.landmark_set.get('5') for face in faces ], dtype = numpy.float32).reshape(-1, 5, 2),
+		'landmarks_5_68': numpy.array([ face.landmark_set.get('5/68') for face in faces ], dtype = numpy.float32).reshape(-1, 5, 2),
+		'landmarks_68': numpy.array([ face.landmark_set.get('68') for face in faces ], dtype = numpy.float32).reshape(-1, 68, 2),
+		'landmarks_68_5': numpy.array([ face.landmark_set.get('68/5') for face in faces ], dtype = numpy.float32).reshape(-1, 68, 2),
+		'angles': numpy.array([ face.angle for face in faces ], dtype = numpy.int64),
+		'embeddings': numpy.array([ pack_face_embedding(face.embedding, embedding_size) for face in faces ], dtype = numpy.float32).reshape(len(faces), embedding_size),
+		'normed_embeddings': numpy.array([ pack_face_embedding(face.normed_embedding, embedding_size) for face in faces ], dtype = numpy.float32).reshape(len(faces), embedding_size),
+		'genders': numpy.array([ face.gender or '' for face in faces ], dtype = numpy.str_),
+		'ages': numpy.array([ (face.age.start, face.age.stop) if face.age else (0, 0) for face in faces ], dtype = numpy.int64).reshape(-1, 2),
+		'races': numpy.array([ face.race or '' for face in faces ], dtype = numpy.str_)
+	}
+	return face_track_arrays
+
+
+def unpack_track_faces(face_track_arrays : FaceTrackArrays) -> FaceTrackSet:
+	track_faces : FaceTrackSet = {}
+	face_offsets = numpy.concatenate([ [ 0 ], numpy.cumsum(face_track_arrays.get('face_counts')) ])
+
+	for index, frame_number in enumerate(face_track_arrays.get('frame_numbers').tolist()):
+		track_faces[frame_number] = []
+
+		for face_index in range(face_offsets[index], face_offsets[index + 1]):
+			track_faces[frame_number].append(Face(
+				bounding_box = face_track_arrays.get('bounding_boxes')[face_index],
+				score_set =
+				{
+					'detector': float(face_track_arrays.get('detector_scores')[face_index]),
+					'landmarker': float(face_track_arrays.get('landmarker_scores')[face_index])
+				},
+				landmark_set =
+				{
+					'5': face_track_arrays.get('landmarks_5')[face_index],
+					'5/68': face_track_arrays.get('landmarks_5_68')[face_index],
+					'68': face_track_arrays.get('landmarks_68')[face_index],
+					'68/5': face_track_arrays.get('landmarks_68_5')[face_index]
+				},
+				angle = int(face_track_arrays.get('angles')[face_index]),
+				embedding = unpack_face_embedding(face_track_arrays.get('embeddings')[face_index]),
+				normed_embedding = unpack_face_embedding(face_track_arrays.get('normed_embeddings')[face_index]),
+				gender = str(face_track_arrays.get('genders')[face_index]) or None,
+				age = range(*face_track_arrays.get('ages')[face_index].tolist()) or None,
+				race = str(face_track_arrays.get('races')[face_index]) or None
+			))
+	return track_faces
+
+
+def pack_face_embedding(embedding : Optional[Embedding], embedding_size : int) -> Embedding:
+	if embedding is None:
+		return numpy.full(embedding_size, numpy.nan)
+	return embedding
+
+
+def unpack_face_embedding(embedding : Embedding) -> Optional[Embedding]:
+	if embedding.size and not numpy.isnan(embedding).any():
+		return embedding
+	return None
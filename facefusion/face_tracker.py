@@ -0,0 +1,161 @@
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy
+
+from facefusion import process_manager, state_manager
+from facefusion.face_helper import calc_bounding_box_iou, transform_bounding_box, transform_points
+from facefusion.types import Face, FaceLandmarkSet, FaceTrackerFrame, FaceTrackerSet, Matrix, VisionFrame
+
+FACE_TRACKER = threading.local()
+FACE_TRACKER_PASS : int = 0
+FACE_TRACKER_SIZE : int = 640
+SCENE_CUT_SCORE : float = 0.7
+TRACK_ERROR_LIMIT : float = 1.0
+TRACK_IOU_LIMIT : float = 0.5
+TRACK_AMBIGUOUS_LIMIT : float = 0.1
+
+
+def get_face_tracker() -> FaceTrackerSet:
+	if getattr(FACE_TRACKER, 'tracker_pass', None) != FACE_TRACKER_PASS:
+		FACE_TRACKER.tracker_pass = FACE_TRACKER_PASS
+		FACE_TRACKER.tracker_set = {}
+	return FACE_TRACKER.tracker_set
+
+
+def clear_face_tracker() -> None:
+	global FACE_TRACKER_PASS
+
+	FACE_TRACKER_PASS += 1
+
+
+def get_tracker_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
+	frame_number = process_manager.get_frame_number()
+	face_detector_interval = state_manager.get_item('face_detector_interval')
+
+	if face_detector_interval and isinstance(frame_number, int):
+		previous_tracker_frame = get_tracker_frame(frame_number - 1)
+
+		if previous_tracker_frame and frame_number - previous_tracker_frame.get('keyframe_number') < face_detector_interval:
+			tracker_frame = create_tracker_frame(vision_frame, previous_tracker_frame.get('keyframe_number'), [])
+
+			if not is_scene_cut(previous_tracker_frame, tracker_frame):
+				faces = propagate_faces(previous_tracker_frame, tracker_frame, calc_tracker_scale(vision_frame))
+
+				if isinstance(faces, list):
+					tracker_frame['faces'] = faces
+					store_tracker_frame(frame_number, tracker_frame)
+				return faces
+	return None
+
+
+def inherit_faces(vision_frame : VisionFrame, faces : List[Face]) -> List[Face]:
+	frame_number = process_manager.get_frame_number()
+
+	if state_manager.get_item('face_detector_interval') and isinstance(frame_number, int):
+		previous_tracker_frame = get_tracker_frame(frame_number - 1)
+
+		if previous_tracker_frame and previous_tracker_frame.get('faces'):
+			tracker_frame = create_tracker_frame(vision_frame, frame_number, faces)
+
+			if not is_scene_cut(previous_tracker_frame, tracker_frame):
+				return [ inherit_face(face, previous_tracker_frame.get('faces')) for face in faces ]
+	return faces
+
+
+def inherit_face(face : Face, previous_faces : List[Face]) -> Face:
+	face_ious = [ calc_bounding_box_iou(face.bounding_box, previous_face.bounding_box) for previous_face in previous_faces ]
+	face_index = int(numpy.argmax(face_ious))
+	is_ambiguous = sum(face_iou > TRACK_AMBIGUOUS_LIMIT for face_iou in face_ious) > 1
+
+	if face_ious[face_index] > TRACK_IOU_LIMIT and not is_ambiguous:
+		previous_face = previous_faces[face_index]
+		return face._replace(
+			embedding = previous_face.embedding,
+			normed_embedding = previous_face.normed_embedding,
+			gender = previous_face.gender,
+			age = previous_face.age,
+			race = previous_face.race
+		)
+	return face
+
+
+def set_tracker_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	frame_number = process_manager.get_frame_number()
+
+	if state_manager.get_item('face_detector_interval') and isinstance(frame_number, int):
+		store_tracker_frame(frame_number, create_tracker_frame(vision_frame, frame_number, faces))
+
+
+def get_tracker_frame(frame_number : int) -> Optional[FaceTrackerFrame]:
+	return get_face_tracker().get(frame_number)
+
+
+def store_tracker_frame(frame_number : int, tracker_frame : FaceTrackerFrame) -> None:
+	face_tracker = get_face_tracker()
+	face_tracker.clear()
+	face_tracker[frame_number] = tracker_frame
+
+
+def create_tracker_frame(vision_frame : VisionFrame, keyframe_number : int, faces : List[Face]) -> FaceTrackerFrame:
+	tracker_scale = calc_tracker_scale(vision_frame)
+	tracker_vision_frame = cv2.resize(vision_frame, None, fx = tracker_scale, fy = tracker_scale, interpolation = cv2.INTER_AREA)
+	tracker_vision_frame = cv2.cvtColor(tracker_vision_frame, cv2.COLOR_BGR2GRAY)
+	tracker_histogram = cv2.calcHist([ tracker_vision_frame ], [ 0 ], None, [ 32 ], [ 0, 256 ])
+	tracker_histogram = cv2.normalize(tracker_histogram, tracker_histogram)
+	tracker_frame : FaceTrackerFrame =\
+	{
+		'keyframe_number': keyframe_number,
+		'vision_frame': tracker_vision_frame,
+		'histogram': tracker_histogram,
+		'faces': faces
+	}
+	return tracker_frame
+
+
+def calc_tracker_scale(vision_frame : VisionFrame) -> float:
+	return min(FACE_TRACKER_SIZE / max(vision_frame.shape[:2]), 1.0)
+
+
+def is_scene_cut(previous_tracker_frame : FaceTrackerFrame, tracker_frame : FaceTrackerFrame) -> bool:
+	if previous_tracker_frame.get('vision_frame').shape == tracker_frame.get('vision_frame').shape:
+		return cv2.compareHist(previous_tracker_frame.get('histogram'), tracker_frame.get('histogram'), cv2.HISTCMP_CORREL) < SCENE_CUT_SCORE
+	return True
+
+
+def propagate_faces(previous_tracker_frame : FaceTrackerFrame, tracker_frame : FaceTrackerFrame, tracker_scale : float) -> Optional[List[Face]]:
+	previous_faces = previous_tracker_frame.get('faces')
+
+	if previous_faces:
+		previous_points = numpy.concatenate([ previous_face.landmark_set.get('5/68') for previous_face in previous_faces ]).reshape(-1, 1, 2).astype(numpy.float32) * tracker_scale
+		track_points, track_status, _ = cv2.calcOpticalFlowPyrLK(previous_tracker_frame.get('vision_frame'), tracker_frame.get('vision_frame'), previous_points, None, winSize = (21, 21), maxLevel = 3)
+		backward_points, backward_status, _ = cv2.calcOpticalFlowPyrLK(tracker_frame.get('vision_frame'), previous_tracker_frame.get('vision_frame'), track_points, None, winSize = (21, 21), maxLevel = 3)
+		track_errors = numpy.linalg.norm(backward_points - previous_points, axis = -1)
+
+		if numpy.all(track_status) and numpy.all(backward_status) and numpy.all(track_errors < TRACK_ERROR_LIMIT):
+			faces = []
+			face_landmarks_5 = track_points.reshape(-1, 5, 2) / tracker_scale
+
+			for previous_face, face_landmark_5 in zip(previous_faces, face_landmarks_5):
+				affine_matrix, _ = cv2.estimateAffinePartial2D(previous_face.landmark_set.get('5/68').astype(numpy.float32), face_landmark_5)
+
+				if affine_matrix is None:
+					return None
+				faces.append(transform_face(previous_face, affine_matrix))
+			return faces
+	return None
+
+
+def transform_face(face : Face, affine_matrix : Matrix) -> Face:
+	face_landmark_set : FaceLandmarkSet =\
+	{
+		'5': transform_points(face.landmark_set.get('5'), affine_matrix),
+		'5/68': transform_points(face.landmark_set.get('5/68'), affine_matrix),
+		'68': transform_points(face.landmark_set.get('68'), affine_matrix),
+		'68/5': transform_points(face.landmark_set.get('68/5'), affine_matrix)
+	}
+	return face._replace(
+		bounding_box = transform_bounding_box(face.bounding_box, affine_matrix),
+		landmark_set = face_landmark_set
+	)
@@ -4,14 +4,16 @@ import tempfile
 from functools import partial
 from typing import List, Optional, cast
 
+import numpy
 from tqdm import tqdm
 
 import facefusion.choices
 from facefusion import ffmpeg_builder, logger, process_manager, state_manager, wording
 from facefusion.filesystem import get_file_format, remove_file
+from facefusion.profiler import profile_span
 from facefusion.temp_helper import get_temp_file_path, get_temp_frames_pattern
-from facefusion.types import AudioBuffer, AudioEncoder, Commands, EncoderSet, Fps, UpdateProgress, VideoEncoder, VideoFormat
-from facefusion.vision import detect_video_duration, detect_video_fps, predict_video_frame_total
+from facefusion.types import AudioBuffer, AudioEncoder, Commands, EncoderSet, Fps, UpdateProgress, VideoEncoder, VideoFormat, VisionFrame
+from facefusion.vision import detect_video_duration, detect_video_fps, predict_video_frame_total, unpack_resolution
 
 
 def run_ffmpeg_with_progress(commands : Commands, update_progress : UpdateProgress) -> subprocess.Popen[bytes]:
@@ -106,6 +108,41 @@ def get_available_encoder_set() -> EncoderSet:
 	return available_encoder_set
 
 
+def detect_video_keyframes(target_path : str) -> List[int]:
+	video_fps = detect_video_fps(target_path)
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.skip_non_keyframes(),
+		ffmpeg_builder.set_input(target_path),
+		ffmpeg_builder.select_media_stream('0:v:0'),
+		ffmpeg_builder.prevent_frame_drop(),
+		ffmpeg_builder.checksum_frames(),
+		ffmpeg_builder.cast_stream()
+	)
+	process = open_ffmpeg(commands)
+	stdout, _ = process.communicate()
+
+	if process.returncode == 0 and video_fps:
+		return parse_video_keyframes(stdout.decode(), video_fps)
+	return []
+
+
+def parse_video_keyframes(checksum_output : str, video_fps : Fps) -> List[int]:
+	keyframe_times = []
+	time_base = 1.0
+
+	for line in checksum_output.splitlines():
+		if line.startswith('#tb 0:'):
+			numerator, denominator = line.split(':')[1].strip().split('/')
+			time_base = int(numerator) / int(denominator)
+		if line.startswith('0,'):
+			keyframe_times.append(int(line.split(',')[2]) * time_base)
+
+	if keyframe_times:
+		return sorted({ round((keyframe_time - keyframe_times[0]) * video_fps) for keyframe_time in keyframe_times })
+	return []
+
+
+@profile_span('decode')
 def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
 	extract_frame_total = predict_video_frame_total(target_path, temp_video_fps, trim_frame_start, trim_frame_end)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
@@ -123,6 +160,75 @@ def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fp
 		return process.returncode == 0
 
 
+def open_extract_stream(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> subprocess.Popen[bytes]:
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_input(target_path),
+		ffmpeg_builder.set_media_resolution(temp_video_resolution),
+		ffmpeg_builder.select_frame_range(trim_frame_start, trim_frame_end, temp_video_fps),
+		ffmpeg_builder.prevent_frame_drop(),
+		ffmpeg_builder.pipe_video(),
+		ffmpeg_builder.cast_stream()
+	)
+	return open_ffmpeg(commands)
+
+
+def open_merge_stream(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps) -> subprocess.Popen[bytes]:
+	output_video_encoder = state_manager.get_item('output_video_encoder')
+	output_video_quality = state_manager.get_item('output_video_quality')
+	output_video_preset = state_manager.get_item('output_video_preset')
+	temp_video_path = get_temp_file_path(target_path)
+	temp_video_format = cast(VideoFormat, get_file_format(temp_video_path))
+
+	output_video_encoder = fix_video_encoder(temp_video_format, output_video_encoder)
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.pipe_video(),
+		ffmpeg_builder.set_media_resolution(temp_video_resolution),
+		ffmpeg_builder.set_input_fps(temp_video_fps),
+		ffmpeg_builder.set_input('-'),
+		ffmpeg_builder.set_media_resolution(output_video_resolution),
+		ffmpeg_builder.set_video_encoder(output_video_encoder),
+		ffmpeg_builder.set_video_quality(output_video_encoder, output_video_quality),
+		ffmpeg_builder.set_video_preset(output_video_encoder, output_video_preset),
+		ffmpeg_builder.set_video_fps(output_video_fps),
+		ffmpeg_builder.set_pixel_format(output_video_encoder),
+		ffmpeg_builder.set_video_colorspace('bt709'),
+		ffmpeg_builder.force_output(temp_video_path)
+	)
+	return open_ffmpeg(commands)
+
+
+@profile_span('decode')
+def read_stream_frame(process : subprocess.Popen[bytes], temp_video_resolution : str) -> Optional[VisionFrame]:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	frame_buffer_size = temp_video_width * temp_video_height * 3
+	frame_buffer = bytearray(process.stdout.read(frame_buffer_size))
+
+	if len(frame_buffer) == frame_buffer_size:
+		return numpy.frombuffer(frame_buffer, dtype = numpy.uint8).reshape(temp_video_height, temp_video_width, 3)
+	return None
+
+
+@profile_span('write')
+def write_stream_frame(process : subprocess.Popen[bytes], vision_frame : VisionFrame) -> bool:
+	try:
+		process.stdin.write(vision_frame.tobytes())
+	except OSError:
+		return False
+	return True
+
+
+def close_stream(process : subprocess.Popen[bytes], is_finished : bool) -> bool:
+	try:
+		process.stdin.close()
+	except OSError:
+		pass
+
+	if not is_finished:
+		process.terminate()
+	process.wait()
+	return process.returncode == 0
+
+
 def copy_image(target_path : str, temp_image_resolution : str) -> bool:
 	temp_image_path = get_temp_file_path(target_path)
 	commands = ffmpeg_builder.chain(
@@ -143,7 +249,9 @@ def finalize_image(target_path : str, output_path : str, output_image_resolution
 		ffmpeg_builder.set_image_quality(target_path, output_image_quality),
 		ffmpeg_builder.force_output(output_path)
 	)
-	return run_ffmpeg(commands).returncode == 0
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
 
 
 def read_audio_buffer(target_path : str, audio_sample_rate : int, audio_sample_size : int, audio_channel_total : int) -> Optional[AudioBuffer]:
@@ -186,7 +294,9 @@ def restore_audio(target_path : str, output_path : str, trim_frame_start : int,
 		ffmpeg_builder.set_video_duration(temp_video_duration),
 		ffmpeg_builder.force_output(output_path)
 	)
-	return run_ffmpeg(commands).returncode == 0
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
 
 
 def replace_audio(target_path : str, audio_path : str, output_path : str) -> bool:
@@ -208,9 +318,12 @@ def replace_audio(target_path : str, audio_path : str, output_path : str) -> boo
 		ffmpeg_builder.set_video_duration(temp_video_duration),
 		ffmpeg_builder.force_output(output_path)
 	)
-	return run_ffmpeg(commands).returncode == 0
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
 
 
+@profile_span('encode')
 def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
 	output_video_encoder = state_manager.get_item('output_video_encoder')
 	output_video_quality = state_manager.get_item('output_video_quality')
@@ -239,6 +352,18 @@ def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution
 		return process.returncode == 0
 
 
+def stack_video(target_path : str, output_path : str, stack_total : int) -> bool:
+	commands = ffmpeg_builder.chain(
+		*[ ffmpeg_builder.set_input(target_path) for _ in range(stack_total) ],
+		ffmpeg_builder.stack_video(stack_total),
+		ffmpeg_builder.ignore_audio_stream(),
+		ffmpeg_builder.force_output(output_path)
+	)
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
+
+
 def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
 	concat_video_path = tempfile.mktemp()
 
@@ -60,6 +60,14 @@ def set_stream_quality(stream_quality : int) -> Commands:
 	return [ '-b:v', str(stream_quality) + 'k' ]
 
 
+def skip_non_keyframes() -> Commands:
+	return [ '-skip_frame', 'nokey' ]
+
+
+def checksum_frames() -> Commands:
+	return [ '-f', 'framecrc' ]
+
+
 def unsafe_concat() -> Commands:
 	return [ '-f', 'concat', '-safe', '0' ]
 
@@ -216,10 +224,22 @@ def capture_video() -> Commands:
 	return [ '-f', 'rawvideo', '-pix_fmt', 'rgb24' ]
 
 
+def pipe_video() -> Commands:
+	return [ '-f', 'rawvideo', '-pix_fmt', 'bgr24' ]
+
+
 def ignore_video_stream() -> Commands:
 	return [ '-vn' ]
 
 
+def ignore_audio_stream() -> Commands:
+	return [ '-an' ]
+
+
+def stack_video(stack_total : int) -> Commands:
+	return [ '-filter_complex', 'hstack=inputs=' + str(stack_total) ]
+
+
 def map_nvenc_preset(video_preset : VideoPreset) -> Optional[str]:
 	if video_preset in [ 'ultrafast', 'superfast', 'veryfast', 'faster', 'fast' ]:
 		return 'fast'
@@ -0,0 +1,153 @@
+import os
+import threading
+from typing import List, Optional, Set
+
+from facefusion import state_manager
+from facefusion.filesystem import get_file_size, is_file, remove_file, resolve_file_pattern
+from facefusion.hash_helper import create_hash
+from facefusion.jobs import job_store
+from facefusion.json import read_json, write_json
+from facefusion.temp_helper import get_temp_directory_path
+from facefusion.types import Fps, FrameManifest, QueuePayload
+
+FRAME_MANIFEST : FrameManifest =\
+{
+	'path': None,
+	'hash': None,
+	'stage': None,
+	'frame_numbers': set(),
+	'deferred_frame_numbers': None
+}
+FRAME_MANIFEST_LOCK : threading.Lock = threading.Lock()
+
+
+def get_frame_manifest() -> FrameManifest:
+	return FRAME_MANIFEST
+
+
+def init_frame_manifest(target_path : str, frame_manifest_hash : str) -> bool:
+	FRAME_MANIFEST['path'] = get_frame_manifest_path(target_path)
+	FRAME_MANIFEST['hash'] = frame_manifest_hash
+	FRAME_MANIFEST['stage'] = None
+	FRAME_MANIFEST['frame_numbers'] = set()
+	frame_manifest_content = read_json(FRAME_MANIFEST.get('path'))
+	return bool(frame_manifest_content and frame_manifest_content.get('hash') == frame_manifest_hash)
+
+
+def clear_frame_manifest() -> None:
+	FRAME_MANIFEST['path'] = None
+	FRAME_MANIFEST['hash'] = None
+	FRAME_MANIFEST['stage'] = None
+	FRAME_MANIFEST['frame_numbers'] = set()
+	FRAME_MANIFEST['deferred_frame_numbers'] = None
+
+
+def defer_frame_manifest() -> None:
+	FRAME_MANIFEST['deferred_frame_numbers'] = []
+
+
+def pop_deferred_frame_numbers() -> List[int]:
+	with FRAME_MANIFEST_LOCK:
+		deferred_frame_numbers = FRAME_MANIFEST.get('deferred_frame_numbers') or []
+		FRAME_MANIFEST['deferred_frame_numbers'] = []
+	return deferred_frame_numbers
+
+
+def create_frame_manifest_hash(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> str:
+	frame_manifest_args =\
+	[
+		os.path.abspath(target_path),
+		get_file_size(target_path),
+		os.path.getmtime(target_path),
+		temp_video_resolution,
+		temp_video_fps,
+		trim_frame_start,
+		trim_frame_end
+	]
+	frame_manifest_args.extend(state_manager.get_item(step_key) for step_key in job_store.get_step_keys() if step_key != 'output_path') #type:ignore[arg-type]
+	return create_hash(str(frame_manifest_args).encode())
+
+
+def get_frame_manifest_path(target_path : str) -> str:
+	return os.path.join(get_temp_directory_path(target_path), 'manifest.json')
+
+
+def get_frame_manifest_stage_path(stage : str) -> str:
+	return os.path.join(os.path.dirname(FRAME_MANIFEST.get('path')), 'manifest-' + stage + '.log')
+
+
+def create_frame_manifest() -> bool:
+	if FRAME_MANIFEST.get('path'):
+		remove_frame_manifest()
+		return write_json(FRAME_MANIFEST.get('path'),
+		{
+			'hash': FRAME_MANIFEST.get('hash'),
+			'stages': []
+		})
+	return False
+
+
+def remove_frame_manifest() -> bool:
+	if FRAME_MANIFEST.get('path'):
+		for frame_manifest_stage_path in resolve_file_pattern(get_frame_manifest_stage_path('*')):
+			remove_file(frame_manifest_stage_path)
+		if is_file(FRAME_MANIFEST.get('path')):
+			return remove_file(FRAME_MANIFEST.get('path'))
+	return True
+
+
+def start_frame_manifest_stage(stage : str) -> bool:
+	FRAME_MANIFEST['stage'] = None
+	FRAME_MANIFEST['frame_numbers'] = set()
+	frame_manifest_content = read_json(FRAME_MANIFEST.get('path')) if FRAME_MANIFEST.get('path') else None
+
+	if frame_manifest_content:
+		if stage in frame_manifest_content.get('stages'):
+			return False
+		FRAME_MANIFEST['stage'] = stage
+		FRAME_MANIFEST['frame_numbers'] = read_frame_manifest_stage(stage)
+	return True
+
+
+def finish_frame_manifest_stage(stage : str) -> bool:
+	frame_manifest_content = read_json(FRAME_MANIFEST.get('path')) if FRAME_MANIFEST.get('path') else None
+	FRAME_MANIFEST['stage'] = None
+	FRAME_MANIFEST['frame_numbers'] = set()
+
+	if frame_manifest_content:
+		frame_manifest_content.get('stages').append(stage)
+		return write_json(FRAME_MANIFEST.get('path'), frame_manifest_content)
+	return False
+
+
+def read_frame_manifest_stage(stage : str) -> Set[int]:
+	frame_manifest_stage_path = get_frame_manifest_stage_path(stage)
+	frame_numbers = set()
+
+	if is_file(frame_manifest_stage_path):
+		with open(frame_manifest_stage_path) as frame_manifest_stage_file:
+			for line in frame_manifest_stage_file:
+				if line.strip().isdigit():
+					frame_numbers.add(int(line))
+	return frame_numbers
+
+
+def filter_frame_manifest_payloads(queue_payloads : List[QueuePayload]) -> List[QueuePayload]:
+	return [ queue_payload for queue_payload in queue_payloads if queue_payload.get('frame_number') not in FRAME_MANIFEST.get('frame_numbers') ]
+
+
+def mark_frame_manifest(frame_number : Optional[int]) -> None:
+	if isinstance(frame_number, int):
+		mark_frame_manifest_frames([ frame_number ])
+
+
+def mark_frame_manifest_frames(frame_numbers : List[int]) -> None:
+	stage = FRAME_MANIFEST.get('stage')
+
+	if stage and frame_numbers:
+		with FRAME_MANIFEST_LOCK:
+			if isinstance(FRAME_MANIFEST.get('deferred_frame_numbers'), list):
+				FRAME_MANIFEST.get('deferred_frame_numbers').extend(frame_numbers)
+			else:
+				with open(get_frame_manifest_stage_path(stage), 'a') as frame_manifest_stage_file:
+					frame_manifest_stage_file.write(''.join(str(frame_number) + os.linesep for frame_number in frame_numbers))
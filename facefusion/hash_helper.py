@@ -1,11 +1,11 @@
 import os
 import zlib
-from typing import Optional
+from typing import Optional, Union
 
 from facefusion.filesystem import get_file_name, is_file
 
 
-def create_hash(content : bytes) -> str:
+def create_hash(content : Union[bytes, memoryview]) -> str:
 	return format(zlib.crc32(content), '08x')
 
 
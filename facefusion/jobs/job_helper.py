@@ -1,8 +1,9 @@
 import os
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from facefusion.filesystem import get_file_extension, get_file_name
+from facefusion.types import Fps, SegmentRange
 
 
 def get_step_output_path(job_id : str, step_index : int, output_path : str) -> Optional[str]:
@@ -16,3 +17,28 @@ def get_step_output_path(job_id : str, step_index : int, output_path : str) -> O
 
 def suggest_job_id(job_prefix : str = 'job') -> str:
 	return job_prefix + '-' + datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
+
+
+def filter_keyframe_numbers(keyframe_numbers : List[int], video_fps : Fps, temp_video_fps : Fps) -> List[int]:
+	temp_keyframe_numbers = []
+
+	for keyframe_number in keyframe_numbers:
+		temp_frame_number = keyframe_number * temp_video_fps / video_fps
+
+		if abs(temp_frame_number - round(temp_frame_number)) < 1e-3:
+			temp_keyframe_numbers.append(keyframe_number)
+	return temp_keyframe_numbers
+
+
+def create_segment_ranges(keyframe_numbers : List[int], frame_start : int, frame_end : int, segment_frame_total : int) -> List[SegmentRange]:
+	segment_ranges : List[SegmentRange] = []
+	segment_start = frame_start
+
+	for keyframe_number in sorted(keyframe_numbers):
+		if keyframe_number - segment_start >= segment_frame_total and keyframe_number < frame_end:
+			segment_ranges.append((segment_start, keyframe_number))
+			segment_start = keyframe_number
+
+	if segment_start < frame_end:
+		segment_ranges.append((segment_start, frame_end))
+	return segment_ranges
@@ -7,7 +7,7 @@ from facefusion.date_helper import get_current_date_time
 from facefusion.filesystem import create_directory, get_file_name, is_directory, is_file, move_file, remove_directory, remove_file, resolve_file_pattern
 from facefusion.jobs.job_helper import get_step_output_path
 from facefusion.json import read_json, write_json
-from facefusion.types import Args, Job, JobSet, JobStatus, JobStep, JobStepStatus
+from facefusion.types import Args, Job, JobSet, JobStatus, JobStep, JobStepStatus, SegmentRange
 
 JOBS_PATH : Optional[str] = None
 
@@ -124,6 +124,23 @@ def add_step(job_id : str, step_args : Args) -> bool:
 	return False
 
 
+def add_segment_steps(job_id : str, step_args : Args, segment_ranges : List[SegmentRange]) -> bool:
+	job = read_job_file(job_id)
+
+	if job and segment_ranges:
+		for trim_frame_start, trim_frame_end in segment_ranges:
+			segment_step_args = copy(step_args)
+			segment_step_args['trim_frame_start'] = trim_frame_start
+			segment_step_args['trim_frame_end'] = trim_frame_end
+			job.get('steps').append(
+			{
+				'args': segment_step_args,
+				'status': 'drafted'
+			})
+		return update_job_file(job_id, job)
+	return False
+
+
 def remix_step(job_id : str, step_index : int, step_args : Args) -> bool:
 	steps = get_steps(job_id)
 	step_args = copy(step_args)
@@ -1,18 +1,25 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from typing import Any, Dict, List
+
+from facefusion import logger, state_manager
+from facefusion.app_context import pin_app_context, set_app_context
 from facefusion.ffmpeg import concat_video
-from facefusion.filesystem import are_images, are_videos, move_file, remove_file
+from facefusion.filesystem import are_images, are_videos, is_file, move_file, remove_file
 from facefusion.jobs import job_helper, job_manager
-from facefusion.types import JobOutputSet, JobStep, ProcessStep
+from facefusion.types import Args, JobOutputSet, JobStep, ProcessStep
 
 
 def run_job(job_id : str, process_step : ProcessStep) -> bool:
 	queued_job_ids = job_manager.find_job_ids('queued')
 
 	if job_id in queued_job_ids:
-		if run_steps(job_id, process_step) and finalize_steps(job_id):
-			clean_steps(job_id)
-			return job_manager.move_job_file(job_id, 'completed')
-		clean_steps(job_id)
-		job_manager.move_job_file(job_id, 'failed')
+		with pin_app_context():
+			if run_steps(job_id, process_step) and finalize_steps(job_id):
+				clean_steps(job_id)
+				return job_manager.move_job_file(job_id, 'completed')
+			job_manager.move_job_file(job_id, 'failed')
 	return False
 
 
@@ -34,7 +41,7 @@ def retry_job(job_id : str, process_step : ProcessStep) -> bool:
 	failed_job_ids = job_manager.find_job_ids('failed')
 
 	if job_id in failed_job_ids:
-		return job_manager.set_steps_status(job_id, 'queued') and job_manager.move_job_file(job_id, 'queued') and run_job(job_id, process_step)
+		return queue_steps(job_id) and job_manager.move_job_file(job_id, 'queued') and run_job(job_id, process_step)
 	return False
 
 
@@ -64,17 +71,73 @@ def run_step(job_id : str, step_index : int, step : JobStep, process_step : Proc
 	return False
 
 
+def init_step_worker(state : Dict[str, Any]) -> None:
+	set_app_context('cli')
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	logger.init(state_manager.get_item('log_level'))
+
+
+def run_step_process(job_id : str, step_index : int, step_args : Args, process_step : ProcessStep) -> bool:
+	step_args = copy(step_args)
+	step_args['output_path'] = job_helper.get_step_output_path(job_id, step_index, step_args.get('output_path'))
+	return process_step(job_id, step_index, step_args)
+
+
+def run_parallel_steps(job_id : str, steps : List[JobStep], process_step : ProcessStep, step_worker_count : int) -> bool:
+	futures : Dict[int, Future[bool]] = {}
+	has_error = False
+
+	with ProcessPoolExecutor(max_workers = step_worker_count, mp_context = multiprocessing.get_context('spawn'), initializer = init_step_worker, initargs = (dict(state_manager.get_state()),)) as executor:
+		for index, step in enumerate(steps):
+			if not is_step_completed(job_id, index, step):
+				if not job_manager.set_step_status(job_id, index, 'started'):
+					return False
+				futures[index] = executor.submit(run_step_process, job_id, index, step.get('args'), process_step)
+
+		for index, future in futures.items():
+			if future.result():
+				job_manager.set_step_status(job_id, index, 'completed')
+			else:
+				job_manager.set_step_status(job_id, index, 'failed')
+				has_error = True
+	return not has_error
+
+
+def are_steps_independent(job_id : str, steps : List[JobStep]) -> bool:
+	step_output_paths = [ job_helper.get_step_output_path(job_id, index, step.get('args').get('output_path')) for index, step in enumerate(steps) ]
+	return not any(step.get('args').get('target_path') in step_output_paths for step in steps)
+
+
 def run_steps(job_id : str, process_step : ProcessStep) -> bool:
 	steps = job_manager.get_steps(job_id)
+	step_worker_count = state_manager.get_item('step_worker_count')
 
 	if steps:
+		if isinstance(step_worker_count, int) and step_worker_count > 1 and are_steps_independent(job_id, steps):
+			return run_parallel_steps(job_id, steps, process_step, step_worker_count)
 		for index, step in enumerate(steps):
-			if not run_step(job_id, index, step, process_step):
+			if not is_step_completed(job_id, index, step) and not run_step(job_id, index, step, process_step):
 				return False
 		return True
 	return False
 
 
+def queue_steps(job_id : str) -> bool:
+	steps = job_manager.get_steps(job_id)
+
+	for index, step in enumerate(steps):
+		if not is_step_completed(job_id, index, step) and not job_manager.set_step_status(job_id, index, 'queued'):
+			return False
+	return True
+
+
+def is_step_completed(job_id : str, step_index : int, step : JobStep) -> bool:
+	output_path = step.get('args').get('output_path')
+	step_output_path = job_helper.get_step_output_path(job_id, step_index, output_path)
+	return step.get('status') == 'completed' and is_file(step_output_path)
+
+
 def finalize_steps(job_id : str) -> bool:
 	output_set = collect_output_set(job_id)
 
@@ -1,11 +1,23 @@
 from functools import lru_cache
 
+import numpy
 import onnx
 
-from facefusion.types import ModelInitializer
+from facefusion.types import ModelConstants, ModelInitializer, ModelOptions
 
 
 @lru_cache(maxsize = None)
 def get_static_model_initializer(model_path : str) -> ModelInitializer:
 	model = onnx.load(model_path)
 	return onnx.numpy_helper.to_array(model.graph.initializer[-1])
+
+
+def create_model_constants(model_options : ModelOptions) -> ModelConstants:
+	return\
+	{
+		'type': model_options.get('type'),
+		'template': model_options.get('template'),
+		'size': model_options.get('size'),
+		'mean': numpy.array(model_options.get('mean', [ 0.0, 0.0, 0.0 ]), dtype = numpy.float32),
+		'standard_deviation': numpy.array(model_options.get('standard_deviation', [ 1.0, 1.0, 1.0 ]), dtype = numpy.float32)
+	}
@@ -1,8 +1,11 @@
-from typing import Generator, List
+import threading
+from typing import Generator, List, Optional
 
+from facefusion.frame_manifest import mark_frame_manifest
 from facefusion.types import ProcessState, QueuePayload
 
 PROCESS_STATE : ProcessState = 'pending'
+PROCESS_FRAME = threading.local()
 
 
 def get_process_state() -> ProcessState:
@@ -47,7 +50,20 @@ def end() -> None:
 	set_process_state('pending')
 
 
+def get_frame_number() -> Optional[int]:
+	return getattr(PROCESS_FRAME, 'frame_number', None)
+
+
+def set_frame_number(frame_number : Optional[int]) -> None:
+	PROCESS_FRAME.frame_number = frame_number
+
+
 def manage(queue_payloads : List[QueuePayload]) -> Generator[QueuePayload, None, None]:
-	for query_payload in queue_payloads:
-		if is_processing():
-			yield query_payload
+	try:
+		for query_payload in queue_payloads:
+			if is_processing():
+				set_frame_number(query_payload.get('frame_number'))
+				yield query_payload
+				mark_frame_manifest(query_payload.get('frame_number'))
+	finally:
+		set_frame_number(None)
@@ -0,0 +1,174 @@
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from facefusion import logger, process_manager, state_manager
+from facefusion.app_context import set_app_context
+from facefusion.face_store import append_reference_face, get_reference_faces
+from facefusion.face_track import get_face_track
+from facefusion.frame_manifest import defer_frame_manifest, get_frame_manifest, mark_frame_manifest_frames, pop_deferred_frame_numbers
+from facefusion.profiler import append_profile_spans, get_profile, pop_profile_spans, restore_profile
+from facefusion.types import FaceSet, FaceTrack, FrameManifest, ProcessEvent, ProcessFrames, ProcessProgress, ProcessResult, QueuePayload, SharedFrame, UpdateProgress, VisionFrame
+
+PROCESS_CONTEXT = multiprocessing.get_context('spawn')
+PROCESS_PROGRESS : Optional[ProcessProgress] = None
+SHARED_MEMORY_SET : Dict[str, SharedMemory] = {}
+
+
+def create_process_pool(process_event : ProcessEvent, process_progress : ProcessProgress) -> ProcessPoolExecutor:
+	return ProcessPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), mp_context = PROCESS_CONTEXT, initializer = init_process_worker, initargs = (dict(state_manager.get_state()), get_reference_faces(), get_frame_manifest(), get_face_track(), get_profile().get('is_enabled'), get_profile().get('start_time'), process_event, process_progress))
+
+
+def create_process_event() -> ProcessEvent:
+	return PROCESS_CONTEXT.Event()
+
+
+def create_process_progress() -> ProcessProgress:
+	return PROCESS_CONTEXT.Value('i', 0)
+
+
+def init_process_worker(state : Dict[str, Any], reference_faces : Optional[FaceSet], frame_manifest : FrameManifest, face_track : FaceTrack, is_profile_enabled : bool, profile_start_time : float, process_event : ProcessEvent, process_progress : ProcessProgress) -> None:
+	global PROCESS_PROGRESS
+
+	set_app_context('cli')
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	state_manager.set_run_config(state_manager.create_run_config())
+	if reference_faces:
+		for reference_name, faces in reference_faces.items():
+			for face in faces:
+				append_reference_face(reference_name, face)
+	get_frame_manifest().update(frame_manifest)
+	defer_frame_manifest()
+	get_face_track().update(face_track)
+	restore_profile(is_profile_enabled, profile_start_time)
+
+	logger.init(state_manager.get_item('log_level'))
+	PROCESS_PROGRESS = process_progress
+	process_manager.start()
+	threading.Thread(target = watch_process_event, args = (process_event,), daemon = True).start()
+
+
+def watch_process_event(process_event : ProcessEvent) -> None:
+	process_event.wait()
+	process_manager.stop()
+
+
+def update_process_progress(progress : int = 1) -> None:
+	if PROCESS_PROGRESS:
+		with PROCESS_PROGRESS.get_lock():
+			PROCESS_PROGRESS.value += progress
+
+
+def run_process_frames(process_frames : ProcessFrames, source_paths : List[str], queue_payloads : List[QueuePayload]) -> ProcessResult:
+	track_faces = get_face_track().get('faces')
+	track_frame_numbers = set(track_faces.keys())
+	process_frames(source_paths, queue_payloads, update_process_progress)
+	process_result : ProcessResult =\
+	{
+		'frame_numbers': pop_deferred_frame_numbers(),
+		'track_faces': { frame_number: faces for frame_number, faces in track_faces.items() if frame_number not in track_frame_numbers },
+		'profile_spans': pop_profile_spans()
+	}
+	return process_result
+
+
+def apply_process_result(process_result : ProcessResult) -> None:
+	mark_frame_manifest_frames(process_result.get('frame_numbers'))
+	get_face_track().get('faces').update(process_result.get('track_faces'))
+	append_profile_spans(process_result.get('profile_spans'))
+
+
+def multi_process_pool_frames(source_paths : List[str], queue_payloads_list : List[List[QueuePayload]], process_frames : ProcessFrames, update_progress : UpdateProgress) -> None:
+	process_event = create_process_event()
+	process_progress = create_process_progress()
+
+	with create_process_pool(process_event, process_progress) as executor:
+		futures = [ executor.submit(run_process_frames, process_frames, source_paths, queue_payloads) for queue_payloads in queue_payloads_list ]
+		wait_process_pool(futures, process_event, process_progress, update_progress)
+
+
+def wait_process_pool(futures : List[Future[ProcessResult]], process_event : ProcessEvent, process_progress : ProcessProgress, update_progress : UpdateProgress) -> None:
+	pending_futures = set(futures)
+	progress_total = 0
+
+	while pending_futures:
+		done_futures, pending_futures = wait(pending_futures, timeout = 0.1, return_when = FIRST_COMPLETED)
+
+		if not process_manager.is_processing():
+			process_event.set()
+			for future in pending_futures:
+				future.cancel()
+		with process_progress.get_lock():
+			update_progress(process_progress.value - progress_total)
+			progress_total = process_progress.value
+		for future in done_futures:
+			if not future.cancelled():
+				apply_process_result(future.result())
+
+
+def create_shared_frame(vision_frame : VisionFrame) -> SharedFrame:
+	shared_memory = SharedMemory(create = True, size = vision_frame.nbytes)
+	shared_frame : SharedFrame =\
+	{
+		'name': shared_memory.name,
+		'shape': vision_frame.shape
+	}
+	write_shared_frame(shared_memory, vision_frame)
+	SHARED_MEMORY_SET[shared_memory.name] = shared_memory
+	return shared_frame
+
+
+def acquire_shared_frame(shared_frames : List[SharedFrame], shared_index : int, vision_frame : VisionFrame) -> SharedFrame:
+	if shared_index < len(shared_frames):
+		shared_frame = shared_frames[shared_index]
+		write_shared_frame(get_shared_memory(shared_frame), vision_frame)
+		return shared_frame
+	shared_frame = create_shared_frame(vision_frame)
+	shared_frames.append(shared_frame)
+	return shared_frame
+
+
+def get_shared_memory(shared_frame : SharedFrame) -> SharedMemory:
+	if shared_frame.get('name') not in SHARED_MEMORY_SET:
+		SHARED_MEMORY_SET[shared_frame.get('name')] = SharedMemory(name = shared_frame.get('name'))
+	return SHARED_MEMORY_SET.get(shared_frame.get('name'))
+
+
+def resolve_shared_frame(shared_frame : SharedFrame) -> VisionFrame:
+	shared_memory = get_shared_memory(shared_frame)
+	return numpy.ndarray(shared_frame.get('shape'), dtype = numpy.uint8, buffer = shared_memory.buf)
+
+
+def read_shared_frame(shared_frame : SharedFrame) -> VisionFrame:
+	return resolve_shared_frame(shared_frame).copy()
+
+
+def write_shared_frame(shared_memory : SharedMemory, vision_frame : VisionFrame) -> None:
+	numpy.ndarray(vision_frame.shape, dtype = numpy.uint8, buffer = shared_memory.buf)[:] = vision_frame
+
+
+def update_shared_frame(shared_frame : SharedFrame, vision_frame : VisionFrame) -> SharedFrame:
+	if vision_frame.shape == tuple(shared_frame.get('shape')):
+		write_shared_frame(get_shared_memory(shared_frame), vision_frame)
+		return shared_frame
+	output_shared_frame = create_shared_frame(vision_frame)
+	close_shared_frame(output_shared_frame)
+	return output_shared_frame
+
+
+def close_shared_frame(shared_frame : SharedFrame) -> None:
+	shared_memory = SHARED_MEMORY_SET.pop(shared_frame.get('name'), None)
+
+	if shared_memory:
+		shared_memory.close()
+
+
+def destroy_shared_frame(shared_frame : SharedFrame) -> None:
+	shared_memory = SHARED_MEMORY_SET.pop(shared_frame.get('name'), None) or SharedMemory(name = shared_frame.get('name'))
+	shared_memory.close()
+	shared_memory.unlink()
@@ -1,16 +1,38 @@
 import importlib
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from functools import partial
+from queue import Empty, Full, Queue
+from time import time
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Callable, Deque, List, Optional, Tuple, Union
 
+import numpy
 from tqdm import tqdm
 
-from facefusion import logger, state_manager, wording
+from facefusion import logger, process_manager, state_manager, wording
+from facefusion.audio import create_empty_audio_frame, get_voice_frame, read_static_voice
+from facefusion.common_helper import get_first
 from facefusion.exit_helper import hard_exit
-from facefusion.types import ProcessFrames, QueuePayload
+from facefusion.face_analyser import get_many_faces
+from facefusion.face_profile import get_source_face
+from facefusion.face_store import get_reference_faces, get_static_faces, set_static_faces
+from facefusion.ffmpeg import close_stream, open_extract_stream, open_merge_stream, read_stream_frame, write_stream_frame
+from facefusion.filesystem import filter_audio_paths
+from facefusion.frame_manifest import filter_frame_manifest_payloads, mark_frame_manifest
+from facefusion.process_pool import acquire_shared_frame, create_process_event, create_process_pool, create_process_progress, destroy_shared_frame, multi_process_pool_frames, read_shared_frame, resolve_shared_frame, update_shared_frame
+from facefusion.profiler import append_profile_spans, pop_profile_spans
+from facefusion.thread_helper import apply_thread_context
+from facefusion.types import AudioFrame, Face, FaceSet, Fps, ProcessChain, ProcessChainSet, ProcessFrames, ProcessStage, QueuePayload, SharedFrame, SharedStreamFrame, StageFrame, StageQueue, UpdateProgress, VisionFrame
+from facefusion.vision import pack_resolution, predict_video_frame_total, read_image, restrict_video_fps, write_image
 
+QUEUE_DURATION : float = 0.25
+STAGE_TIMEOUT : float = 0.1
+PROCESS_CHAIN_SET : ProcessChainSet = {}
+PROCESS_CHAIN_LOCK : threading.Lock = threading.Lock()
 PROCESSORS_METHODS =\
 [
 	'get_inference_pool',
@@ -54,20 +76,331 @@ def get_processors_modules(processors : List[str]) -> List[ModuleType]:
 
 
 def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str], process_frames : ProcessFrames) -> None:
-	queue_payloads = create_queue_payloads(temp_frame_paths)
-	with tqdm(total = len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+	queue_payloads = filter_frame_manifest_payloads(create_queue_payloads(temp_frame_paths))
+	with tqdm(total = len(temp_frame_paths), initial = len(temp_frame_paths) - len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
-		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
-			futures = []
-			queue : Queue[QueuePayload] = create_queue(queue_payloads)
-			queue_per_future = max(len(queue_payloads) // state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count'), 1)
+		queue : Queue[QueuePayload] = create_queue(queue_payloads)
+
+		if state_manager.get_item('execution_backend') == 'process':
+			queue_payloads_list = []
 
 			while not queue.empty():
-				future = executor.submit(process_frames, source_paths, pick_queue(queue, queue_per_future), progress.update)
-				futures.append(future)
+				queue_payloads_list.append(pick_queue(queue, state_manager.get_item('execution_queue_count')))
+			multi_process_pool_frames(source_paths, queue_payloads_list, process_frames, progress.update)
+		else:
+			with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), initializer = apply_thread_context, initargs = (copy_context(),)) as executor:
+				futures = [ executor.submit(process_queue_frames, source_paths, queue, process_frames, progress.update) for _ in range(state_manager.get_item('execution_thread_count')) ]
+
+				for future_done in as_completed(futures):
+					future_done.result()
+
+
+def process_queue_frames(source_paths : List[str], queue : Queue[QueuePayload], process_frames : ProcessFrames, update_progress : UpdateProgress) -> None:
+	queue_per_future = state_manager.get_item('execution_queue_count')
+
+	while process_manager.is_processing():
+		queue_payloads = pick_queue(queue, queue_per_future)
+
+		if not queue_payloads:
+			break
+		start_time = time()
+		process_frames(source_paths, queue_payloads, update_progress)
+		queue_per_future = calculate_queue_per_future(len(queue_payloads), time() - start_time, queue.qsize())
+
+
+def calculate_queue_per_future(queue_total : int, queue_duration : float, queue_remain : int) -> int:
+	frame_duration = max(queue_duration / max(queue_total, 1), 0.001)
+	queue_per_future = round(state_manager.get_item('execution_queue_count') * QUEUE_DURATION / frame_duration)
+	queue_per_future = min(queue_per_future, queue_remain // state_manager.get_item('execution_thread_count'))
+	return max(queue_per_future, 1)
+
+
+def multi_process_stream(target_path : str, source_paths : List[str], temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(source_paths)
+	source_audio_path = get_source_audio_path(source_paths)
+	stream_frame_total = predict_video_frame_total(target_path, temp_video_fps, trim_frame_start, trim_frame_end)
+	stream_queue_total = state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count')
+	extract_process = open_extract_stream(target_path, temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	execution_backend = state_manager.get_item('execution_backend')
+	process_event = create_process_event()
+	shared_frames : List[SharedFrame] = []
+	merge_process = None
+	is_extracted = False
+	is_finished = False
+
+	with tqdm(total = stream_frame_total, desc = wording.get('streaming'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		with create_process_pool(process_event, create_process_progress()) if execution_backend == 'process' else ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), initializer = apply_thread_context, initargs = (copy_context(),)) as executor:
+			futures : Deque[Future[Union[VisionFrame, SharedStreamFrame]]] = deque()
+			frame_number = 0
+
+			while process_manager.is_processing() and (futures or not is_extracted):
+				if not is_extracted and len(futures) < stream_queue_total:
+					target_vision_frame = read_stream_frame(extract_process, temp_video_resolution)
+
+					if target_vision_frame is None:
+						is_extracted = True
+					else:
+						source_audio_frame = get_source_audio_frame(source_audio_path, temp_video_fps, frame_number)
+						if execution_backend == 'process':
+							shared_frame = acquire_shared_frame(shared_frames, frame_number % stream_queue_total, target_vision_frame)
+							futures.append(executor.submit(process_shared_stream_frame, frame_number, source_paths, source_audio_frame, shared_frame))
+						else:
+							futures.append(executor.submit(process_stream_frame, frame_number, processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame))
+						frame_number += 1
+					continue
+
+				output_vision_frame = resolve_stream_frame(futures.popleft().result(), shared_frames)
+				if not merge_process:
+					output_vision_resolution = pack_resolution((output_vision_frame.shape[1], output_vision_frame.shape[0]))
+					merge_process = open_merge_stream(target_path, output_vision_resolution, temp_video_fps, output_video_resolution, output_video_fps)
+				if not write_stream_frame(merge_process, output_vision_frame):
+					break
+				progress.update()
+
+			is_finished = is_extracted and not futures
+			process_event.set()
+
+			for future in futures:
+				future.cancel()
+
+	for shared_frame in shared_frames:
+		destroy_shared_frame(shared_frame)
+
+	is_finished = is_finished and process_manager.is_processing()
+	if merge_process:
+		return all([ close_stream(extract_process, is_finished), close_stream(merge_process, is_finished) ])
+	close_stream(extract_process, is_finished)
+	return False
+
+
+def process_stream_frame(frame_number : int, processor_modules : List[ModuleType], reference_faces : FaceSet, source_face : Face, source_audio_frame : AudioFrame, target_vision_frame : VisionFrame) -> VisionFrame:
+	process_manager.set_frame_number(frame_number)
+	output_vision_frame = process_chain_frame(processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame)
+	process_manager.set_frame_number(None)
+	return output_vision_frame
+
+
+def process_shared_stream_frame(frame_number : int, source_paths : List[str], source_audio_frame : AudioFrame, shared_frame : SharedFrame) -> SharedStreamFrame:
+	process_chain = get_process_chain(source_paths)
+	target_vision_frame = resolve_shared_frame(shared_frame)
+	output_vision_frame = process_stream_frame(frame_number, process_chain.get('processor_modules'), process_chain.get('reference_faces'), process_chain.get('source_face'), source_audio_frame, target_vision_frame)
+	return update_shared_frame(shared_frame, output_vision_frame), pop_profile_spans()
+
+
+def get_process_chain(source_paths : List[str]) -> ProcessChain:
+	with PROCESS_CHAIN_LOCK:
+		if tuple(source_paths) not in PROCESS_CHAIN_SET:
+			PROCESS_CHAIN_SET[tuple(source_paths)] =\
+			{
+				'processor_modules': get_processors_modules(state_manager.get_item('processors')),
+				'reference_faces': get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None,
+				'source_face': get_source_face(source_paths)
+			}
+		return PROCESS_CHAIN_SET.get(tuple(source_paths))
+
+
+def resolve_stream_frame(stream_frame : Union[VisionFrame, SharedStreamFrame], shared_frames : List[SharedFrame]) -> VisionFrame:
+	if isinstance(stream_frame, numpy.ndarray):
+		return stream_frame
+	output_shared_frame, profile_spans = stream_frame
+	output_vision_frame = read_shared_frame(output_shared_frame)
+	append_profile_spans(profile_spans)
+
+	if output_shared_frame.get('name') not in [ shared_frame.get('name') for shared_frame in shared_frames ]:
+		destroy_shared_frame(output_shared_frame)
+	return output_vision_frame
+
+
+def multi_process_chain(source_paths : List[str], temp_frame_paths : List[str]) -> None:
+	source_audio_path = get_source_audio_path(source_paths)
+
+	if source_audio_path:
+		temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+		read_static_voice(source_audio_path, temp_video_fps)
+	multi_process_frames(source_paths, temp_frame_paths, process_chain_frames)
+
+
+def process_chain_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(source_paths)
+	source_audio_path = get_source_audio_path(source_paths)
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+
+	for queue_payload in process_manager.manage(queue_payloads):
+		frame_number = queue_payload.get('frame_number')
+		target_vision_path = queue_payload.get('frame_path')
+		source_audio_frame = get_source_audio_frame(source_audio_path, temp_video_fps, frame_number)
+		target_vision_frame = read_image(target_vision_path)
+		output_vision_frame = process_chain_frame(processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame)
+		write_image(target_vision_path, output_vision_frame)
+		update_progress(1)
+
+
+def process_chain_frame(processor_modules : List[ModuleType], reference_faces : FaceSet, source_face : Face, source_audio_frame : AudioFrame, target_vision_frame : VisionFrame) -> VisionFrame:
+	source_vision_frame = target_vision_frame.copy()
+
+	for processor_module in processor_modules:
+		target_vision_frame = process_module_frame(processor_module, reference_faces, source_face, source_audio_frame, source_vision_frame, target_vision_frame)
+	return target_vision_frame
+
+
+def process_module_frame(processor_module : ModuleType, reference_faces : FaceSet, source_face : Face, source_audio_frame : AudioFrame, source_vision_frame : VisionFrame, target_vision_frame : VisionFrame) -> VisionFrame:
+	temp_vision_frame = processor_module.process_frame(
+	{
+		'reference_faces': reference_faces,
+		'source_face': source_face,
+		'source_audio_frame': source_audio_frame,
+		'source_vision_frame': source_vision_frame,
+		'target_vision_frame': target_vision_frame
+	})
+	target_faces = get_static_faces(source_vision_frame)
+
+	if target_faces and temp_vision_frame.shape == source_vision_frame.shape:
+		set_static_faces(temp_vision_frame, target_faces)
+	return temp_vision_frame
+
+
+def multi_process_stages(source_paths : List[str], temp_frame_paths : List[str]) -> None:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = get_source_face(source_paths)
+	source_audio_path = get_source_audio_path(source_paths)
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+	queue_payloads = filter_frame_manifest_payloads(create_queue_payloads(temp_frame_paths))
+
+	if source_audio_path:
+		read_static_voice(source_audio_path, temp_video_fps)
+
+	with tqdm(total = len(temp_frame_paths), initial = len(temp_frame_paths) - len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		queue : Queue[QueuePayload] = create_queue(queue_payloads)
+		stage_layout = create_stage_layout(processor_modules, reference_faces, source_face, progress.update)
+		stage_queues : List[StageQueue] = [ Queue(maxsize = state_manager.get_item('execution_stage_queue_depth')) for _ in stage_layout ]
+		stage_event = threading.Event()
+
+		with ThreadPoolExecutor(max_workers = len(stage_layout) + 1, initializer = apply_thread_context, initargs = (copy_context(),)) as executor:
+			futures = [ executor.submit(run_stage, partial(read_stage_frames, source_audio_path, temp_video_fps, queue, stage_queues[0], stage_event), state_manager.get_item('execution_reader_thread_count'), stage_queues[0], stage_event) ]
+
+			for stage_index, (process_stage, stage_thread_count) in enumerate(stage_layout):
+				input_queue = stage_queues[stage_index]
+				output_queue = stage_queues[stage_index + 1] if stage_index + 1 < len(stage_queues) else None
+				futures.append(executor.submit(run_stage, partial(process_stage_frames, process_stage, input_queue, output_queue, stage_event), stage_thread_count, output_queue, stage_event))
+
+			try:
+				for future_done in as_completed(futures):
+					future_done.result()
+			finally:
+				stage_event.set()
+
+
+def create_stage_layout(processor_modules : List[ModuleType], reference_faces : FaceSet, source_face : Face, update_progress : UpdateProgress) -> List[Tuple[ProcessStage, int]]:
+	stage_layout : List[Tuple[ProcessStage, int]] = []
+
+	if state_manager.get_item('execution_analyser_thread_count') > 0:
+		stage_layout.append((analyse_stage_frame, state_manager.get_item('execution_analyser_thread_count')))
+	for processor_module in processor_modules:
+		stage_layout.append((partial(process_stage_frame, processor_module, reference_faces, source_face), state_manager.get_item('execution_thread_count')))
+	stage_layout.append((partial(write_stage_frame, update_progress), state_manager.get_item('execution_writer_thread_count')))
+	return stage_layout
+
+
+def run_stage(stage_worker : Callable[[], None], stage_thread_count : int, output_queue : Optional[StageQueue], stage_event : threading.Event) -> None:
+	with ThreadPoolExecutor(max_workers = stage_thread_count, initializer = apply_thread_context, initargs = (copy_context(),)) as executor:
+		futures = [ executor.submit(stage_worker) for _ in range(stage_thread_count) ]
+
+		for future_done in as_completed(futures):
+			if future_done.exception():
+				stage_event.set()
+			future_done.result()
+
+	if output_queue:
+		put_stage_queue(output_queue, None, stage_event)
+
+
+def read_stage_frames(source_audio_path : Optional[str], temp_video_fps : Fps, queue : Queue[QueuePayload], output_queue : StageQueue, stage_event : threading.Event) -> None:
+	while is_stage_processing(stage_event):
+		queue_payloads = pick_queue(queue, 1)
+
+		if not queue_payloads:
+			break
+		queue_payload = get_first(queue_payloads)
+		target_vision_frame = read_image(queue_payload.get('frame_path'))
+		stage_frame : StageFrame =\
+		{
+			'frame_number': queue_payload.get('frame_number'),
+			'frame_path': queue_payload.get('frame_path'),
+			'source_audio_frame': get_source_audio_frame(source_audio_path, temp_video_fps, queue_payload.get('frame_number')),
+			'source_vision_frame': target_vision_frame.copy(),
+			'target_vision_frame': target_vision_frame
+		}
+		put_stage_queue(output_queue, stage_frame, stage_event)
+
+
+def process_stage_frames(process_stage : ProcessStage, input_queue : StageQueue, output_queue : Optional[StageQueue], stage_event : threading.Event) -> None:
+	while is_stage_processing(stage_event):
+		try:
+			stage_frame = input_queue.get(timeout = STAGE_TIMEOUT)
+		except Empty:
+			continue
+
+		if stage_frame is None:
+			put_stage_queue(input_queue, None, stage_event)
+			break
+		process_manager.set_frame_number(stage_frame.get('frame_number'))
+		stage_frame = process_stage(stage_frame)
+		process_manager.set_frame_number(None)
+
+		if output_queue:
+			put_stage_queue(output_queue, stage_frame, stage_event)
+
+
+def put_stage_queue(stage_queue : StageQueue, stage_frame : Optional[StageFrame], stage_event : threading.Event) -> bool:
+	while is_stage_processing(stage_event):
+		try:
+			stage_queue.put(stage_frame, timeout = STAGE_TIMEOUT)
+			return True
+		except Full:
+			continue
+	return False
+
+
+def is_stage_processing(stage_event : threading.Event) -> bool:
+	return process_manager.is_processing() and not stage_event.is_set()
+
+
+def analyse_stage_frame(stage_frame : StageFrame) -> StageFrame:
+	get_many_faces([ stage_frame.get('source_vision_frame') ])
+	return stage_frame
+
+
+def process_stage_frame(processor_module : ModuleType, reference_faces : FaceSet, source_face : Face, stage_frame : StageFrame) -> StageFrame:
+	stage_frame['target_vision_frame'] = process_module_frame(processor_module, reference_faces, source_face, stage_frame.get('source_audio_frame'), stage_frame.get('source_vision_frame'), stage_frame.get('target_vision_frame'))
+	return stage_frame
+
+
+def write_stage_frame(update_progress : UpdateProgress, stage_frame : StageFrame) -> StageFrame:
+	write_image(stage_frame.get('frame_path'), stage_frame.get('target_vision_frame'))
+	mark_frame_manifest(stage_frame.get('frame_number'))
+	update_progress(1)
+	return stage_frame
+
+
+def get_source_audio_path(source_paths : List[str]) -> Optional[str]:
+	if 'lip_syncer' in state_manager.get_item('processors'):
+		return get_first(filter_audio_paths(source_paths))
+	return None
+
 
-			for future_done in as_completed(futures):
-				future_done.result()
+def get_source_audio_frame(source_audio_path : Optional[str], temp_video_fps : Fps, frame_number : int) -> AudioFrame:
+	if source_audio_path:
+		source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
+		if numpy.any(source_audio_frame):
+			return source_audio_frame
+	return create_empty_audio_frame()
 
 
 def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
@@ -80,8 +413,10 @@ def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
 def pick_queue(queue : Queue[QueuePayload], queue_per_future : int) -> List[QueuePayload]:
 	queues = []
 	for _ in range(queue_per_future):
-		if not queue.empty():
-			queues.append(queue.get())
+		try:
+			queues.append(queue.get_nowait())
+		except Empty:
+			break
 	return queues
 
 
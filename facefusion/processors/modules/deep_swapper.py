@@ -18,11 +18,13 @@ from facefusion.face_masker import create_area_mask, create_box_mask, create_occ
 from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import get_file_name, in_directory, is_image, is_video, resolve_file_paths, resolve_relative_path, same_file_extension
+from facefusion.model_helper import create_model_constants
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import DeepSwapperInputs, DeepSwapperMorph
+from facefusion.profiler import profile_span
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelConstants, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
 from facefusion.vision import conditional_match_frame_color, read_image, read_static_image, write_image
 
 
@@ -264,6 +266,15 @@ def get_model_options() -> ModelOptions:
 	return create_static_model_set('full').get(model_name)
 
 
+@lru_cache(maxsize = None)
+def create_static_model_constants(model_name : str) -> ModelConstants:
+	return create_model_constants(create_static_model_set('full').get(model_name))
+
+
+def get_model_constants() -> ModelConstants:
+	return create_static_model_constants(state_manager.get_item('deep_swapper_model'))
+
+
 def get_model_size() -> Size:
 	deep_swapper = get_inference_pool().get('deep_swapper')
 
@@ -324,7 +335,7 @@ def post_process() -> None:
 
 
 def swap_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	model_template = get_model_options().get('template')
+	model_template = get_model_constants().get('template')
 	model_size = get_model_size()
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
 	crop_vision_frame_raw = crop_vision_frame.copy()
@@ -359,6 +370,7 @@ def swap_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFram
 	return paste_vision_frame
 
 
+@profile_span('forward')
 def forward(crop_vision_frame : VisionFrame, deep_swapper_morph : DeepSwapperMorph) -> Tuple[VisionFrame, Mask, Mask]:
 	deep_swapper = get_inference_pool().get('deep_swapper')
 	deep_swapper_inputs = {}
@@ -10,23 +10,26 @@ import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
 from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
+from facefusion.batch_manager import run_batch
 from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
+from facefusion.face_analyser import get_many_faces, get_one_face
 from facefusion.face_helper import paste_back, warp_face_by_face_landmark_5
 from facefusion.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces, sort_faces_by_order
+from facefusion.face_profile import get_source_crop_frame, get_source_face
+from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
 from facefusion.face_store import get_reference_faces
-from facefusion.filesystem import filter_image_paths, has_image, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
-from facefusion.model_helper import get_static_model_initializer
+from facefusion.filesystem import has_image, in_directory, is_file, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.model_helper import create_model_constants, get_static_model_initializer
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.pixel_boost import explode_pixel_boost, implode_pixel_boost
 from facefusion.processors.types import FaceSwapperInputs
+from facefusion.profiler import profile_span
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, read_static_images, unpack_resolution, write_image
+from facefusion.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelConstants, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame, WarpTemplate
+from facefusion.vision import read_image, read_static_image, unpack_resolution, write_image
 
 
 @lru_cache(maxsize = None)
@@ -425,6 +428,15 @@ def get_model_options() -> ModelOptions:
 	return create_static_model_set('full').get(model_name)
 
 
+@lru_cache(maxsize = None)
+def create_static_model_constants(model_name : str) -> ModelConstants:
+	return create_model_constants(create_static_model_set('full').get(model_name))
+
+
+def get_model_constants() -> ModelConstants:
+	return create_static_model_constants(get_model_name())
+
+
 def get_model_name() -> str:
 	model_name = state_manager.get_item('face_swapper_model')
 
@@ -456,13 +468,10 @@ def pre_check() -> bool:
 
 
 def pre_process(mode : ProcessMode) -> bool:
-	if not has_image(state_manager.get_item('source_paths')):
+	if not has_image(state_manager.get_item('source_paths')) and not is_file(state_manager.get_item('source_face_profile')):
 		logger.error(wording.get('choose_image_source') + wording.get('exclamation_mark'), __name__)
 		return False
-	source_image_paths = filter_image_paths(state_manager.get_item('source_paths'))
-	source_frames = read_static_images(source_image_paths)
-	source_faces = get_many_faces(source_frames)
-	if not get_one_face(source_faces):
+	if not get_source_face(state_manager.get_item('source_paths')):
 		logger.error(wording.get('no_source_face_detected') + wording.get('exclamation_mark'), __name__)
 		return False
 	if mode in [ 'output', 'preview' ] and not is_image(state_manager.get_item('target_path')) and not is_video(state_manager.get_item('target_path')):
@@ -493,8 +502,9 @@ def post_process() -> None:
 
 
 def swap_face(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	model_template = get_model_options().get('template')
-	model_size = get_model_options().get('size')
+	model_constants = get_model_constants()
+	model_template = model_constants.get('template')
+	model_size = model_constants.get('size')
 	pixel_boost_size = unpack_resolution(state_manager.get_item('face_swapper_pixel_boost'))
 	pixel_boost_total = pixel_boost_size[0] // model_size[0]
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
@@ -531,9 +541,10 @@ def swap_face(source_face : Face, target_face : Face, temp_vision_frame : Vision
 	return temp_vision_frame
 
 
+@profile_span('forward')
 def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> VisionFrame:
 	face_swapper = get_inference_pool().get('face_swapper')
-	model_type = get_model_options().get('type')
+	model_type = get_model_constants().get('type')
 	face_swapper_inputs = {}
 
 	if has_execution_provider('coreml') and model_type in [ 'ghost', 'uniface' ]:
@@ -548,12 +559,12 @@ def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> Vi
 		if face_swapper_input.name == 'target':
 			face_swapper_inputs[face_swapper_input.name] = crop_vision_frame
 
-	with conditional_thread_semaphore():
-		crop_vision_frame = face_swapper.run(None, face_swapper_inputs)[0][0]
+	crop_vision_frame = run_batch(face_swapper, face_swapper_inputs, conditional_thread_semaphore())[0][0]
 
 	return crop_vision_frame
 
 
+@profile_span('forward')
 def forward_convert_embedding(embedding : Embedding) -> Embedding:
 	embedding_converter = get_inference_pool().get('embedding_converter')
 
@@ -567,13 +578,12 @@ def forward_convert_embedding(embedding : Embedding) -> Embedding:
 
 
 def prepare_source_frame(source_face : Face) -> VisionFrame:
-	model_type = get_model_options().get('type')
-	source_vision_frame = read_static_image(get_first(state_manager.get_item('source_paths')))
+	model_type = get_model_constants().get('type')
+	warp_template : WarpTemplate = 'arcface_112_v2'
 
-	if model_type == 'blendswap':
-		source_vision_frame, _ = warp_face_by_face_landmark_5(source_vision_frame, source_face.landmark_set.get('5/68'), 'arcface_112_v2', (112, 112))
 	if model_type == 'uniface':
-		source_vision_frame, _ = warp_face_by_face_landmark_5(source_vision_frame, source_face.landmark_set.get('5/68'), 'ffhq_512', (256, 256))
+		warp_template = 'ffhq_512'
+	source_vision_frame = get_source_crop_frame(source_face, warp_template)
 	source_vision_frame = source_vision_frame[:, :, ::-1] / 255.0
 	source_vision_frame = source_vision_frame.transpose(2, 0, 1)
 	source_vision_frame = numpy.expand_dims(source_vision_frame, axis = 0).astype(numpy.float32)
@@ -581,7 +591,7 @@ def prepare_source_frame(source_face : Face) -> VisionFrame:
 
 
 def prepare_source_embedding(source_face : Face) -> Embedding:
-	model_type = get_model_options().get('type')
+	model_type = get_model_constants().get('type')
 
 	if model_type == 'ghost':
 		source_embedding, _ = convert_embedding(source_face)
@@ -613,10 +623,11 @@ def convert_embedding(source_face : Face) -> Tuple[Embedding, Embedding]:
 
 
 def prepare_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
+	model_constants = get_model_constants()
+	model_mean = model_constants.get('mean')
+	model_standard_deviation = model_constants.get('standard_deviation')
 
-	crop_vision_frame = crop_vision_frame[:, :, ::-1] / 255.0
+	crop_vision_frame = crop_vision_frame[:, :, ::-1].astype(numpy.float32) / 255.0
 	crop_vision_frame = (crop_vision_frame - model_mean) / model_standard_deviation
 	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1)
 	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0).astype(numpy.float32)
@@ -624,9 +635,10 @@ def prepare_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 
 
 def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
-	model_type = get_model_options().get('type')
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
+	model_constants = get_model_constants()
+	model_type = model_constants.get('type')
+	model_mean = model_constants.get('mean')
+	model_standard_deviation = model_constants.get('standard_deviation')
 
 	crop_vision_frame = crop_vision_frame.transpose(1, 2, 0)
 	if model_type in [ 'ghost', 'hififace', 'hyperswap', 'uniface' ]:
@@ -664,15 +676,7 @@ def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	source_frames = read_static_images(source_paths)
-	source_faces = []
-
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
-		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
-		if temp_faces:
-			source_faces.append(get_first(temp_faces))
-	source_face = get_average_face(source_faces)
+	source_face = get_source_face(source_paths)
 
 	for queue_payload in process_manager.manage(queue_payloads):
 		target_vision_path = queue_payload['frame_path']
@@ -689,15 +693,7 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	source_frames = read_static_images(source_paths)
-	source_faces = []
-
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
-		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
-		if temp_faces:
-			source_faces.append(get_first(temp_faces))
-	source_face = get_average_face(source_faces)
+	source_face = get_source_face(source_paths)
 	target_vision_frame = read_static_image(target_path)
 	output_vision_frame = process_frame(
 	{
@@ -13,11 +13,13 @@ from facefusion.common_helper import create_int_metavar
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.model_helper import create_model_constants
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import FrameColorizerInputs
+from facefusion.profiler import profile_span
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, ExecutionProvider, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.types import ApplyStateItem, Args, DownloadScope, ExecutionProvider, Face, InferencePool, ModelConstants, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
 from facefusion.vision import read_image, read_static_image, unpack_resolution, write_image
 
 
@@ -151,6 +153,15 @@ def get_model_options() -> ModelOptions:
 	return create_static_model_set('full').get(model_name)
 
 
+@lru_cache(maxsize = None)
+def create_static_model_constants(model_name : str) -> ModelConstants:
+	return create_model_constants(create_static_model_set('full').get(model_name))
+
+
+def get_model_constants() -> ModelConstants:
+	return create_static_model_constants(state_manager.get_item('frame_colorizer_model'))
+
+
 def register_args(program : ArgumentParser) -> None:
 	group_processors = find_argument_group(program, 'processors')
 	if group_processors:
@@ -203,6 +214,7 @@ def colorize_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 	return color_vision_frame
 
 
+@profile_span('forward')
 def forward(color_vision_frame : VisionFrame) -> VisionFrame:
 	frame_colorizer = get_inference_pool().get('frame_colorizer')
 
@@ -217,7 +229,7 @@ def forward(color_vision_frame : VisionFrame) -> VisionFrame:
 
 def prepare_temp_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_size = unpack_resolution(state_manager.get_item('frame_colorizer_size'))
-	model_type = get_model_options().get('type')
+	model_type = get_model_constants().get('type')
 	temp_vision_frame = cv2.cvtColor(temp_vision_frame, cv2.COLOR_BGR2GRAY)
 	temp_vision_frame = cv2.cvtColor(temp_vision_frame, cv2.COLOR_GRAY2RGB)
 
@@ -234,7 +246,7 @@ def prepare_temp_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 
 
 def merge_color_frame(temp_vision_frame : VisionFrame, color_vision_frame : VisionFrame) -> VisionFrame:
-	model_type = get_model_options().get('type')
+	model_type = get_model_constants().get('type')
 	color_vision_frame = color_vision_frame.transpose(1, 2, 0)
 	color_vision_frame = cv2.resize(color_vision_frame, (temp_vision_frame.shape[1], temp_vision_frame.shape[0]))
 
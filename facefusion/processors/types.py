@@ -2,7 +2,7 @@ from typing import Any, Dict, List, Literal, TypeAlias, TypedDict
 
 from numpy.typing import NDArray
 
-from facefusion.types import AppContext, AudioFrame, Face, FaceSet, VisionFrame
+from facefusion.types import AppContext, AudioFrame, Face, FaceSet, State, VisionFrame
 
 AgeModifierModel = Literal['styleganex_age']
 DeepSwapperModel : TypeAlias = str
@@ -144,6 +144,11 @@ ProcessorState = TypedDict('ProcessorState',
 })
 ProcessorStateSet : TypeAlias = Dict[AppContext, ProcessorState]
 
+
+class RunConfig(State, ProcessorState):
+	pass
+
+
 AgeModifierDirection : TypeAlias = NDArray[Any]
 DeepSwapperMorph : TypeAlias = NDArray[Any]
 FaceEnhancerWeight : TypeAlias = NDArray[Any]
@@ -0,0 +1,124 @@
+import os
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, ParamSpec, Set, Tuple, TypeVar
+
+from facefusion import cli_helper, process_manager
+from facefusion.json import write_json
+from facefusion.types import Profile, ProfileSpan, ProfileSpanName, TableContents, TableHeaders
+
+PROFILE : Profile =\
+{
+	'is_enabled': False,
+	'start_time': 0.0,
+	'spans': []
+}
+ProfileParams = ParamSpec('ProfileParams')
+ProfileReturn = TypeVar('ProfileReturn')
+
+
+def get_profile() -> Profile:
+	return PROFILE
+
+
+def init_profile(is_enabled : bool) -> None:
+	PROFILE['is_enabled'] = is_enabled
+	PROFILE['start_time'] = perf_counter()
+	PROFILE['spans'].clear()
+
+
+def restore_profile(is_enabled : bool, start_time : float) -> None:
+	PROFILE['is_enabled'] = is_enabled
+	PROFILE['start_time'] = start_time
+	PROFILE['spans'].clear()
+
+
+def pop_profile_spans() -> List[ProfileSpan]:
+	profile_spans = PROFILE.get('spans').copy()
+	PROFILE['spans'].clear()
+	return profile_spans
+
+
+def append_profile_spans(profile_spans : List[ProfileSpan]) -> None:
+	PROFILE['spans'].extend(profile_spans)
+
+
+def clear_profile() -> None:
+	PROFILE['is_enabled'] = False
+	PROFILE['spans'].clear()
+
+
+def profile_span(span_name : ProfileSpanName) -> Callable[[Callable[ProfileParams, ProfileReturn]], Callable[ProfileParams, ProfileReturn]]:
+	def decorate(function : Callable[ProfileParams, ProfileReturn]) -> Callable[ProfileParams, ProfileReturn]:
+		@wraps(function)
+		def profile_function(*args : ProfileParams.args, **kwargs : ProfileParams.kwargs) -> ProfileReturn:
+			if PROFILE.get('is_enabled'):
+				with record_span(span_name):
+					return function(*args, **kwargs)
+			return function(*args, **kwargs)
+		return profile_function
+	return decorate
+
+
+@contextmanager
+def record_span(span_name : ProfileSpanName) -> Iterator[None]:
+	start_time = perf_counter()
+
+	try:
+		yield
+	finally:
+		end_time = perf_counter()
+		profile_span : ProfileSpan =\
+		{
+			'name': span_name,
+			'ph': 'X',
+			'ts': (start_time - PROFILE.get('start_time')) * 1000000,
+			'dur': (end_time - start_time) * 1000000,
+			'pid': os.getpid(),
+			'tid': threading.get_ident(),
+			'args':
+			{
+				'frame_number': process_manager.get_frame_number()
+			}
+		}
+		PROFILE['spans'].append(profile_span)
+
+
+def save_profile(profile_path : str) -> bool:
+	return write_json(profile_path,
+	{
+		'traceEvents': PROFILE.get('spans'),
+		'displayTimeUnit': 'ms'
+	})
+
+
+def render_profile() -> None:
+	profile_headers, profile_contents = compose_profile()
+
+	if profile_contents:
+		cli_helper.render_table(profile_headers, profile_contents)
+
+
+def compose_profile() -> Tuple[TableHeaders, TableContents]:
+	profile_headers : TableHeaders = [ 'span', 'calls', 'total ms', 'average ms', 'maximum ms', 'threads' ]
+	profile_contents : TableContents = []
+	profile_durations : Dict[str, List[float]] = {}
+	profile_threads : Dict[str, Set[int]] = {}
+
+	for profile_span in PROFILE.get('spans'):
+		profile_durations.setdefault(profile_span.get('name'), []).append(profile_span.get('dur') / 1000)
+		profile_threads.setdefault(profile_span.get('name'), set()).add(profile_span.get('tid'))
+
+	for span_name, span_durations in sorted(profile_durations.items(), key = lambda profile_item: sum(profile_item[1]), reverse = True):
+		profile_contents.append(
+		[
+			span_name,
+			len(span_durations),
+			round(sum(span_durations), 2),
+			round(sum(span_durations) / len(span_durations), 2),
+			round(max(span_durations), 2),
+			len(profile_threads.get(span_name))
+		])
+	return profile_headers, profile_contents
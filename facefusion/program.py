@@ -48,7 +48,8 @@ def create_source_paths_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_paths = program.add_argument_group('paths')
 	group_paths.add_argument('-s', '--source-paths', help = wording.get('help.source_paths'), default = config.get_str_list('paths', 'source_paths'), nargs = '+')
-	job_store.register_step_keys([ 'source_paths' ])
+	group_paths.add_argument('--source-face-profile', help = wording.get('help.source_face_profile'), default = config.get_str_value('paths', 'source_face_profile'))
+	job_store.register_step_keys([ 'source_paths', 'source_face_profile' ])
 	return program
 
 
@@ -72,7 +73,8 @@ def create_source_pattern_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_patterns = program.add_argument_group('patterns')
 	group_patterns.add_argument('-s', '--source-pattern', help = wording.get('help.source_pattern'), default = config.get_str_value('patterns', 'source_pattern'))
-	job_store.register_job_keys([ 'source_pattern' ])
+	group_patterns.add_argument('--source-face-profile-pattern', help = wording.get('help.source_face_profile_pattern'), default = config.get_str_value('patterns', 'source_face_profile_pattern'))
+	job_store.register_job_keys([ 'source_pattern', 'source_face_profile_pattern' ])
 	return program
 
 
@@ -100,8 +102,11 @@ def create_face_detector_program() -> ArgumentParser:
 	face_detector_size_choices = facefusion.choices.face_detector_set.get(known_args.face_detector_model)
 	group_face_detector.add_argument('--face-detector-size', help = wording.get('help.face_detector_size'), default = config.get_str_value('face_detector', 'face_detector_size', get_last(face_detector_size_choices)), choices = face_detector_size_choices)
 	group_face_detector.add_argument('--face-detector-angles', help = wording.get('help.face_detector_angles'), type = int, default = config.get_int_list('face_detector', 'face_detector_angles', '0'), choices = facefusion.choices.face_detector_angles, nargs = '+', metavar = 'FACE_DETECTOR_ANGLES')
+	group_face_detector.add_argument('--face-detector-angle-mode', help = wording.get('help.face_detector_angle_mode'), default = config.get_str_value('face_detector', 'face_detector_angle_mode', 'all'), choices = facefusion.choices.face_detector_angle_modes)
 	group_face_detector.add_argument('--face-detector-score', help = wording.get('help.face_detector_score'), type = float, default = config.get_float_value('face_detector', 'face_detector_score', '0.5'), choices = facefusion.choices.face_detector_score_range, metavar = create_float_metavar(facefusion.choices.face_detector_score_range))
-	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score' ])
+	group_face_detector.add_argument('--face-detector-interval', help = wording.get('help.face_detector_interval'), type = int, default = config.get_int_value('face_detector', 'face_detector_interval', '0'), choices = facefusion.choices.face_detector_interval_range, metavar = create_int_metavar(facefusion.choices.face_detector_interval_range))
+	group_face_detector.add_argument('--face-detector-proxy-size', help = wording.get('help.face_detector_proxy_size'), type = int, default = config.get_int_value('face_detector', 'face_detector_proxy_size', '0'), choices = facefusion.choices.face_detector_proxy_sizes)
+	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_angle_mode', 'face_detector_size', 'face_detector_score', 'face_detector_interval', 'face_detector_proxy_size' ])
 	return program
 
 
@@ -109,8 +114,9 @@ def create_face_landmarker_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_face_landmarker = program.add_argument_group('face landmarker')
 	group_face_landmarker.add_argument('--face-landmarker-model', help = wording.get('help.face_landmarker_model'), default = config.get_str_value('face_landmarker', 'face_landmarker_model', '2dfan4'), choices = facefusion.choices.face_landmarker_models)
+	group_face_landmarker.add_argument('--face-landmarker-mode', help = wording.get('help.face_landmarker_mode'), default = config.get_str_value('face_landmarker', 'face_landmarker_mode', 'all'), choices = facefusion.choices.face_landmarker_modes)
 	group_face_landmarker.add_argument('--face-landmarker-score', help = wording.get('help.face_landmarker_score'), type = float, default = config.get_float_value('face_landmarker', 'face_landmarker_score', '0.5'), choices = facefusion.choices.face_landmarker_score_range, metavar = create_float_metavar(facefusion.choices.face_landmarker_score_range))
-	job_store.register_step_keys([ 'face_landmarker_model', 'face_landmarker_score' ])
+	job_store.register_step_keys([ 'face_landmarker_model', 'face_landmarker_mode', 'face_landmarker_score' ])
 	return program
 
 
@@ -126,7 +132,9 @@ def create_face_selector_program() -> ArgumentParser:
 	group_face_selector.add_argument('--reference-face-position', help = wording.get('help.reference_face_position'), type = int, default = config.get_int_value('face_selector', 'reference_face_position', '0'))
 	group_face_selector.add_argument('--reference-face-distance', help = wording.get('help.reference_face_distance'), type = float, default = config.get_float_value('face_selector', 'reference_face_distance', '0.3'), choices = facefusion.choices.reference_face_distance_range, metavar = create_float_metavar(facefusion.choices.reference_face_distance_range))
 	group_face_selector.add_argument('--reference-frame-number', help = wording.get('help.reference_frame_number'), type = int, default = config.get_int_value('face_selector', 'reference_frame_number', '0'))
-	job_store.register_step_keys([ 'face_selector_mode', 'face_selector_order', 'face_selector_gender', 'face_selector_race', 'face_selector_age_start', 'face_selector_age_end', 'reference_face_position', 'reference_face_distance', 'reference_frame_number' ])
+	group_face_selector.add_argument('--reference-face-cluster-path', help = wording.get('help.reference_face_cluster_path'), default = config.get_str_value('face_selector', 'reference_face_cluster_path'))
+	group_face_selector.add_argument('--reference-face-cluster-index', help = wording.get('help.reference_face_cluster_index'), type = int, default = config.get_int_value('face_selector', 'reference_face_cluster_index', '0'))
+	job_store.register_step_keys([ 'face_selector_mode', 'face_selector_order', 'face_selector_gender', 'face_selector_race', 'face_selector_age_start', 'face_selector_age_end', 'reference_face_position', 'reference_face_distance', 'reference_frame_number', 'reference_face_cluster_path', 'reference_face_cluster_index' ])
 	return program
 
 
@@ -151,7 +159,9 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction.add_argument('--trim-frame-end', help = wording.get('help.trim_frame_end'), type = int, default = facefusion.config.get_int_value('frame_extraction', 'trim_frame_end'))
 	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction', 'temp_frame_format', 'png'), choices = facefusion.choices.temp_frame_formats)
 	group_frame_extraction.add_argument('--keep-temp', help = wording.get('help.keep_temp'), action = 'store_true', default = config.get_bool_value('frame_extraction', 'keep_temp'))
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp' ])
+	group_frame_extraction.add_argument('--video-pipeline', help = wording.get('help.video_pipeline'), default = config.get_str_value('frame_extraction', 'video_pipeline', 'sequential'), choices = facefusion.choices.video_pipelines)
+	group_frame_extraction.add_argument('--face-track-cache', help = wording.get('help.face_track_cache'), action = 'store_true', default = config.get_bool_value('frame_extraction', 'face_track_cache'))
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp', 'video_pipeline', 'face_track_cache' ])
 	return program
 
 
@@ -215,6 +225,22 @@ def create_benchmark_program() -> ArgumentParser:
 	group_benchmark = program.add_argument_group('benchmark')
 	group_benchmark.add_argument('--benchmark-resolutions', help = wording.get('help.benchmark_resolutions'), default = config.get_str_list('benchmark', 'benchmark_resolutions', get_first(facefusion.choices.benchmark_resolutions)), choices = facefusion.choices.benchmark_resolutions, nargs = '+')
 	group_benchmark.add_argument('--benchmark-cycle-count', help = wording.get('help.benchmark_cycle_count'), type = int, default = config.get_int_value('benchmark', 'benchmark_cycle_count', '5'), choices = facefusion.choices.benchmark_cycle_count_range)
+	group_benchmark.add_argument('--benchmark-face-count', help = wording.get('help.benchmark_face_count'), type = int, default = config.get_int_value('benchmark', 'benchmark_face_count', '1'), choices = facefusion.choices.benchmark_face_count_range)
+	return program
+
+
+def create_face_cluster_sample_count_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_face_cluster = program.add_argument_group('face cluster')
+	group_face_cluster.add_argument('--face-cluster-sample-count', help = wording.get('help.face_cluster_sample_count'), type = int, default = config.get_int_value('face_cluster', 'face_cluster_sample_count', '50'), choices = facefusion.choices.face_cluster_sample_count_range, metavar = create_int_metavar(facefusion.choices.face_cluster_sample_count_range))
+	job_store.register_step_keys([ 'face_cluster_sample_count' ])
+	return program
+
+
+def create_face_cluster_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_face_cluster = program.add_argument_group('face cluster')
+	group_face_cluster.add_argument('--face-cluster-distance', help = wording.get('help.face_cluster_distance'), type = float, default = config.get_float_value('face_cluster', 'face_cluster_distance', '0.3'), choices = facefusion.choices.face_cluster_distance_range, metavar = create_float_metavar(facefusion.choices.face_cluster_distance_range))
 	return program
 
 
@@ -224,9 +250,15 @@ def create_execution_program() -> ArgumentParser:
 	group_execution = program.add_argument_group('execution')
 	group_execution.add_argument('--execution-device-id', help = wording.get('help.execution_device_id'), default = config.get_str_value('execution', 'execution_device_id', '0'))
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(available_execution_providers)), default = config.get_str_list('execution', 'execution_providers', get_first(available_execution_providers)), choices = available_execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
+	group_execution.add_argument('--execution-backend', help = wording.get('help.execution_backend'), default = config.get_str_value('execution', 'execution_backend', 'thread'), choices = facefusion.choices.execution_backends)
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution', 'execution_thread_count', '4'), choices = facefusion.choices.execution_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_thread_count_range))
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution', 'execution_queue_count', '1'), choices = facefusion.choices.execution_queue_count_range, metavar = create_int_metavar(facefusion.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--execution-batch-size', help = wording.get('help.execution_batch_size'), type = int, default = config.get_int_value('execution', 'execution_batch_size', '1'), choices = facefusion.choices.execution_batch_size_range, metavar = create_int_metavar(facefusion.choices.execution_batch_size_range))
+	group_execution.add_argument('--execution-reader-thread-count', help = wording.get('help.execution_reader_thread_count'), type = int, default = config.get_int_value('execution', 'execution_reader_thread_count', '2'), choices = facefusion.choices.execution_stage_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_stage_thread_count_range))
+	group_execution.add_argument('--execution-analyser-thread-count', help = wording.get('help.execution_analyser_thread_count'), type = int, default = config.get_int_value('execution', 'execution_analyser_thread_count', '1'), choices = facefusion.choices.execution_analyser_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_analyser_thread_count_range))
+	group_execution.add_argument('--execution-writer-thread-count', help = wording.get('help.execution_writer_thread_count'), type = int, default = config.get_int_value('execution', 'execution_writer_thread_count', '2'), choices = facefusion.choices.execution_stage_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_stage_thread_count_range))
+	group_execution.add_argument('--execution-stage-queue-depth', help = wording.get('help.execution_stage_queue_depth'), type = int, default = config.get_int_value('execution', 'execution_stage_queue_depth', '8'), choices = facefusion.choices.execution_stage_queue_depth_range, metavar = create_int_metavar(facefusion.choices.execution_stage_queue_depth_range))
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_backend', 'execution_thread_count', 'execution_queue_count', 'execution_batch_size', 'execution_reader_thread_count', 'execution_analyser_thread_count', 'execution_writer_thread_count', 'execution_stage_queue_depth' ])
 	return program
 
 
@@ -255,6 +287,14 @@ def create_halt_on_error_program() -> ArgumentParser:
 	return program
 
 
+def create_profile_output_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_misc = program.add_argument_group('misc')
+	group_misc.add_argument('--profile-output', help = wording.get('help.profile_output'), default = config.get_str_value('misc', 'profile_output'))
+	job_store.register_job_keys([ 'profile_output' ])
+	return program
+
+
 def create_job_id_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	program.add_argument('job_id', help = wording.get('help.job_id'))
@@ -274,12 +314,26 @@ def create_step_index_program() -> ArgumentParser:
 	return program
 
 
+def create_segment_frame_total_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_misc = program.add_argument_group('misc')
+	group_misc.add_argument('--segment-frame-total', help = wording.get('help.segment_frame_total'), type = int, default = config.get_int_value('misc', 'segment_frame_total', '1500'))
+	return program
+
+
+def create_step_worker_count_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_misc = program.add_argument_group('misc')
+	group_misc.add_argument('--step-worker-count', help = wording.get('help.step_worker_count'), type = int, default = config.get_int_value('misc', 'step_worker_count', '1'), choices = facefusion.choices.step_worker_count_range, metavar = create_int_metavar(facefusion.choices.step_worker_count_range))
+	return program
+
+
 def collect_step_program() -> ArgumentParser:
-	return ArgumentParser(parents = [ create_face_detector_program(), create_face_landmarker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
+	return ArgumentParser(parents = [ create_face_detector_program(), create_face_landmarker_program(), create_face_selector_program(), create_face_cluster_sample_count_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
 
 
 def collect_job_program() -> ArgumentParser:
-	return ArgumentParser(parents = [ create_execution_program(), create_download_providers_program(), create_memory_program(), create_log_level_program() ], add_help = False)
+	return ArgumentParser(parents = [ create_execution_program(), create_download_providers_program(), create_memory_program(), create_log_level_program(), create_profile_output_program() ], add_help = False)
 
 
 def create_program() -> ArgumentParser:
@@ -293,6 +347,7 @@ def create_program() -> ArgumentParser:
 	sub_program.add_parser('batch-run', help = wording.get('help.batch_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_pattern_program(), create_target_pattern_program(), create_output_pattern_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('force-download', help = wording.get('help.force_download'), parents = [ create_download_providers_program(), create_download_scope_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('benchmark', help = wording.get('help.benchmark'), parents = [ create_temp_path_program(), collect_step_program(), create_benchmark_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('face-cluster', help = wording.get('help.face_cluster'), parents = [ create_config_path_program(), create_target_path_program(), create_output_path_program(), create_face_detector_program(), create_face_landmarker_program(), create_face_cluster_sample_count_program(), create_face_cluster_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	# job manager
 	sub_program.add_parser('job-list', help = wording.get('help.job_list'), parents = [ create_job_status_program(), create_jobs_path_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-create', help = wording.get('help.job_create'), parents = [ create_job_id_program(), create_jobs_path_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
@@ -301,14 +356,15 @@ def create_program() -> ArgumentParser:
 	sub_program.add_parser('job-delete', help = wording.get('help.job_delete'), parents = [ create_job_id_program(), create_jobs_path_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-delete-all', help = wording.get('help.job_delete_all'), parents = [ create_jobs_path_program(), create_log_level_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-add-step', help = wording.get('help.job_add_step'), parents = [ create_job_id_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-add-segments', help = wording.get('help.job_add_segments'), parents = [ create_job_id_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), create_segment_frame_total_program(), collect_step_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-remix-step', help = wording.get('help.job_remix_step'), parents = [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_output_path_program(), collect_step_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-insert-step', help = wording.get('help.job_insert_step'), parents = [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('job-remove-step', help = wording.get('help.job_remove_step'), parents = [ create_job_id_program(), create_step_index_program(), create_jobs_path_program(), create_log_level_program() ], formatter_class = create_help_formatter_large)
 	# job runner
-	sub_program.add_parser('job-run', help = wording.get('help.job_run'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-run-all', help = wording.get('help.job_run_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-retry', help = wording.get('help.job_retry'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-retry-all', help = wording.get('help.job_retry_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-run', help = wording.get('help.job_run'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_step_worker_count_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-run-all', help = wording.get('help.job_run_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_step_worker_count_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-retry', help = wording.get('help.job_retry'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_step_worker_count_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-retry-all', help = wording.get('help.job_retry_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_step_worker_count_program(), create_halt_on_error_program() ], formatter_class = create_help_formatter_large)
 	return ArgumentParser(parents = [ program ], formatter_class = create_help_formatter_small)
 
 
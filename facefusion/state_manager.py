@@ -1,7 +1,9 @@
-from typing import Any, Union
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Union, cast
 
 from facefusion.app_context import detect_app_context
-from facefusion.processors.types import ProcessorState, ProcessorStateKey, ProcessorStateSet
+from facefusion.processors.types import ProcessorState, ProcessorStateKey, ProcessorStateSet, RunConfig
 from facefusion.types import State, StateKey, StateSet
 
 STATE_SET : Union[StateSet, ProcessorStateSet] =\
@@ -9,6 +11,7 @@ STATE_SET : Union[StateSet, ProcessorStateSet] =\
 	'cli': {}, #type:ignore[assignment]
 	'ui': {} #type:ignore[assignment]
 }
+RUN_CONFIG : ContextVar[Optional[RunConfig]] = ContextVar('run_config', default = None)
 
 
 def get_state() -> Union[State, ProcessorState]:
@@ -22,11 +25,19 @@ def init_item(key : Union[StateKey, ProcessorStateKey], value : Any) -> None:
 
 
 def get_item(key : Union[StateKey, ProcessorStateKey]) -> Any:
+	run_config = RUN_CONFIG.get()
+
+	if run_config is not None:
+		return run_config.get(key) #type:ignore[literal-required]
 	return get_state().get(key) #type:ignore[literal-required]
 
 
 def set_item(key : Union[StateKey, ProcessorStateKey], value : Any) -> None:
 	app_context = detect_app_context()
+	run_config = RUN_CONFIG.get()
+
+	if run_config is not None:
+		run_config[key] = value #type:ignore[literal-required]
 	STATE_SET[app_context][key] = value #type:ignore[literal-required]
 
 
@@ -36,3 +47,26 @@ def sync_item(key : Union[StateKey, ProcessorStateKey]) -> None:
 
 def clear_item(key : Union[StateKey, ProcessorStateKey]) -> None:
 	set_item(key, None)
+
+
+def get_run_config() -> Optional[RunConfig]:
+	return RUN_CONFIG.get()
+
+
+def create_run_config() -> RunConfig:
+	return cast(RunConfig, dict(get_state()))
+
+
+def set_run_config(run_config : Optional[RunConfig]) -> None:
+	RUN_CONFIG.set(run_config)
+
+
+@contextmanager
+def pin_run_config() -> Iterator[RunConfig]:
+	run_config = create_run_config()
+	run_config_token = RUN_CONFIG.set(run_config)
+
+	try:
+		yield run_config
+	finally:
+		RUN_CONFIG.reset(run_config_token)
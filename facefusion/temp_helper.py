@@ -28,6 +28,11 @@ def get_temp_frames_pattern(target_path : str, temp_frame_prefix : str) -> str:
 
 def get_temp_directory_path(file_path : str) -> str:
 	temp_file_name = get_file_name(file_path)
+	trim_frame_start = state_manager.get_item('trim_frame_start')
+	trim_frame_end = state_manager.get_item('trim_frame_end')
+
+	if isinstance(trim_frame_start, int) or isinstance(trim_frame_end, int):
+		temp_file_name = temp_file_name + '-' + str(trim_frame_start) + '-' + str(trim_frame_end)
 	return os.path.join(state_manager.get_item('temp_path'), 'facefusion', temp_file_name)
 
 
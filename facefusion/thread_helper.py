@@ -1,5 +1,6 @@
 import threading
 from contextlib import nullcontext
+from contextvars import Context
 from typing import ContextManager, Union
 
 from facefusion.execution import has_execution_provider
@@ -21,3 +22,8 @@ def conditional_thread_semaphore() -> Union[threading.Semaphore, ContextManager[
 	if has_execution_provider('directml') or has_execution_provider('rocm'):
 		return THREAD_SEMAPHORE
 	return NULL_CONTEXT
+
+
+def apply_thread_context(context : Context) -> None:
+	for context_var, context_value in context.items():
+		context_var.set(context_value)
@@ -1,5 +1,10 @@
-from collections import namedtuple
-from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypeAlias, TypedDict
+from collections import OrderedDict, namedtuple
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Event as SyncEvent
+from queue import Queue
+from threading import Event
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Literal, Optional, Set, Tuple, TypeAlias, TypedDict
 
 import cv2
 import numpy
@@ -16,6 +21,11 @@ Prediction : TypeAlias = NDArray[Any]
 BoundingBox : TypeAlias = NDArray[Any]
 FaceLandmark5 : TypeAlias = NDArray[Any]
 FaceLandmark68 : TypeAlias = NDArray[Any]
+BoundingBoxes : TypeAlias = NDArray[Any]
+FaceScores : TypeAlias = NDArray[Any]
+FaceLandmarks5 : TypeAlias = NDArray[Any]
+FaceLandmarkChecks : TypeAlias = NDArray[numpy.bool_]
+FaceDetection : TypeAlias = Tuple[BoundingBoxes, FaceScores, FaceLandmarks5]
 FaceLandmarkSet = TypedDict('FaceLandmarkSet',
 {
 	'5' : FaceLandmark5, #type:ignore[valid-type]
@@ -44,10 +54,20 @@ Face = namedtuple('Face',
 	'age',
 	'race'
 ])
+FaceAttribute = Literal['embedding', 'classification']
 FaceSet : TypeAlias = Dict[str, List[Face]]
+ReferenceMatrix : TypeAlias = NDArray[numpy.float32]
+FaceStoreStats = TypedDict('FaceStoreStats',
+{
+	'hits' : int,
+	'misses' : int,
+	'evictions' : int,
+	'size' : int
+})
 FaceStore = TypedDict('FaceStore',
 {
-	'static_faces' : FaceSet,
+	'static_faces' : OrderedDict[str, List[Face]],
+	'static_face_stats' : FaceStoreStats,
 	'reference_faces' : FaceSet
 })
 VideoPoolSet : TypeAlias = Dict[str, cv2.VideoCapture]
@@ -58,6 +78,7 @@ Points : TypeAlias = NDArray[Any]
 Distance : TypeAlias = NDArray[Any]
 Matrix : TypeAlias = NDArray[Any]
 Anchors : TypeAlias = NDArray[Any]
+AnchorStrides : TypeAlias = NDArray[Any]
 Translation : TypeAlias = NDArray[Any]
 
 AudioBuffer : TypeAlias = bytes
@@ -74,6 +95,35 @@ Padding : TypeAlias = Tuple[int, int, int, int]
 Orientation = Literal['landscape', 'portrait']
 Resolution : TypeAlias = Tuple[int, int]
 
+FaceTrackSet : TypeAlias = Dict[int, List[Face]]
+FaceTrack = TypedDict('FaceTrack',
+{
+	'path' : Optional[str],
+	'resolution' : Optional[Resolution],
+	'faces' : FaceTrackSet
+})
+FaceTrackArrays : TypeAlias = Dict[str, NDArray[Any]]
+FaceClusterSet : TypeAlias = Dict[int, List[Face]]
+FaceClusterLinks : TypeAlias = NDArray[numpy.bool_]
+FaceClusterLabels : TypeAlias = NDArray[numpy.int64]
+FaceTrackerFrame = TypedDict('FaceTrackerFrame',
+{
+	'keyframe_number' : int,
+	'vision_frame' : VisionFrame,
+	'histogram' : NDArray[Any],
+	'faces' : List[Face]
+})
+FaceTrackerSet : TypeAlias = Dict[int, FaceTrackerFrame]
+
+FrameManifest = TypedDict('FrameManifest',
+{
+	'path' : Optional[str],
+	'hash' : Optional[str],
+	'stage' : Optional[str],
+	'frame_numbers' : Set[int],
+	'deferred_frame_numbers' : Optional[List[int]]
+})
+
 ProcessState = Literal['checking', 'processing', 'stopping', 'pending']
 QueuePayload = TypedDict('QueuePayload',
 {
@@ -83,6 +133,30 @@ QueuePayload = TypedDict('QueuePayload',
 Args : TypeAlias = Dict[str, Any]
 UpdateProgress : TypeAlias = Callable[[int], None]
 ProcessFrames : TypeAlias = Callable[[List[str], List[QueuePayload], UpdateProgress], None]
+ProcessEvent : TypeAlias = SyncEvent
+ProcessProgress : TypeAlias = 'Synchronized[int]'
+SharedFrame = TypedDict('SharedFrame',
+{
+	'name' : str,
+	'shape' : Tuple[int, ...]
+})
+ProcessChain = TypedDict('ProcessChain',
+{
+	'processor_modules' : List[ModuleType],
+	'reference_faces' : Optional[FaceSet],
+	'source_face' : Optional[Face]
+})
+ProcessChainSet : TypeAlias = Dict[Tuple[str, ...], ProcessChain]
+StageFrame = TypedDict('StageFrame',
+{
+	'frame_number' : int,
+	'frame_path' : str,
+	'source_audio_frame' : AudioFrame,
+	'source_vision_frame' : VisionFrame,
+	'target_vision_frame' : VisionFrame
+})
+StageQueue : TypeAlias = Queue[Optional[StageFrame]]
+ProcessStage : TypeAlias = Callable[[StageFrame], StageFrame]
 ProcessStep : TypeAlias = Callable[[str, int, Args], bool]
 
 Content : TypeAlias = Dict[str, Any]
@@ -91,6 +165,16 @@ Commands : TypeAlias = List[str]
 
 WarpTemplate = Literal['arcface_112_v1', 'arcface_112_v2', 'arcface_128', 'dfl_whole_face', 'ffhq_512', 'mtcnn_512', 'styleganex_384']
 WarpTemplateSet : TypeAlias = Dict[WarpTemplate, NDArray[Any]]
+FaceProfile = TypedDict('FaceProfile',
+{
+	'face' : Face,
+	'crop_vision_frames' : Dict[WarpTemplate, VisionFrame],
+	'source_hash' : Optional[str]
+})
+FaceProfileSet : TypeAlias = Dict[str, FaceProfile]
+SourceFaceSet : TypeAlias = Dict[str, Optional[Face]]
+FaceProfileCropSet : TypeAlias = Dict[WarpTemplate, Tuple[int, int]]
+FaceProfileArrays : TypeAlias = Dict[str, NDArray[Any]]
 ProcessMode = Literal['output', 'preview', 'stream']
 
 ErrorCode = Literal[0, 1, 2, 3, 4]
@@ -100,8 +184,35 @@ LogLevelSet : TypeAlias = Dict[LogLevel, int]
 TableHeaders = List[str]
 TableContents = List[List[Any]]
 
+ProfileSpanName = Literal['decode', 'detect', 'landmark', 'embed', 'classify', 'mask', 'forward', 'paste_back', 'write', 'encode']
+ProfileSpan = TypedDict('ProfileSpan',
+{
+	'name' : ProfileSpanName,
+	'ph' : str,
+	'ts' : float,
+	'dur' : float,
+	'pid' : int,
+	'tid' : int,
+	'args' : Dict[str, Any]
+})
+Profile = TypedDict('Profile',
+{
+	'is_enabled' : bool,
+	'start_time' : float,
+	'spans' : List[ProfileSpan]
+})
+SharedStreamFrame : TypeAlias = Tuple[SharedFrame, List[ProfileSpan]]
+ProcessResult = TypedDict('ProcessResult',
+{
+	'frame_numbers' : List[int],
+	'track_faces' : FaceTrackSet,
+	'profile_spans' : List[ProfileSpan]
+})
+
 FaceDetectorModel = Literal['many', 'retinaface', 'scrfd', 'yolo_face']
+FaceDetectorAngleMode = Literal['all', 'adaptive']
 FaceLandmarkerModel = Literal['many', '2dfan4', 'peppa_wutz']
+FaceLandmarkerMode = Literal['all', 'adaptive']
 FaceDetectorSet : TypeAlias = Dict[FaceDetectorModel, List[str]]
 FaceSelectorMode = Literal['many', 'one', 'reference']
 FaceSelectorOrder = Literal['left-right', 'right-left', 'top-bottom', 'bottom-top', 'small-large', 'large-small', 'best-worst', 'worst-best']
@@ -117,6 +228,7 @@ AudioFormat = Literal['flac', 'm4a', 'mp3', 'ogg', 'opus', 'wav']
 ImageFormat = Literal['bmp', 'jpeg', 'png', 'tiff', 'webp']
 VideoFormat = Literal['avi', 'm4v', 'mkv', 'mov', 'mp4', 'webm']
 TempFrameFormat = Literal['bmp', 'jpeg', 'png', 'tiff']
+VideoPipeline = Literal['sequential', 'fused', 'staged', 'stream']
 AudioTypeSet : TypeAlias = Dict[AudioFormat, str]
 ImageTypeSet : TypeAlias = Dict[ImageFormat, str]
 VideoTypeSet : TypeAlias = Dict[VideoFormat, str]
@@ -148,10 +260,19 @@ StreamMode = Literal['udp', 'v4l2']
 ModelOptions : TypeAlias = Dict[str, Any]
 ModelSet : TypeAlias = Dict[str, ModelOptions]
 ModelInitializer : TypeAlias = NDArray[Any]
+ModelConstants = TypedDict('ModelConstants',
+{
+	'type' : Optional[str],
+	'template' : WarpTemplate,
+	'size' : Resolution,
+	'mean' : NDArray[Any],
+	'standard_deviation' : NDArray[Any]
+})
 
 ExecutionProvider = Literal['cpu', 'coreml', 'cuda', 'directml', 'openvino', 'rocm', 'tensorrt']
 ExecutionProviderValue = Literal['CPUExecutionProvider', 'CoreMLExecutionProvider', 'CUDAExecutionProvider', 'DmlExecutionProvider', 'OpenVINOExecutionProvider', 'ROCMExecutionProvider', 'TensorrtExecutionProvider']
 ExecutionProviderSet : TypeAlias = Dict[ExecutionProvider, ExecutionProviderValue]
+ExecutionBackend = Literal['thread', 'process']
 InferenceSessionProvider : TypeAlias = Any
 ValueAndUnit = TypedDict('ValueAndUnit',
 {
@@ -213,6 +334,23 @@ AppContext = Literal['cli', 'ui']
 
 InferencePool : TypeAlias = Dict[str, InferenceSession]
 InferencePoolSet : TypeAlias = Dict[AppContext, Dict[str, InferencePool]]
+BatchInputs : TypeAlias = Dict[str, NDArray[Any]]
+BatchOutputs : TypeAlias = List[NDArray[Any]]
+BatchRequest = TypedDict('BatchRequest',
+{
+	'inputs' : BatchInputs,
+	'outputs' : Optional[BatchOutputs],
+	'exception' : Optional[Exception],
+	'event' : Event,
+	'is_leader' : bool
+})
+BatchQueue = TypedDict('BatchQueue',
+{
+	'is_batchable' : bool,
+	'is_running' : bool,
+	'requests' : List[BatchRequest]
+})
+BatchQueueSet : TypeAlias = Dict[int, BatchQueue]
 
 UiWorkflow = Literal['instant_runner', 'job_runner', 'job_manager']
 
@@ -222,6 +360,7 @@ JobStore = TypedDict('JobStore',
 	'step_keys' : List[str]
 })
 JobOutputSet : TypeAlias = Dict[str, List[str]]
+SegmentRange : TypeAlias = Tuple[int, int]
 JobStatus = Literal['drafted', 'queued', 'completed', 'failed']
 JobStepStatus = Literal['drafted', 'queued', 'started', 'completed', 'failed']
 JobStep = TypedDict('JobStep',
@@ -245,20 +384,29 @@ StateKey = Literal\
 	'temp_path',
 	'jobs_path',
 	'source_paths',
+	'source_face_profile',
 	'target_path',
 	'output_path',
 	'source_pattern',
+	'source_face_profile_pattern',
 	'target_pattern',
 	'output_pattern',
 	'download_providers',
 	'download_scope',
 	'benchmark_resolutions',
 	'benchmark_cycle_count',
+	'benchmark_face_count',
+	'face_cluster_sample_count',
+	'face_cluster_distance',
 	'face_detector_model',
 	'face_detector_size',
 	'face_detector_angles',
+	'face_detector_angle_mode',
 	'face_detector_score',
+	'face_detector_interval',
+	'face_detector_proxy_size',
 	'face_landmarker_model',
+	'face_landmarker_mode',
 	'face_landmarker_score',
 	'face_selector_mode',
 	'face_selector_order',
@@ -269,6 +417,8 @@ StateKey = Literal\
 	'reference_face_position',
 	'reference_face_distance',
 	'reference_frame_number',
+	'reference_face_cluster_path',
+	'reference_face_cluster_index',
 	'face_occluder_model',
 	'face_parser_model',
 	'face_mask_types',
@@ -280,6 +430,8 @@ StateKey = Literal\
 	'trim_frame_end',
 	'temp_frame_format',
 	'keep_temp',
+	'video_pipeline',
+	'face_track_cache',
 	'output_image_quality',
 	'output_image_resolution',
 	'output_audio_encoder',
@@ -296,15 +448,24 @@ StateKey = Literal\
 	'ui_workflow',
 	'execution_device_id',
 	'execution_providers',
+	'execution_backend',
 	'execution_thread_count',
 	'execution_queue_count',
+	'execution_batch_size',
+	'execution_reader_thread_count',
+	'execution_analyser_thread_count',
+	'execution_writer_thread_count',
+	'execution_stage_queue_depth',
 	'video_memory_strategy',
 	'system_memory_limit',
 	'log_level',
 	'halt_on_error',
+	'profile_output',
 	'job_id',
 	'job_status',
-	'step_index'
+	'step_index',
+	'segment_frame_total',
+	'step_worker_count'
 ]
 State = TypedDict('State',
 {
@@ -313,20 +474,29 @@ State = TypedDict('State',
 	'temp_path' : str,
 	'jobs_path' : str,
 	'source_paths' : List[str],
+	'source_face_profile' : str,
 	'target_path' : str,
 	'output_path' : str,
 	'source_pattern' : str,
+	'source_face_profile_pattern' : str,
 	'target_pattern' : str,
 	'output_pattern' : str,
 	'download_providers': List[DownloadProvider],
 	'download_scope': DownloadScope,
 	'benchmark_resolutions': List[BenchmarkResolution],
 	'benchmark_cycle_count': int,
+	'benchmark_face_count': int,
+	'face_cluster_sample_count' : int,
+	'face_cluster_distance' : float,
 	'face_detector_model' : FaceDetectorModel,
 	'face_detector_size' : str,
 	'face_detector_angles' : List[Angle],
+	'face_detector_angle_mode' : FaceDetectorAngleMode,
 	'face_detector_score' : Score,
+	'face_detector_interval' : int,
+	'face_detector_proxy_size' : int,
 	'face_landmarker_model' : FaceLandmarkerModel,
+	'face_landmarker_mode' : FaceLandmarkerMode,
 	'face_landmarker_score' : Score,
 	'face_selector_mode' : FaceSelectorMode,
 	'face_selector_order' : FaceSelectorOrder,
@@ -337,6 +507,8 @@ State = TypedDict('State',
 	'reference_face_position' : int,
 	'reference_face_distance' : float,
 	'reference_frame_number' : int,
+	'reference_face_cluster_path' : str,
+	'reference_face_cluster_index' : int,
 	'face_occluder_model' : FaceOccluderModel,
 	'face_parser_model' : FaceParserModel,
 	'face_mask_types' : List[FaceMaskType],
@@ -348,6 +520,8 @@ State = TypedDict('State',
 	'trim_frame_end' : int,
 	'temp_frame_format' : TempFrameFormat,
 	'keep_temp' : bool,
+	'video_pipeline' : VideoPipeline,
+	'face_track_cache' : bool,
 	'output_image_quality' : int,
 	'output_image_resolution' : str,
 	'output_audio_encoder' : AudioEncoder,
@@ -364,15 +538,24 @@ State = TypedDict('State',
 	'ui_workflow' : UiWorkflow,
 	'execution_device_id' : str,
 	'execution_providers' : List[ExecutionProvider],
+	'execution_backend' : ExecutionBackend,
 	'execution_thread_count' : int,
 	'execution_queue_count' : int,
+	'execution_batch_size' : int,
+	'execution_reader_thread_count' : int,
+	'execution_analyser_thread_count' : int,
+	'execution_writer_thread_count' : int,
+	'execution_stage_queue_depth' : int,
 	'video_memory_strategy' : VideoMemoryStrategy,
 	'system_memory_limit' : int,
 	'log_level' : LogLevel,
 	'halt_on_error' : bool,
+	'profile_output' : Optional[str],
 	'job_id' : str,
 	'job_status' : JobStatus,
-	'step_index' : int
+	'step_index' : int,
+	'segment_frame_total' : int,
+	'step_worker_count' : int
 })
 ApplyStateItem : TypeAlias = Callable[[Any, Any], None]
 StateSet : TypeAlias = Dict[AppContext, State]
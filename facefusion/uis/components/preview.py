@@ -43,7 +43,7 @@ def render() -> None:
 	conditional_append_reference_faces()
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 	source_frames = read_static_images(state_manager.get_item('source_paths'))
-	source_faces = get_many_faces(source_frames)
+	source_faces = get_many_faces(source_frames, [ 'embedding' ])
 	source_face = get_average_face(source_faces)
 	source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
 	source_audio_frame = create_empty_audio_frame()
@@ -201,7 +201,7 @@ def update_preview_image(frame_number : int = 0) -> gradio.Image:
 	source_faces = []
 
 	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
+		temp_faces = get_many_faces([ source_frame ], [ 'embedding' ])
 		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
 		if temp_faces:
 			source_faces.append(get_first(temp_faces))
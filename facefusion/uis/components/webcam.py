@@ -9,6 +9,7 @@ import gradio
 from tqdm import tqdm
 
 from facefusion import ffmpeg_builder, logger, state_manager, wording
+from facefusion.app_context import detect_app_context, set_app_context
 from facefusion.audio import create_empty_audio_frame
 from facefusion.common_helper import is_windows
 from facefusion.content_analyser import analyse_stream
@@ -88,7 +89,7 @@ def start(webcam_device_id : int, webcam_mode : WebcamMode, webcam_resolution :
 	state_manager.set_item('face_selector_mode', 'one')
 	source_image_paths = filter_image_paths(state_manager.get_item('source_paths'))
 	source_frames = read_static_images(source_image_paths)
-	source_faces = get_many_faces(source_frames)
+	source_faces = get_many_faces(source_frames, [ 'embedding' ])
 	source_face = get_average_face(source_faces)
 	stream = None
 	webcam_capture = None
@@ -122,7 +123,7 @@ def multi_process_capture(source_face : Face, webcam_capture : cv2.VideoCapture,
 	deque_capture_frames: Deque[VisionFrame] = deque()
 
 	with tqdm(desc = wording.get('streaming'), unit = 'frame', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
-		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), initializer = set_app_context, initargs = (detect_app_context(),)) as executor:
 			futures = []
 
 			while webcam_capture and webcam_capture.isOpened():
@@ -1,4 +1,5 @@
 import math
+import os
 from functools import lru_cache
 from typing import List, Optional, Tuple
 
@@ -9,6 +10,7 @@ from cv2.typing import Size
 import facefusion.choices
 from facefusion.common_helper import is_windows
 from facefusion.filesystem import get_file_extension, is_image, is_video
+from facefusion.profiler import profile_span
 from facefusion.thread_helper import thread_semaphore
 from facefusion.types import Duration, Fps, Orientation, Resolution, VisionFrame
 from facefusion.video_manager import get_video_capture
@@ -28,6 +30,7 @@ def read_static_images(image_paths : List[str]) -> List[VisionFrame]:
 	return frames
 
 
+@profile_span('decode')
 def read_image(image_path : str) -> Optional[VisionFrame]:
 	if is_image(image_path):
 		if is_windows():
@@ -37,14 +40,17 @@ def read_image(image_path : str) -> Optional[VisionFrame]:
 	return None
 
 
+@profile_span('write')
 def write_image(image_path : str, vision_frame : VisionFrame) -> bool:
 	if image_path:
-		if is_windows():
-			image_file_extension = get_file_extension(image_path)
-			_, vision_frame = cv2.imencode(image_file_extension, vision_frame)
-			vision_frame.tofile(image_path)
+		image_file_extension = get_file_extension(image_path)
+		temp_image_path = image_path + '.tmp'
+		is_encoded, image_buffer = cv2.imencode(image_file_extension, vision_frame)
+
+		if is_encoded:
+			image_buffer.tofile(temp_image_path)
+			os.replace(temp_image_path, image_path)
 			return is_image(image_path)
-		return cv2.imwrite(image_path, vision_frame)
 	return False
 
 
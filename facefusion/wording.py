@@ -7,6 +7,7 @@ WORDING : Dict[str, Any] =\
 	'curl_not_installed': 'cURL is not installed',
 	'ffmpeg_not_installed': 'FFMpeg is not installed',
 	'creating_temp': 'Creating temporary resources',
+	'resuming_frames': 'Resuming from previously processed frames',
 	'extracting_frames': 'Extracting frames with a resolution of {resolution} and {fps} frames per second',
 	'extracting_frames_succeed': 'Extracting frames succeed',
 	'extracting_frames_failed': 'Extracting frames failed',
@@ -26,12 +27,21 @@ WORDING : Dict[str, Any] =\
 	'merging_video': 'Merging video with a resolution of {resolution} and {fps} frames per second',
 	'merging_video_succeed': 'Merging video succeed',
 	'merging_video_failed': 'Merging video failed',
+	'streaming_video': 'Streaming video with a resolution of {resolution} and {fps} frames per second',
+	'streaming_video_succeed': 'Streaming video succeed',
+	'streaming_video_failed': 'Streaming video failed',
+	'loading_face_track_succeed': 'Loading face track succeed',
+	'saving_face_track_succeed': 'Saving face track succeed',
+	'clustering_faces': 'Clustering faces of the target',
+	'clustering_faces_succeed': 'Clustering faces to {output_path} succeed in {seconds} seconds',
+	'clustering_faces_failed': 'Clustering faces failed',
 	'skipping_audio': 'Skipping audio',
 	'replacing_audio_succeed': 'Replacing audio succeed',
 	'replacing_audio_skipped': 'Replacing audio skipped',
 	'restoring_audio_succeed': 'Restoring audio succeed',
 	'restoring_audio_skipped': 'Restoring audio skipped',
 	'clearing_temp': 'Clearing temporary resources',
+	'saving_profile_succeed': 'Saving processing profile to {profile_output} succeed',
 	'processing_stopped': 'Processing stopped',
 	'processing_image_succeed': 'Processing to image succeed in {seconds} seconds',
 	'processing_image_failed': 'Processing to image failed',
@@ -62,6 +72,8 @@ WORDING : Dict[str, Any] =\
 	'job_all_not_deleted': 'Jobs not deleted',
 	'job_step_added': 'Step added to job {job_id}',
 	'job_step_not_added': 'Step not added to job {job_id}',
+	'job_segments_added': '{segment_total} segment steps added to job {job_id}',
+	'job_segments_not_added': 'Segment steps not added to job {job_id}',
 	'job_remix_step_added': 'Step {step_index} remixed from job {job_id}',
 	'job_remix_step_not_added': 'Step {step_index} not remixed from job {job_id}',
 	'job_step_inserted': 'Step {step_index} inserted to job {job_id}',
@@ -101,19 +113,25 @@ WORDING : Dict[str, Any] =\
 		'temp_path': 'specify the directory for the temporary resources',
 		'jobs_path': 'specify the directory to store jobs',
 		'source_paths': 'choose the image or audio paths',
+		'source_face_profile': 'load the source face from this profile file or create it from the source paths once',
 		'target_path': 'choose the image or video path',
 		'output_path': 'specify the image or video within a directory',
 		# patterns
 		'source_pattern': 'choose the image or audio pattern',
+		'source_face_profile_pattern': 'choose the source face profile pattern per source (e.g. profiles/{source_name}.npz)',
 		'target_pattern': 'choose the image or video pattern',
 		'output_pattern': 'specify the image or video pattern',
 		# face detector
 		'face_detector_model': 'choose the model responsible for detecting the faces',
 		'face_detector_size': 'specify the frame size provided to the face detector',
 		'face_detector_angles': 'specify the angles to rotate the frame before detecting faces',
+		'face_detector_angle_mode': 'choose whether to detect at all angles or only try further angles when the previous ones find no face',
 		'face_detector_score': 'filter the detected faces base on the confidence score',
+		'face_detector_interval': 'run the face detector every n frames and track the faces in between (0 = detect every frame)',
+		'face_detector_proxy_size': 'analyse the faces on a copy of the frame downscaled to this height (0 = full resolution)',
 		# face landmarker
 		'face_landmarker_model': 'choose the model responsible for detecting the face landmarks',
+		'face_landmarker_mode': 'choose whether to detect the face landmarks for all faces or skip them when the detected face landmarks are stable and sufficient for the processors',
 		'face_landmarker_score': 'filter the detected face landmarks base on the confidence score',
 		# face selector
 		'face_selector_mode': 'use reference based tracking or simple matching',
@@ -125,6 +143,8 @@ WORDING : Dict[str, Any] =\
 		'reference_face_position': 'specify the position used to create the reference face',
 		'reference_face_distance': 'specify the similarity between the reference face and target face',
 		'reference_frame_number': 'specify the frame used to create the reference face',
+		'reference_face_cluster_path': 'use the faces of a clustered identity from the face-cluster output as reference',
+		'reference_face_cluster_index': 'specify the clustered identity used as reference',
 		# face masker
 		'face_occluder_model': 'choose the model responsible for the occlusion mask',
 		'face_parser_model': 'choose the model responsible for the region mask',
@@ -138,6 +158,8 @@ WORDING : Dict[str, Any] =\
 		'trim_frame_end': 'specify the ending frame of the target video',
 		'temp_frame_format': 'specify the temporary resources format',
 		'keep_temp': 'keep the temporary resources after processing',
+		'video_pipeline': 'choose whether the processors run one pass each, fused in a single pass, in overlapping stages or streamed in memory',
+		'face_track_cache': 'cache the analysed faces per frame to reuse them across processors and runs',
 		# output creation
 		'output_image_quality': 'specify the image quality which translates to the image compression',
 		'output_image_resolution': 'specify the image resolution based on the target image',
@@ -195,27 +217,41 @@ WORDING : Dict[str, Any] =\
 		# benchmark
 		'benchmark_resolutions': 'choose the resolutions for the benchmarks (choices: {choices}, ...)',
 		'benchmark_cycle_count': 'specify the amount of cycles per benchmark',
+		'benchmark_face_count': 'specify the amount of faces per benchmark frame by stacking the target side by side',
+		# face cluster
+		'face_cluster_sample_count': 'specify the amount of frames sampled from the target to cluster the faces',
+		'face_cluster_distance': 'specify the maximum distance between faces of the same identity',
 		# execution
 		'execution_device_id': 'specify the device used for processing',
 		'execution_providers': 'inference using different providers (choices: {choices}, ...)',
+		'execution_backend': 'choose between worker threads and worker processes while processing',
 		'execution_thread_count': 'specify the amount of parallel threads while processing',
 		'execution_queue_count': 'specify the amount of frames each thread is processing',
+		'execution_batch_size': 'specify the maximum amount of crops merged into one inference call',
+		'execution_reader_thread_count': 'specify the amount of threads reading frames in the staged pipeline',
+		'execution_analyser_thread_count': 'specify the amount of threads analysing faces ahead of the processors in the staged pipeline (0 to skip)',
+		'execution_writer_thread_count': 'specify the amount of threads writing frames in the staged pipeline',
+		'execution_stage_queue_depth': 'specify the maximum amount of frames buffered between the stages of the staged pipeline',
 		# memory
 		'video_memory_strategy': 'balance fast processing and low VRAM usage',
 		'system_memory_limit': 'limit the available RAM that can be used while processing',
 		# misc
 		'log_level': 'adjust the message severity displayed in the terminal',
 		'halt_on_error': 'halt the program once an error occurred',
+		'profile_output': 'record the processing spans as chrome trace to the output path',
 		# run
 		'run': 'run the program',
 		'headless_run': 'run the program in headless mode',
 		'batch_run': 'run the program in batch mode',
 		'force_download': 'force automate downloads and exit',
 		'benchmark': 'benchmark the program',
+		'face_cluster': 'cluster the faces of the target into reference identities',
 		# jobs
 		'job_id': 'specify the job id',
 		'job_status': 'specify the job status',
 		'step_index': 'specify the step index',
+		'segment_frame_total': 'specify the minimum amount of frames per keyframe aligned segment',
+		'step_worker_count': 'specify the amount of independent job steps processed in parallel',
 		# job manager
 		'job_list': 'list jobs by status',
 		'job_create': 'create a drafted job',
@@ -224,6 +260,7 @@ WORDING : Dict[str, Any] =\
 		'job_delete': 'delete a drafted, queued, failed or completed job',
 		'job_delete_all': 'delete all drafted, queued, failed and completed jobs',
 		'job_add_step': 'add a step to a drafted job',
+		'job_add_segments': 'add keyframe aligned segment steps of a video to a drafted job',
 		'job_remix_step': 'remix a previous step from a drafted job',
 		'job_insert_step': 'insert a step to a drafted job',
 		'job_remove_step': 'remove a step from a drafted job',
@@ -3,18 +3,19 @@
 RunPod Serverless Handler for FaceFusion Face Swap
 """
 
-import runpod
+import json
+import logging
 import os
+import subprocess
+import sys
 import tempfile
-import uuid
-import requests
+import threading
 import time
-import subprocess
-import logging
-import shutil
+import uuid
+from argparse import ArgumentParser
 from datetime import datetime
 from pathlib import Path
-from minio import Minio
+from typing import Any, Dict, List, Optional, Set, Tuple, TypedDict
 from urllib.parse import quote
 
 # Configure logging
@@ -28,18 +29,39 @@ MINIO_SECRET_KEY = "fCFngM7YTr6jSkBKXZ9BkfDdXrStYXm43UGa0OZQ"
 MINIO_BUCKET = "aiclipdfl"
 MINIO_SECURE = False
 
-# Initialize MinIO client
-minio_client = Minio(
-    MINIO_ENDPOINT,
-    access_key=MINIO_ACCESS_KEY,
-    secret_key=MINIO_SECRET_KEY,
-    secure=MINIO_SECURE
-)
+# MinIO client, created on first upload
+minio_client: Optional[Any] = None
 
 # FaceFusion configuration
-FACEFUSION_PATH = "/facefusion"
+FACEFUSION_PATH = os.environ.get("FACEFUSION_PATH", "/facefusion")
 FACEFUSION_PYTHON = f"{FACEFUSION_PATH}/venv/bin/python"
 FACEFUSION_SCRIPT = f"{FACEFUSION_PATH}/facefusion.py"
+FACEFUSION_CONFIG = f"{FACEFUSION_PATH}/facefusion.ini"
+
+# Worker mode: "in_process" keeps FaceFusion loaded between requests, "subprocess" spawns it per request
+FACEFUSION_WORKER_MODE = os.environ.get("FACEFUSION_WORKER_MODE", "in_process")
+
+# Job timeout for both worker modes (30 minutes)
+FACEFUSION_JOB_TIMEOUT = 1800
+
+JobArgs = Dict[str, Any]
+JobResult = Dict[str, Any]
+
+
+class FaceFusionWorker(TypedDict):
+    ready: bool
+    warm_up_seconds: float
+    programs: Dict[Tuple[Any, ...], ArgumentParser]
+    pre_checked: Set[Tuple[Tuple[str, str], ...]]
+
+
+# Warm worker state shared across requests
+FACEFUSION_WORKER: FaceFusionWorker = {
+    "ready": False,
+    "warm_up_seconds": 0.0,
+    "programs": {},
+    "pre_checked": set()
+}
 
 # Supported face swapper models
 FACE_SWAPPER_MODELS = [
@@ -53,6 +75,7 @@ FACE_SWAPPER_MODELS = [
     "unet_face_swapper"
 ]
 
+
 def validate_face_swapper_model(model: str) -> str:
     """Validate and return face swapper model"""
     if model in FACE_SWAPPER_MODELS:
@@ -60,14 +83,16 @@ def validate_face_swapper_model(model: str) -> str:
     logger.warning(f"Invalid face swapper model '{model}', defaulting to 'uniface_256'")
     return "uniface_256"
 
+
 def download_file(url: str, local_path: str) -> bool:
     """Download file from URL with progress tracking"""
+    import requests
+
     try:
         logger.info(f"📥 Downloading {url}")
         response = requests.get(url, stream=True, timeout=300)
         response.raise_for_status()
         
-        total_size = int(response.headers.get('content-length', 0))
         downloaded = 0
         
         with open(local_path, 'wb') as f:
@@ -82,13 +107,30 @@ def download_file(url: str, local_path: str) -> bool:
         logger.error(f"❌ Download failed: {e}")
         return False
 
+
+def get_minio_client() -> Any:
+    """Get the MinIO client, created once per worker"""
+    global minio_client
+
+    if minio_client is None:
+        from minio import Minio
+
+        minio_client = Minio(
+            MINIO_ENDPOINT,
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=MINIO_SECURE
+        )
+    return minio_client
+
+
 def upload_to_minio(local_path: str, object_name: str) -> str:
     """Upload file to MinIO storage"""
     try:
         if not os.path.exists(local_path):
             raise FileNotFoundError(f"Local file not found: {local_path}")
         
-        minio_client.fput_object(MINIO_BUCKET, object_name, local_path)
+        get_minio_client().fput_object(MINIO_BUCKET, object_name, local_path)
         file_url = f"http://{MINIO_ENDPOINT}/{MINIO_BUCKET}/{quote(object_name)}"
         logger.info(f"✅ Uploaded successfully: {file_url}")
         return file_url
@@ -96,6 +138,212 @@ def upload_to_minio(local_path: str, object_name: str) -> str:
         logger.error(f"❌ Upload failed: {e}")
         raise e
 
+
+def build_facefusion_argv(job_args: JobArgs) -> List[str]:
+    """Convert job args into FaceFusion headless-run arguments"""
+    argv = ["headless-run", "--config-path", FACEFUSION_CONFIG]
+
+    for key, value in job_args.items():
+        option = "--" + key.replace("_", "-")
+
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(option)
+        elif isinstance(value, (list, tuple)):
+            argv.append(option)
+            argv.extend(str(item) for item in value)
+        else:
+            argv.extend([option, str(value)])
+    return argv
+
+
+def get_facefusion_program(job_args: JobArgs) -> ArgumentParser:
+    """Get the FaceFusion argument parser, cached per model combination"""
+    # Some choices (face detector size, pixel boost) depend on the selected models and are read from sys.argv
+    program_key = (job_args.get("face_detector_model"), job_args.get("face_swapper_model"))
+
+    if program_key not in FACEFUSION_WORKER["programs"]:
+        from facefusion.program import create_program
+
+        argv = sys.argv
+        try:
+            sys.argv = [FACEFUSION_SCRIPT] + build_facefusion_argv(job_args)
+            FACEFUSION_WORKER["programs"][program_key] = create_program()
+        finally:
+            sys.argv = argv
+    return FACEFUSION_WORKER["programs"][program_key]
+
+
+def load_facefusion_job(job_args: JobArgs) -> bool:
+    """Apply job args to the FaceFusion state and validate models once per model combination"""
+    from facefusion import core, logger as facefusion_logger, state_manager
+    from facefusion.args import apply_args
+
+    args = vars(get_facefusion_program(job_args).parse_args(build_facefusion_argv(job_args)))
+    apply_args(args, state_manager.init_item)
+    facefusion_logger.init(state_manager.get_item("log_level"))
+
+    pre_check_key = tuple(sorted((key, str(value)) for key, value in args.items() if key == "processors" or key.endswith("_model")))
+
+    if pre_check_key not in FACEFUSION_WORKER["pre_checked"]:
+        if not core.common_pre_check() or not core.processors_pre_check():
+            return False
+        FACEFUSION_WORKER["pre_checked"].add(pre_check_key)
+    return True
+
+
+def warm_up_facefusion(job_args: Optional[JobArgs] = None) -> float:
+    """Load FaceFusion in-process and create the inference sessions ahead of the first request"""
+    if FACEFUSION_WORKER["ready"]:
+        return 0.0
+
+    start_time = time.time()
+    if FACEFUSION_PATH not in sys.path:
+        sys.path.insert(0, FACEFUSION_PATH)
+    os.chdir(FACEFUSION_PATH)
+
+    from facefusion import content_analyser, core, face_detector, face_landmarker, face_recognizer, state_manager
+    from facefusion.processors.core import get_processors_modules
+
+    state_manager.init_item("config_path", FACEFUSION_CONFIG)
+    if not core.pre_check():
+        raise RuntimeError("FaceFusion pre check failed")
+
+    if job_args:
+        if not load_facefusion_job(job_args):
+            raise RuntimeError("FaceFusion model validation failed")
+        for module in [content_analyser, face_detector, face_landmarker, face_recognizer] + get_processors_modules(state_manager.get_item("processors")):
+            module.get_inference_pool()
+
+    FACEFUSION_WORKER["ready"] = True
+    FACEFUSION_WORKER["warm_up_seconds"] = time.time() - start_time
+    logger.info(f"🔥 FaceFusion worker warmed up in {FACEFUSION_WORKER['warm_up_seconds']:.2f}s")
+    return FACEFUSION_WORKER["warm_up_seconds"]
+
+
+def reset_facefusion_job() -> None:
+    """Release per-job caches while keeping the inference sessions warm"""
+    if FACEFUSION_WORKER["ready"]:
+        from facefusion import audio, content_analyser, process_manager, vision
+        from facefusion.face_analyser import clear_face_detector_angle
+        from facefusion.face_profile import clear_face_profile_set
+        from facefusion.face_selector import clear_reference_matrix
+        from facefusion.face_store import clear_reference_faces, clear_static_faces
+        from facefusion.face_track import clear_face_track
+        from facefusion.face_tracker import clear_face_tracker
+
+        clear_reference_faces()
+        clear_static_faces()
+        clear_reference_matrix()
+        clear_face_profile_set()
+        clear_face_track()
+        clear_face_tracker()
+        clear_face_detector_angle()
+        for static_reader in [vision.read_static_image, audio.read_static_audio, audio.read_static_voice, content_analyser.analyse_image, content_analyser.analyse_video]:
+            static_reader.cache_clear()
+        process_manager.end()
+
+
+def stop_facefusion_job(timed_out: threading.Event) -> None:
+    """Ask the running FaceFusion job to stop once the timeout expires"""
+    from facefusion import process_manager
+
+    timed_out.set()
+    process_manager.stop()
+
+
+def run_facefusion_job(job_args: JobArgs) -> JobResult:
+    """Run a FaceFusion job in-process and return the result with timings"""
+    start_time = time.time()
+    result: JobResult = {
+        "status": "failed",
+        "error_code": 1,
+        "output_path": job_args.get("output_path"),
+        "warm": FACEFUSION_WORKER["ready"],
+        "timings": {}
+    }
+
+    try:
+        result["timings"]["warm_up_seconds"] = round(warm_up_facefusion(), 2)
+
+        from facefusion import core
+
+        pre_check_time = time.time()
+        reset_facefusion_job()
+        if not load_facefusion_job(job_args):
+            result["error"] = "FaceFusion model validation failed"
+            return result
+        result["timings"]["pre_check_seconds"] = round(time.time() - pre_check_time, 2)
+
+        process_time = time.time()
+        timed_out = threading.Event()
+        timeout_timer = threading.Timer(FACEFUSION_JOB_TIMEOUT, stop_facefusion_job, [timed_out])
+        timeout_timer.daemon = True
+        timeout_timer.start()
+        try:
+            result["error_code"] = core.conditional_process()
+        finally:
+            timeout_timer.cancel()
+        result["timings"]["process_seconds"] = round(time.time() - process_time, 2)
+
+        if timed_out.is_set():
+            logger.error(f"❌ Face swap timed out ({FACEFUSION_JOB_TIMEOUT // 60} minutes)")
+            result["error"] = "FaceFusion timed out"
+        elif result["error_code"] == 0 and os.path.exists(job_args.get("output_path")):
+            result["status"] = "completed"
+        else:
+            result["error"] = f"FaceFusion failed with error code {result['error_code']}"
+    except SystemExit:
+        logger.error("❌ Invalid FaceFusion job args")
+        result["error"] = "Invalid FaceFusion job args"
+    except Exception as e:
+        logger.error(f"❌ FaceFusion worker error: {e}")
+        result["error"] = str(e)
+    finally:
+        reset_facefusion_job()
+        result["timings"]["total_seconds"] = round(time.time() - start_time, 2)
+    return result
+
+
+def run_facefusion_subprocess(job_args: JobArgs) -> JobResult:
+    """Run a FaceFusion job in a separate process and return the result with timings"""
+    start_time = time.time()
+    result: JobResult = {
+        "status": "failed",
+        "error_code": 1,
+        "output_path": job_args.get("output_path"),
+        "warm": False,
+        "timings": {}
+    }
+    cmd = [FACEFUSION_PYTHON, FACEFUSION_SCRIPT] + build_facefusion_argv(job_args)
+
+    logger.info(f"🚀 Command: {' '.join(cmd)}")
+
+    try:
+        process = subprocess.run(
+            cmd,
+            cwd=FACEFUSION_PATH,
+            capture_output=True,
+            text=True,
+            timeout=FACEFUSION_JOB_TIMEOUT
+        )
+        result["error_code"] = process.returncode
+
+        if process.returncode == 0 and os.path.exists(job_args.get("output_path")):
+            result["status"] = "completed"
+        else:
+            logger.error(f"STDOUT: {process.stdout}")
+            logger.error(f"STDERR: {process.stderr}")
+            result["error"] = f"FaceFusion failed with return code {process.returncode}"
+    except subprocess.TimeoutExpired:
+        logger.error(f"❌ Face swap timed out ({FACEFUSION_JOB_TIMEOUT // 60} minutes)")
+        result["error"] = "FaceFusion timed out"
+    finally:
+        result["timings"]["total_seconds"] = round(time.time() - start_time, 2)
+    return result
+
+
 def run_facefusion_faceswap(
     source_image_path: str,
     target_video_path: str,
@@ -105,72 +353,49 @@ def run_facefusion_faceswap(
     output_quality: int = 100,
     output_resolution: str = "1920x1080",
     execution_threads: int = 8
-) -> bool:
-    """Run FaceFusion face swap command"""
-    try:
-        logger.info(f"🎭 Running FaceFusion face swap with model: {face_swapper_model}")
-        
-        # Validate model
-        face_swapper_model = validate_face_swapper_model(face_swapper_model)
-        
-        # Build command
-        cmd = [
-            FACEFUSION_PYTHON,
-            FACEFUSION_SCRIPT,
-            "headless-run",
-            "--processors", "face_swapper",
-            "--face-swapper-model", face_swapper_model,
-            "--face-swapper-pixel-boost", pixel_boost,
-            "--output-video-quality", str(output_quality),
-            "--output-video-resolution", output_resolution,
-            "--execution-providers", "cuda",
-            "--execution-thread-count", str(execution_threads),
-            "-s", source_image_path,
-            "-t", target_video_path,
-            "-o", output_path
-        ]
-        
-        logger.info(f"🚀 Command: {' '.join(cmd)}")
-        
-        # Run command
-        result = subprocess.run(
-            cmd,
-            cwd=FACEFUSION_PATH,
-            capture_output=True,
-            text=True,
-            timeout=1800  # 30 minutes timeout
-        )
-        
-        if result.returncode == 0:
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path) / (1024 * 1024)
-                logger.info(f"✅ Face swap completed successfully ({file_size:.1f} MB)")
-                return True
-            else:
-                logger.error("❌ Face swap completed but output file not found")
-                return False
-        else:
-            logger.error(f"❌ Face swap failed with return code {result.returncode}")
-            logger.error(f"STDOUT: {result.stdout}")
-            logger.error(f"STDERR: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        logger.error("❌ Face swap timed out (30 minutes)")
-        return False
-    except Exception as e:
-        logger.error(f"❌ Face swap error: {e}")
-        return False
+) -> JobResult:
+    """Run FaceFusion face swap and return the result with timings"""
+    logger.info(f"🎭 Running FaceFusion face swap with model: {face_swapper_model}")
+
+    # Validate model
+    face_swapper_model = validate_face_swapper_model(face_swapper_model)
+
+    job_args = {
+        "processors": ["face_swapper"],
+        "face_swapper_model": face_swapper_model,
+        "face_swapper_pixel_boost": pixel_boost,
+        "output_video_quality": output_quality,
+        "output_video_resolution": output_resolution,
+        "execution_providers": ["cuda"],
+        "execution_thread_count": execution_threads,
+        "source_paths": [source_image_path],
+        "target_path": target_video_path,
+        "output_path": output_path
+    }
+
+    if FACEFUSION_WORKER_MODE == "in_process":
+        result = run_facefusion_job(job_args)
+    else:
+        result = run_facefusion_subprocess(job_args)
+
+    if result["status"] == "completed":
+        file_size = os.path.getsize(output_path) / (1024 * 1024)
+        logger.info(f"✅ Face swap completed successfully ({file_size:.1f} MB) in {result['timings']['total_seconds']}s")
+    else:
+        logger.error(f"❌ Face swap failed: {result.get('error')}")
+    return result
+
 
 def get_file_extension(url: str) -> str:
     """Get file extension from URL"""
     try:
         path = url.split('?')[0]  # Remove query parameters
         return Path(path).suffix.lower()
-    except:
+    except Exception:
         return ""
 
-def handler(job):
+
+def handler(job: Dict[str, Any]) -> Dict[str, Any]:
     """Main RunPod handler for FaceFusion face swap"""
     job_id = job.get("id", "unknown")
     start_time = time.time()
@@ -217,7 +442,7 @@ def handler(job):
             
             # Step 2: Run FaceFusion face swap
             logger.info("🎭 Step 2/3: Running FaceFusion face swap...")
-            swap_success = run_facefusion_faceswap(
+            swap_result = run_facefusion_faceswap(
                 source_path,
                 target_path, 
                 output_path,
@@ -228,8 +453,8 @@ def handler(job):
                 execution_threads
             )
             
-            if not swap_success:
-                return {"error": "Face swap processing failed"}
+            if swap_result["status"] != "completed":
+                return {"error": "Face swap processing failed", "timings": swap_result["timings"]}
             
             if not os.path.exists(output_path):
                 return {"error": "Face swap output not generated"}
@@ -252,6 +477,11 @@ def handler(job):
                     "output_resolution": output_resolution,
                     "execution_threads": execution_threads
                 },
+                "worker": {
+                    "mode": FACEFUSION_WORKER_MODE,
+                    "warm": swap_result["warm"]
+                },
+                "timings": swap_result["timings"],
                 "status": "completed"
             }
             
@@ -265,6 +495,19 @@ def handler(job):
             "processing_time_seconds": round(time.time() - start_time, 2)
         }
 
+
+def run_local_event_loop(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Feed events to the handler one after another, like the RunPod event loop does"""
+    results = []
+
+    for index, event in enumerate(events):
+        event.setdefault("id", f"local-{index}")
+        result = handler(event)
+        logger.info(f"🧪 Event {event['id']}: {result.get('status')} {result.get('timings')}")
+        results.append(result)
+    return results
+
+
 if __name__ == "__main__":
     logger.info("🚀 Starting FaceFusion Face Swap Serverless Worker...")
     logger.info(f"🎭 FaceFusion Path: {FACEFUSION_PATH}")
@@ -289,6 +532,27 @@ if __name__ == "__main__":
         logger.error("❌ FaceFusion script not found")
         exit(1)
     
+    # Warm up FaceFusion once so requests skip the cold start
+    if FACEFUSION_WORKER_MODE == "in_process":
+        try:
+            warm_up_facefusion({
+                "processors": ["face_swapper"],
+                "face_swapper_model": "uniface_256",
+                "face_swapper_pixel_boost": "1024x1024",
+                "execution_providers": ["cuda"]
+            })
+        except Exception as e:
+            logger.error(f"❌ FaceFusion warm up failed: {e}")
+            exit(1)
+
+    # Run local events without RunPod: python facefusion_handler.py --local-events events.json
+    if "--local-events" in sys.argv:
+        with open(sys.argv[sys.argv.index("--local-events") + 1]) as events_file:
+            run_local_event_loop(json.load(events_file))
+        exit(0)
+
     # Start RunPod serverless worker
+    import runpod
+
     logger.info("🎬 Ready to process face swap requests...")
     runpod.serverless.start({"handler": handler})
@@ -0,0 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from facefusion.app_context import detect_app_context, pin_app_context, set_app_context
+
+
+def test_detect_app_context() -> None:
+	assert detect_app_context() == 'cli'
+
+
+def test_pin_app_context() -> None:
+	with pin_app_context() as app_context:
+		assert app_context == 'cli'
+		set_app_context('ui')
+
+		assert detect_app_context() == 'ui'
+
+		with ThreadPoolExecutor(max_workers = 1, initializer = set_app_context, initargs = (detect_app_context(),)) as executor:
+			assert executor.submit(detect_app_context).result() == 'ui'
+
+	assert detect_app_context() == 'cli'
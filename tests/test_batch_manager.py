@@ -0,0 +1,109 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, List, Union
+
+import numpy
+import onnx
+import pytest
+from onnx import TensorProto, helper
+from onnxruntime import InferenceSession
+
+from facefusion import batch_manager, state_manager
+from facefusion.batch_manager import get_batch_queue, has_dynamic_batch, run_batch, run_stacked
+from facefusion.types import BatchInputs, BatchOutputs, BatchRequest
+
+
+def create_inference_session(batch_size : Union[str, int]) -> InferenceSession:
+	model_path = os.path.join(tempfile.gettempdir(), 'test-batch-manager-' + str(batch_size) + '.onnx')
+	model_input = helper.make_tensor_value_info('input', TensorProto.FLOAT, [ batch_size, 3 ])
+	model_output = helper.make_tensor_value_info('output', TensorProto.FLOAT, [ batch_size, 3 ])
+	model_graph = helper.make_graph([ helper.make_node('Neg', [ 'input' ], [ 'output' ]) ], 'test', [ model_input ], [ model_output ])
+	model = helper.make_model(model_graph, opset_imports = [ helper.make_opsetid('', 13) ])
+	model.ir_version = 8
+	onnx.save(model, model_path)
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+class CountInferenceSession:
+	def __init__(self, inference_session : InferenceSession) -> None:
+		self.inference_session = inference_session
+		self.batch_totals : List[int] = []
+
+	def get_inputs(self) -> Any:
+		return self.inference_session.get_inputs()
+
+	def run(self, output_names : Any, batch_inputs : BatchInputs) -> BatchOutputs:
+		self.batch_totals.append(len(batch_inputs.get('input')))
+		return self.inference_session.run(output_names, batch_inputs)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('execution_batch_size', 4)
+
+
+def test_has_dynamic_batch() -> None:
+	assert has_dynamic_batch(create_inference_session('batch')) is True
+	assert has_dynamic_batch(create_inference_session(1)) is False
+
+
+def test_run_batch() -> None:
+	inference_session = create_inference_session('batch')
+	batch_inputs = [ numpy.full((1, 3), index, dtype = numpy.float32) for index in range(32) ]
+
+	with ThreadPoolExecutor(max_workers = 8) as executor:
+		batch_outputs = list(executor.map(lambda batch_input: run_batch(inference_session, { 'input': batch_input }, nullcontext()), batch_inputs))
+
+	for batch_input, batch_output in zip(batch_inputs, batch_outputs):
+		assert batch_output[0].shape == (1, 3)
+		assert numpy.array_equal(batch_output[0], -batch_input)
+
+
+def test_run_batch_with_static_batch() -> None:
+	inference_session = create_inference_session(1)
+	batch_output = run_batch(inference_session, { 'input': numpy.ones((1, 3), dtype = numpy.float32) }, nullcontext())
+
+	assert numpy.array_equal(batch_output[0], -numpy.ones((1, 3)))
+
+
+def test_run_stacked() -> None:
+	batch_input = numpy.arange(12, dtype = numpy.float32).reshape(4, 3)
+
+	for inference_session in [ create_inference_session('batch'), create_inference_session(1) ]:
+		batch_output = run_stacked(inference_session, { 'input': batch_input }, nullcontext())
+
+		assert batch_output[0].shape == (4, 3)
+		assert numpy.array_equal(batch_output[0], -batch_input)
+
+
+def test_run_batch_with_failed_merge(monkeypatch : pytest.MonkeyPatch) -> None:
+	inference_session = create_inference_session('batch')
+	batch_inputs = [ numpy.full((1, 3), index, dtype = numpy.float32) for index in range(16) ]
+
+	def merge_batch_inputs(batch_requests : List[BatchRequest]) -> BatchInputs:
+		raise ValueError
+
+	monkeypatch.setattr(batch_manager, 'merge_batch_inputs', merge_batch_inputs)
+
+	with ThreadPoolExecutor(max_workers = 8) as executor:
+		batch_outputs = list(executor.map(lambda batch_input: run_batch(inference_session, { 'input': batch_input }, nullcontext()), batch_inputs))
+
+	for batch_input, batch_output in zip(batch_inputs, batch_outputs):
+		assert numpy.array_equal(batch_output[0], -batch_input)
+	assert get_batch_queue(inference_session).get('is_running') is False
+
+
+def test_run_batch_with_gathered_requests(monkeypatch : pytest.MonkeyPatch) -> None:
+	inference_session = CountInferenceSession(create_inference_session('batch'))
+	batch_inputs = [ numpy.full((1, 3), index, dtype = numpy.float32) for index in range(2) ]
+	state_manager.init_item('execution_batch_size', 2)
+	monkeypatch.setattr(batch_manager, 'BATCH_GATHER_TIMEOUT', 5.0)
+
+	with ThreadPoolExecutor(max_workers = 2) as executor:
+		batch_outputs = list(executor.map(lambda batch_input: run_batch(inference_session, { 'input': batch_input }, nullcontext()), batch_inputs)) #type:ignore[arg-type]
+
+	for batch_input, batch_output in zip(batch_inputs, batch_outputs):
+		assert numpy.array_equal(batch_output[0], -batch_input)
+	assert inference_session.batch_totals == [ 2 ]
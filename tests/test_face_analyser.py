@@ -1,11 +1,16 @@
 import subprocess
+from typing import List, Tuple
 
+import numpy
 import pytest
 
-from facefusion import face_classifier, face_detector, face_landmarker, face_recognizer, state_manager
+from facefusion import face_analyser, face_classifier, face_detector, face_landmarker, face_recognizer, state_manager
 from facefusion.download import conditional_download
-from facefusion.face_analyser import get_many_faces, get_one_face
-from facefusion.types import Face
+from facefusion.face_analyser import clear_face_detector_angle, create_proxy_frame, create_proxy_matrix, detect_many_faces, get_many_faces, get_one_face
+from facefusion.face_detector import create_empty_face_detection, decode_anchor_detection, detect_faces, detect_faces_batch
+from facefusion.face_landmarker import detect_face_landmarks, select_face_landmark_indices
+from facefusion.face_store import clear_static_faces
+from facefusion.types import Angle, BoundingBox, BoundingBoxes, Detection, Face, FaceDetection, FaceLandmark68, Score, VisionFrame
 from facefusion.vision import read_static_image
 from .helper import get_test_example_file, get_test_examples_directory
 
@@ -111,3 +116,142 @@ def test_get_many_faces() -> None:
 	assert isinstance(many_faces[0], Face)
 	assert isinstance(many_faces[1], Face)
 	assert isinstance(many_faces[2], Face)
+
+
+def test_detect_faces_batch() -> None:
+	state_manager.init_item('face_detector_model', 'scrfd')
+	state_manager.init_item('face_detector_size', '640x640')
+	face_detector.pre_check()
+
+	source_frame = read_static_image(get_test_example_file('source.jpg'))
+	crop_frame = read_static_image(get_test_example_file('source-80crop.jpg'))
+	face_detections = detect_faces_batch([ source_frame, crop_frame ])
+
+	assert len(face_detections) == 2
+	assert len(face_detections[0][0]) == len(detect_faces(source_frame)[0])
+	assert len(face_detections[1][0]) == len(detect_faces(crop_frame)[0])
+
+
+def test_decode_anchor_detection() -> None:
+	state_manager.init_item('face_detector_score', 0.5)
+	detection : List[Detection] = [ numpy.zeros(((640 // feature_stride) ** 2 * 2, channel_total), dtype = numpy.float32) for channel_total in [ 1, 4, 10 ] for feature_stride in [ 8, 16, 32 ] ]
+	detection[1][3] = 0.9
+	detection[4][3] = [ 1, 1, 1, 1 ]
+	bounding_boxes, face_scores, face_landmarks_5 = decode_anchor_detection(detection, '640x640', (2.0, 2.0))
+
+	assert bounding_boxes.tolist() == [ [ 0, -32, 64, 32 ] ]
+	assert face_scores.tolist() == pytest.approx([ 0.9 ])
+	assert face_landmarks_5.shape == (1, 5, 2)
+	assert decode_anchor_detection([ numpy.zeros_like(detection_output) for detection_output in detection ], '640x640', (1.0, 1.0))[0].shape == (0, 4)
+
+
+def test_create_proxy_frame() -> None:
+	vision_frame = numpy.zeros((2160, 3840, 3), dtype = numpy.uint8)
+	state_manager.init_item('face_detector_proxy_size', 720)
+	proxy_vision_frame = create_proxy_frame(vision_frame)
+
+	assert proxy_vision_frame.shape == (720, 1280, 3)
+	assert numpy.allclose(create_proxy_matrix(vision_frame, proxy_vision_frame), [ [ 1 / 3, 0, 0 ], [ 0, 1 / 3, 0 ] ])
+
+	state_manager.init_item('face_detector_proxy_size', 0)
+
+	assert create_proxy_frame(vision_frame) is vision_frame
+
+
+def test_get_many_faces_with_face_attributes() -> None:
+	source_frame = read_static_image(get_test_example_file('source.jpg'))
+	clear_static_faces()
+	face = get_one_face(get_many_faces([ source_frame ], []))
+
+	assert face.embedding is None
+	assert face.gender is None
+
+	face = get_one_face(get_many_faces([ source_frame ], [ 'embedding' ]))
+
+	assert face.normed_embedding.shape == (512,)
+	assert face.gender is None
+
+	face = get_one_face(get_many_faces([ source_frame ], [ 'classification' ]))
+
+	assert face.normed_embedding.shape == (512,)
+	assert face.gender in [ 'female', 'male' ]
+
+
+def test_detect_many_faces_with_adaptive_angles(monkeypatch : pytest.MonkeyPatch) -> None:
+	vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	detect_angles = []
+
+	def detect_angle_faces(vision_frames : List[VisionFrame], angle : Angle) -> List[FaceDetection]:
+		detect_angles.append(angle)
+		if angle == 90:
+			return [ (numpy.array([ [ 0, 0, 10, 10 ] ]), numpy.array([ 0.9 ]), numpy.zeros((1, 5, 2))) for _ in vision_frames ]
+		return [ create_empty_face_detection() for _ in vision_frames ]
+
+	monkeypatch.setattr(face_analyser, 'detect_angle_faces', detect_angle_faces)
+	state_manager.init_item('face_detector_angles', [ 0, 90, 180, 270 ])
+	state_manager.init_item('face_detector_angle_mode', 'adaptive')
+
+	assert len(detect_many_faces([ vision_frame, vision_frame ])[1][0]) == 1
+	assert detect_angles == [ 0, 90 ]
+
+	detect_angles.clear()
+
+	assert len(detect_many_faces([ vision_frame ])[0][0]) == 1
+	assert detect_angles == [ 90 ]
+
+	clear_face_detector_angle()
+	detect_angles.clear()
+	detect_many_faces([ vision_frame ])
+
+	assert detect_angles == [ 0, 90 ]
+
+	state_manager.init_item('face_detector_angle_mode', 'all')
+	detect_angles.clear()
+	detect_many_faces([ vision_frame ])
+
+	assert detect_angles == [ 0, 90, 180, 270 ]
+
+	state_manager.init_item('face_detector_angles', [ 0 ])
+
+
+def test_select_face_landmark_indices() -> None:
+	bounding_boxes = numpy.array([ [ 0, 0, 100, 100 ], [ 0, 0, 100, 100 ], [ 0, 0, 100, 100 ] ], dtype = numpy.float32)
+	face_scores = numpy.array([ 0.9, 0.6, 0.9 ], dtype = numpy.float32)
+	face_landmark_5 = numpy.array([ [ 30, 40 ], [ 70, 40 ], [ 50, 60 ], [ 35, 80 ], [ 65, 80 ] ], dtype = numpy.float32)
+	face_landmarks_5 = numpy.stack([ face_landmark_5, face_landmark_5, face_landmark_5[[ 1, 0, 2, 3, 4 ]] ])
+	state_manager.init_item('processors', [ 'face_swapper' ])
+	state_manager.init_item('face_mask_types', [ 'box' ])
+	state_manager.init_item('face_landmarker_mode', 'adaptive')
+
+	assert select_face_landmark_indices(bounding_boxes, face_scores, face_landmarks_5) == [ 1, 2 ]
+
+	state_manager.init_item('face_mask_types', [ 'box', 'area' ])
+
+	assert select_face_landmark_indices(bounding_boxes, face_scores, face_landmarks_5) == [ 0, 1, 2 ]
+
+	state_manager.init_item('face_mask_types', [ 'box' ])
+	state_manager.init_item('face_landmarker_mode', 'all')
+
+	assert select_face_landmark_indices(bounding_boxes, face_scores, face_landmarks_5) == [ 0, 1, 2 ]
+
+
+def test_detect_face_landmarks_with_many(monkeypatch : pytest.MonkeyPatch) -> None:
+	vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	bounding_boxes = numpy.array([ [ 0, 0, 10, 10 ], [ 10, 10, 20, 20 ] ], dtype = numpy.float32)
+	peppa_wutz_bounding_boxes : List[BoundingBox] = []
+
+	def detect_with_2dfan4(temp_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
+		return [ (numpy.zeros((68, 2)), 0.9), (numpy.zeros((68, 2)), 0.3) ]
+
+	def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
+		peppa_wutz_bounding_boxes.extend(bounding_boxes)
+		return [ (numpy.ones((68, 2)), 0.7) for _ in bounding_boxes ]
+
+	monkeypatch.setattr(face_landmarker, 'detect_with_2dfan4', detect_with_2dfan4)
+	monkeypatch.setattr(face_landmarker, 'detect_with_peppa_wutz', detect_with_peppa_wutz)
+	state_manager.init_item('face_landmarker_model', 'many')
+	face_landmarks = detect_face_landmarks(vision_frame, bounding_boxes, [ 0, 0 ])
+
+	assert numpy.array(peppa_wutz_bounding_boxes).tolist() == [ [ 10, 10, 20, 20 ] ]
+	assert face_landmarks[0][1] == 0.9
+	assert face_landmarks[1][1] == 0.7
@@ -0,0 +1,104 @@
+import os
+import tempfile
+from typing import List
+
+import numpy
+import pytest
+
+from facefusion import state_manager
+from facefusion.face_cluster import cluster_faces, find_cluster_reference, get_cluster_face, link_face_labels, load_face_clusters, sample_cluster_frame_numbers, save_face_clusters
+from facefusion.types import Face, VisionFrame
+from facefusion.vision import write_image
+
+
+def create_face(face_index : int, face_noise : float) -> Face:
+	normed_embedding = numpy.zeros(512, dtype = numpy.float32)
+	normed_embedding[face_index] = 1.0
+	normed_embedding[511] = face_noise
+	normed_embedding /= numpy.linalg.norm(normed_embedding)
+	return Face(
+		bounding_box = numpy.array([ 0, 0, 100, 100 ], dtype = numpy.float32),
+		score_set =
+		{
+			'detector': 0.9,
+			'landmarker': 0.9
+		},
+		landmark_set =
+		{
+			'5': numpy.zeros((5, 2), dtype = numpy.float32),
+			'5/68': numpy.zeros((5, 2), dtype = numpy.float32),
+			'68': numpy.zeros((68, 2), dtype = numpy.float32),
+			'68/5': numpy.zeros((68, 2), dtype = numpy.float32)
+		},
+		angle = 0,
+		embedding = normed_embedding,
+		normed_embedding = normed_embedding,
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_sample_cluster_frame_numbers() -> None:
+	assert sample_cluster_frame_numbers(100, 5) == [ 0, 24, 49, 74, 99 ]
+	assert sample_cluster_frame_numbers(3, 5) == [ 0, 1, 2 ]
+	assert sample_cluster_frame_numbers(0, 5) == []
+
+
+def test_link_face_labels() -> None:
+	face_links = numpy.eye(5, dtype = bool)
+	face_links[3, 4] = face_links[4, 3] = True
+	face_links[1, 4] = face_links[4, 1] = True
+
+	assert link_face_labels(face_links).tolist() == [ 0, 1, 2, 1, 1 ]
+
+
+def test_cluster_faces() -> None:
+	faces = [ create_face(0, 0.1), create_face(1, 0.0), create_face(0, 0.2), create_face(0, 0.0), create_face(1, 0.1) ]
+	face_clusters = cluster_faces(faces, 0.3)
+
+	assert list(face_clusters.keys()) == [ 0, 1 ]
+	assert len(face_clusters.get(0)) == 3
+	assert len(face_clusters.get(1)) == 2
+	assert len(cluster_faces(faces, 0.6).get(0)) == 5
+	assert cluster_faces([], 0.3) == {}
+
+
+def test_save_and_load_face_clusters() -> None:
+	face_cluster_path = os.path.join(tempfile.gettempdir(), 'test-save-face-clusters.npz')
+	face_clusters = cluster_faces([ create_face(0, 0.0), create_face(1, 0.0), create_face(1, 0.1) ], 0.3)
+
+	assert save_face_clusters(face_cluster_path, face_clusters) is True
+	assert os.path.exists(face_cluster_path + '.tmp') is False
+
+	loaded_face_clusters = load_face_clusters(face_cluster_path)
+
+	assert len(loaded_face_clusters.get(0)) == 2
+	assert numpy.allclose(loaded_face_clusters.get(0)[0].normed_embedding, face_clusters.get(0)[0].normed_embedding)
+	assert save_face_clusters(face_cluster_path, {}) is False
+	assert load_face_clusters('invalid.npz') == {}
+
+
+def test_get_cluster_face() -> None:
+	cluster_faces = [ create_face(0, 0.0), create_face(0, 0.1)._replace(score_set = { 'detector': 0.95, 'landmarker': 0.9 }), create_face(0, 0.2) ]
+
+	assert get_cluster_face(cluster_faces) is cluster_faces[1]
+	assert get_cluster_face([]) is None
+
+
+def test_find_cluster_reference(monkeypatch : pytest.MonkeyPatch) -> None:
+	target_path = os.path.join(tempfile.gettempdir(), 'test-find-cluster-reference.png')
+	reference_faces = [ create_face(1, 0.0), create_face(0, 0.1) ]
+
+	def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
+		return reference_faces
+
+	monkeypatch.setattr('facefusion.face_cluster.get_many_faces', get_many_faces)
+	state_manager.init_item('reference_face_distance', 0.3)
+	write_image(target_path, numpy.full((32, 32, 3), 255, dtype = numpy.uint8))
+	reference_face, reference_frame = find_cluster_reference(target_path, create_face(0, 0.0))
+
+	assert reference_face is reference_faces[1]
+	assert reference_frame.shape == (32, 32, 3)
+	assert find_cluster_reference(target_path, create_face(2, 0.0)) == (None, None)
+	assert find_cluster_reference('invalid.png', create_face(0, 0.0)) == (None, None)
@@ -0,0 +1,172 @@
+import os
+import tempfile
+from typing import List
+
+import numpy
+import pytest
+
+from facefusion import state_manager
+from facefusion.face_profile import clear_face_profile_set, create_face_profile_hash, get_face_profile, get_source_crop_frame, get_source_face, load_face_profile, save_face_profile
+from facefusion.types import Face, FaceProfile
+from facefusion.vision import write_image
+
+
+def create_face_profile() -> FaceProfile:
+	face_landmark_5 = numpy.array([ [ 30, 40 ], [ 70, 40 ], [ 50, 60 ], [ 35, 80 ], [ 65, 80 ] ], dtype = numpy.float32)
+	face_profile : FaceProfile =\
+	{
+		'face': Face(
+			bounding_box = numpy.array([ 10, 10, 90, 100 ], dtype = numpy.float32),
+			score_set =
+			{
+				'detector': 0.9,
+				'landmarker': 0.8
+			},
+			landmark_set =
+			{
+				'5': face_landmark_5,
+				'5/68': face_landmark_5,
+				'68': numpy.zeros((68, 2), dtype = numpy.float32),
+				'68/5': numpy.zeros((68, 2), dtype = numpy.float32)
+			},
+			angle = 0,
+			embedding = numpy.ones(512, dtype = numpy.float32),
+			normed_embedding = numpy.full(512, 0.5, dtype = numpy.float32),
+			gender = None,
+			age = None,
+			race = None
+		),
+		'crop_vision_frames':
+		{
+			'arcface_112_v2': numpy.full((112, 112, 3), 1, dtype = numpy.uint8),
+			'ffhq_512': numpy.full((256, 256, 3), 2, dtype = numpy.uint8)
+		},
+		'source_hash': None
+	}
+	return face_profile
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_face_profile_set()
+	state_manager.init_item('source_paths', [])
+	state_manager.init_item('source_face_profile', None)
+	state_manager.init_item('face_detector_model', 'yolo_face')
+	state_manager.init_item('face_detector_size', '640x640')
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_landmarker_model', '2dfan4')
+	state_manager.init_item('face_landmarker_score', 0.5)
+
+
+def test_save_and_load_face_profile() -> None:
+	face_profile_path = os.path.join(tempfile.gettempdir(), 'test-save-face-profile.npz')
+	face_profile = create_face_profile()
+
+	assert save_face_profile(face_profile_path, face_profile) is True
+	assert os.path.exists(face_profile_path + '.tmp') is False
+
+	loaded_face_profile = load_face_profile(face_profile_path)
+
+	assert numpy.array_equal(loaded_face_profile.get('face').normed_embedding, face_profile.get('face').normed_embedding)
+	assert numpy.array_equal(loaded_face_profile.get('face').landmark_set.get('5/68'), face_profile.get('face').landmark_set.get('5/68'))
+	assert loaded_face_profile.get('face').score_set.get('detector') == pytest.approx(0.9)
+	assert loaded_face_profile.get('crop_vision_frames').get('ffhq_512').shape == (256, 256, 3)
+	assert load_face_profile('invalid.npz') is None
+
+
+def test_get_source_face_from_profile() -> None:
+	face_profile_path = os.path.join(tempfile.gettempdir(), 'test-get-source-face-profile.npz')
+	save_face_profile(face_profile_path, create_face_profile())
+	state_manager.init_item('source_face_profile', face_profile_path)
+	source_face = get_source_face([])
+
+	assert get_face_profile(face_profile_path, []).get('face') is source_face
+	assert numpy.array_equal(source_face.embedding, numpy.ones(512))
+	assert get_source_crop_frame(source_face, 'arcface_112_v2').mean() == 1
+	assert get_source_crop_frame(source_face, 'ffhq_512').mean() == 2
+
+
+def test_get_source_face_without_profile() -> None:
+	state_manager.init_item('source_face_profile', os.path.join(tempfile.gettempdir(), 'test-missing-face-profile.npz'))
+
+	assert get_source_face([]) is None
+	assert get_face_profile(state_manager.get_item('source_face_profile'), []) is None
+
+
+def test_get_source_face_without_profile_path(monkeypatch : pytest.MonkeyPatch) -> None:
+	source_path = os.path.join(tempfile.gettempdir(), 'test-source-face-without-profile-path.png')
+	write_image(source_path, numpy.zeros((32, 32, 3), dtype = numpy.uint8))
+	source_face = create_face_profile().get('face')
+	created_source_faces = []
+
+	def create_source_face(source_paths : List[str]) -> Face:
+		created_source_faces.append(source_face)
+		return source_face
+
+	monkeypatch.setattr('facefusion.face_profile.create_source_face', create_source_face)
+
+	assert get_source_face([ source_path ]) is source_face
+	assert get_source_face([ source_path ]) is source_face
+	assert len(created_source_faces) == 1
+
+	state_manager.init_item('face_detector_score', 0.7)
+
+	assert get_source_face([ source_path ]) is source_face
+	assert len(created_source_faces) == 2
+
+	clear_face_profile_set()
+
+	assert get_source_face([ source_path ]) is source_face
+	assert len(created_source_faces) == 3
+
+
+def test_create_face_profile_hash() -> None:
+	source_path = os.path.join(tempfile.gettempdir(), 'test-create-face-profile-hash.png')
+	write_image(source_path, numpy.zeros((32, 32, 3), dtype = numpy.uint8))
+	face_profile_hash = create_face_profile_hash([ source_path ])
+
+	assert create_face_profile_hash([ source_path ]) == face_profile_hash
+
+	state_manager.init_item('face_detector_model', 'retinaface')
+
+	assert create_face_profile_hash([ source_path ]) != face_profile_hash
+
+	state_manager.init_item('face_detector_model', 'yolo_face')
+	state_manager.init_item('face_landmarker_score', 0.7)
+
+	assert create_face_profile_hash([ source_path ]) != face_profile_hash
+
+
+def test_get_face_profile_with_changed_source(monkeypatch : pytest.MonkeyPatch) -> None:
+	face_profile_path = os.path.join(tempfile.gettempdir(), 'test-changed-face-profile.npz')
+	source_path = os.path.join(tempfile.gettempdir(), 'test-changed-face-profile.png')
+	write_image(source_path, numpy.zeros((32, 32, 3), dtype = numpy.uint8))
+	face_profile = create_face_profile()
+	face_profile['source_hash'] = create_face_profile_hash([ source_path ])
+	save_face_profile(face_profile_path, face_profile)
+	created_face_profiles = []
+
+	def create_changed_face_profile(source_paths : List[str]) -> FaceProfile:
+		changed_face_profile = create_face_profile()
+		changed_face_profile['source_hash'] = create_face_profile_hash(source_paths)
+		created_face_profiles.append(changed_face_profile)
+		return changed_face_profile
+
+	monkeypatch.setattr('facefusion.face_profile.create_face_profile', create_changed_face_profile)
+
+	assert get_face_profile(face_profile_path, [ source_path ]).get('source_hash') == face_profile.get('source_hash')
+	assert created_face_profiles == []
+
+	clear_face_profile_set()
+	write_image(source_path, numpy.ones((32, 32, 3), dtype = numpy.uint8))
+
+	assert get_face_profile(face_profile_path, [ source_path ]) is created_face_profiles[0]
+	assert load_face_profile(face_profile_path).get('source_hash') == create_face_profile_hash([ source_path ])
+
+
+def test_get_source_crop_frame_without_source() -> None:
+	source_face = create_face_profile().get('face')
+
+	assert get_source_crop_frame(source_face, 'arcface_112_v2').shape == (112, 112, 3)
+	assert get_source_crop_frame(source_face, 'ffhq_512').shape == (256, 256, 3)
@@ -0,0 +1,65 @@
+import numpy
+
+from facefusion.face_selector import clear_reference_matrix, create_reference_matrix, find_similar_faces, get_reference_matrix
+from facefusion.types import Face, FaceSet
+
+
+def create_face(face_index : int) -> Face:
+	normed_embedding = numpy.zeros(512, dtype = numpy.float32)
+	normed_embedding[face_index] = 1.0
+	return Face(
+		bounding_box = numpy.array([ 0, 0, 100, 100 ], dtype = numpy.float32),
+		score_set =
+		{
+			'detector': 0.9,
+			'landmarker': 0.9
+		},
+		landmark_set = {},
+		angle = 0,
+		embedding = normed_embedding,
+		normed_embedding = normed_embedding,
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_create_reference_matrix() -> None:
+	reference_matrix = create_reference_matrix([ create_face(0), create_face(1)._replace(normed_embedding = None), create_face(2) ])
+
+	assert reference_matrix.shape == (2, 512)
+	assert reference_matrix.dtype == numpy.float32
+	assert create_reference_matrix([]).size == 0
+
+
+def test_get_reference_matrix() -> None:
+	reference_faces = [ create_face(0), create_face(1)._replace(normed_embedding = None) ]
+	reference_matrix = get_reference_matrix('origin', reference_faces)
+
+	assert get_reference_matrix('origin', reference_faces) is reference_matrix
+
+	reference_faces.append(create_face(2))
+
+	assert get_reference_matrix('origin', reference_faces).shape == (2, 512)
+	assert get_reference_matrix('origin', [ create_face(3) ]) is not reference_matrix
+
+	clear_reference_matrix()
+
+	assert get_reference_matrix('origin', reference_faces) is not reference_matrix
+
+
+def test_find_similar_faces() -> None:
+	faces = [ create_face(0), create_face(1), create_face(2), create_face(3)._replace(normed_embedding = None) ]
+	reference_faces : FaceSet =\
+	{
+		'origin': [ create_face(index) for index in range(2, 100) ],
+		'face_swapper': [ create_face(0) ]
+	}
+
+	assert find_similar_faces(faces, reference_faces, 0.3) == [ faces[2] ]
+	assert find_similar_faces(faces, { 'face_swapper': reference_faces.get('face_swapper') }, 0.3) == [ faces[0] ]
+	assert find_similar_faces(faces, { 'origin': [ create_face(0), create_face(0) ] }, 0.3) == [ faces[0] ]
+	assert find_similar_faces(faces, { 'origin': [ create_face(4) ] }, 0.3) == []
+	assert len(find_similar_faces(faces, { 'origin': [ create_face(4) ] }, 0.6)) == 3
+	assert find_similar_faces([], reference_faces, 0.3) == []
+	assert find_similar_faces(faces, {}, 0.3) == []
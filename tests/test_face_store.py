@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import pytest
+
+from facefusion import face_store, process_manager
+from facefusion.face_store import calc_faces_size, clear_static_faces, create_vision_hash, get_static_face_stats, get_static_faces, set_static_faces
+from facefusion.frame_manifest import get_frame_manifest
+from facefusion.types import Face
+
+
+def create_face() -> Face:
+	return Face(
+		bounding_box = numpy.zeros(4, dtype = numpy.float32),
+		score_set =
+		{
+			'detector': 0.5,
+			'landmarker': 0.5
+		},
+		landmark_set =
+		{
+			'5': numpy.zeros((5, 2), dtype = numpy.float32),
+			'5/68': numpy.zeros((5, 2), dtype = numpy.float32),
+			'68': numpy.zeros((68, 2), dtype = numpy.float32),
+			'68/5': numpy.zeros((68, 2), dtype = numpy.float32)
+		},
+		angle = 0,
+		embedding = numpy.zeros(512, dtype = numpy.float32),
+		normed_embedding = None,
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_static_faces()
+	process_manager.set_frame_number(None)
+
+
+def test_create_vision_hash() -> None:
+	vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	other_vision_frame = vision_frame.copy()
+	other_vision_frame[0, 0] = 255
+
+	assert create_vision_hash(vision_frame) == create_vision_hash(vision_frame.copy())
+	assert create_vision_hash(vision_frame) != create_vision_hash(other_vision_frame)
+	assert create_vision_hash(vision_frame) != create_vision_hash(numpy.zeros((32, 128, 3), dtype = numpy.uint8))
+	assert create_vision_hash(vision_frame[:, ::-1]) == create_vision_hash(vision_frame)
+
+	process_manager.set_frame_number(1)
+
+	assert create_vision_hash(vision_frame).startswith('1-')
+	assert create_vision_hash(vision_frame) == create_vision_hash(vision_frame.copy())
+	assert create_vision_hash(vision_frame) != create_vision_hash(other_vision_frame)
+
+	other_vision_frame = vision_frame.copy()
+	other_vision_frame[1, 1] = 255
+
+	assert create_vision_hash(vision_frame) != create_vision_hash(other_vision_frame)
+
+	get_frame_manifest()['stage'] = 'face_swapper'
+
+	assert create_vision_hash(vision_frame).startswith('1-face_swapper-')
+
+	get_frame_manifest()['stage'] = None
+
+
+def test_get_and_set_static_faces() -> None:
+	vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	faces = [ create_face() ]
+
+	assert get_static_faces(vision_frame) is None
+
+	set_static_faces(vision_frame, faces)
+
+	assert get_static_faces(vision_frame) == faces
+	assert get_static_face_stats().get('hits') == 1
+	assert get_static_face_stats().get('misses') == 1
+	assert get_static_face_stats().get('size') == calc_faces_size(faces)
+
+
+def test_static_faces_eviction(monkeypatch : pytest.MonkeyPatch) -> None:
+	faces = [ create_face() ]
+	vision_frames = [ numpy.full((64, 64, 3), value, dtype = numpy.uint8) for value in range(4) ]
+	monkeypatch.setattr(face_store, 'STATIC_FACES_LIMIT', calc_faces_size(faces) * 2)
+
+	set_static_faces(vision_frames[0], faces)
+	set_static_faces(vision_frames[1], faces)
+	get_static_faces(vision_frames[0])
+	set_static_faces(vision_frames[2], faces)
+
+	assert get_static_faces(vision_frames[0]) == faces
+	assert get_static_faces(vision_frames[1]) is None
+	assert get_static_faces(vision_frames[2]) == faces
+	assert get_static_face_stats().get('evictions') == 1
+	assert get_static_face_stats().get('size') == calc_faces_size(faces) * 2
+
+
+def test_static_faces_concurrency() -> None:
+	faces = [ create_face() ]
+	vision_frames = [ numpy.full((64, 64, 3), value, dtype = numpy.uint8) for value in range(64) ]
+
+	with ThreadPoolExecutor(max_workers = 8) as executor:
+		list(executor.map(lambda vision_frame: set_static_faces(vision_frame, faces), vision_frames))
+		static_faces = list(executor.map(get_static_faces, vision_frames))
+
+	assert all(static_face == faces for static_face in static_faces)
+	assert get_static_face_stats().get('hits') == 64
+	assert get_static_face_stats().get('size') == calc_faces_size(faces) * 64
@@ -0,0 +1,114 @@
+import os
+import tempfile
+
+import numpy
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.face_track import clear_face_track, get_face_track_path, get_track_faces, init_face_track, pack_track_faces, save_face_track, set_track_faces, unpack_track_faces
+from facefusion.types import Face
+
+
+def create_face(face_score : float) -> Face:
+	return Face(
+		bounding_box = numpy.array([ 10, 20, 110, 140 ], dtype = numpy.float32),
+		score_set =
+		{
+			'detector': face_score,
+			'landmarker': 0.5
+		},
+		landmark_set =
+		{
+			'5': numpy.ones((5, 2), dtype = numpy.float32),
+			'5/68': numpy.ones((5, 2), dtype = numpy.float32),
+			'68': numpy.ones((68, 2), dtype = numpy.float32),
+			'68/5': numpy.ones((68, 2), dtype = numpy.float32)
+		},
+		angle = 90,
+		embedding = numpy.ones(512, dtype = numpy.float32),
+		normed_embedding = numpy.ones(512, dtype = numpy.float32),
+		gender = 'female',
+		age = range(20, 30),
+		race = 'white'
+	)
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('temp_path', tempfile.gettempdir())
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_face_track()
+	process_manager.set_frame_number(None)
+
+
+def test_pack_and_unpack_track_faces() -> None:
+	track_faces = unpack_track_faces(pack_track_faces(
+	{
+		0: [ create_face(0.5), create_face(0.75) ],
+		1: [],
+		2: [ create_face(1.0) ]
+	}))
+
+	assert list(track_faces.keys()) == [ 0, 1, 2 ]
+	assert len(track_faces.get(0)) == 2
+	assert track_faces.get(1) == []
+	assert track_faces.get(2)[0].score_set.get('detector') == 1.0
+	assert track_faces.get(2)[0].age == range(20, 30)
+	assert track_faces.get(2)[0].gender == 'female'
+	assert track_faces.get(2)[0].landmark_set.get('68').shape == (68, 2)
+	assert track_faces.get(2)[0].embedding.shape == (512,)
+
+
+def test_pack_and_unpack_track_faces_without_attributes() -> None:
+	lazy_face = create_face(0.5)._replace(embedding = None, normed_embedding = None, gender = None, age = None, race = None)
+	track_faces = unpack_track_faces(pack_track_faces(
+	{
+		0: [ lazy_face, create_face(0.75) ],
+		1: [ lazy_face ]
+	}))
+
+	assert track_faces.get(0)[0].embedding is None
+	assert track_faces.get(0)[0].gender is None
+	assert track_faces.get(0)[0].age is None
+	assert track_faces.get(0)[1].embedding.shape == (512,)
+	assert track_faces.get(0)[1].race == 'white'
+
+	track_faces = unpack_track_faces(pack_track_faces({ 0: [ lazy_face ] }))
+
+	assert track_faces.get(0)[0].normed_embedding is None
+
+
+def test_get_and_set_track_faces() -> None:
+	face_track_path = get_face_track_path('target.mp4', 'test')
+	vision_frame = numpy.zeros((240, 320, 3), dtype = numpy.uint8)
+	init_face_track(face_track_path, (320, 240))
+	set_track_faces(vision_frame, [ create_face(0.5) ])
+
+	assert get_track_faces(vision_frame) is None
+
+	process_manager.set_frame_number(1)
+	set_track_faces(vision_frame, [ create_face(0.5) ])
+
+	assert len(get_track_faces(vision_frame)) == 1
+	assert get_track_faces(numpy.zeros((480, 640, 3), dtype = numpy.uint8)) is None
+
+
+def test_save_and_load_face_track() -> None:
+	face_track_path = get_face_track_path('target.mp4', 'test')
+	vision_frame = numpy.zeros((240, 320, 3), dtype = numpy.uint8)
+	init_face_track(face_track_path, (320, 240))
+	process_manager.set_frame_number(5)
+	set_track_faces(vision_frame, [ create_face(0.5) ])
+
+	assert save_face_track() is True
+	assert os.path.isfile(face_track_path)
+
+	clear_face_track()
+
+	assert init_face_track(face_track_path, (320, 240)) is True
+	assert len(get_track_faces(vision_frame)) == 1
+
+	os.remove(face_track_path)
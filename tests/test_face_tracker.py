@@ -0,0 +1,146 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.face_helper import calc_bounding_box_iou
+from facefusion.face_tracker import clear_face_tracker, get_tracker_faces, inherit_faces, set_tracker_faces
+from facefusion.types import Face, VisionFrame
+
+
+def create_vision_frame(shift : int) -> VisionFrame:
+	vision_frame = numpy.random.default_rng(0).integers(0, 255, (360, 480, 3), dtype = numpy.uint8)
+	return numpy.roll(vision_frame, shift, axis = 1)
+
+
+def create_face(shift : int) -> Face:
+	face_landmark_5 = numpy.array([ [ 200, 150 ], [ 260, 150 ], [ 230, 180 ], [ 205, 210 ], [ 255, 210 ] ], dtype = numpy.float32)
+	face_landmark_5[:, 0] += shift
+	return Face(
+		bounding_box = numpy.array([ 180 + shift, 110, 280 + shift, 240 ], dtype = numpy.float32),
+		score_set =
+		{
+			'detector': 0.9,
+			'landmarker': 0.9
+		},
+		landmark_set =
+		{
+			'5': face_landmark_5,
+			'5/68': face_landmark_5,
+			'68': numpy.repeat(face_landmark_5, 14, axis = 0)[:68],
+			'68/5': numpy.repeat(face_landmark_5, 14, axis = 0)[:68]
+		},
+		angle = 0,
+		embedding = numpy.ones(512, dtype = numpy.float32),
+		normed_embedding = numpy.ones(512, dtype = numpy.float32),
+		gender = 'female',
+		age = range(20, 30),
+		race = 'white'
+	)
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('face_detector_interval', 3)
+	state_manager.init_item('execution_thread_count', 2)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_face_tracker()
+	process_manager.set_frame_number(None)
+
+
+def test_calc_bounding_box_iou() -> None:
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 0, 0, 10, 10 ])) == 1.0
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 5, 0, 15, 10 ])) == pytest.approx(1 / 3)
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 20, 20, 30, 30 ])) == 0.0
+
+
+def test_get_tracker_faces() -> None:
+	assert get_tracker_faces(create_vision_frame(0)) is None
+
+	process_manager.set_frame_number(0)
+	set_tracker_faces(create_vision_frame(0), [ create_face(0) ])
+	process_manager.set_frame_number(1)
+	tracker_faces = get_tracker_faces(create_vision_frame(4))
+
+	assert numpy.allclose(tracker_faces[0].landmark_set.get('5/68'), create_face(4).landmark_set.get('5/68'), atol = 0.5)
+	assert numpy.allclose(tracker_faces[0].bounding_box, create_face(4).bounding_box, atol = 0.5)
+	assert tracker_faces[0].embedding is not None
+
+	process_manager.set_frame_number(2)
+
+	assert get_tracker_faces(create_vision_frame(8))
+
+	process_manager.set_frame_number(3)
+
+	assert get_tracker_faces(create_vision_frame(12)) is None
+
+
+def test_get_tracker_faces_with_scene_cut() -> None:
+	process_manager.set_frame_number(0)
+	set_tracker_faces(create_vision_frame(0), [ create_face(0) ])
+	process_manager.set_frame_number(1)
+
+	assert get_tracker_faces(numpy.zeros((360, 480, 3), dtype = numpy.uint8)) is None
+
+
+def test_get_tracker_faces_without_faces() -> None:
+	process_manager.set_frame_number(0)
+	set_tracker_faces(create_vision_frame(0), [])
+	process_manager.set_frame_number(1)
+
+	assert get_tracker_faces(create_vision_frame(4)) is None
+
+
+def test_get_tracker_faces_with_threads() -> None:
+	barrier = threading.Barrier(2)
+	tracker_faces_set : Dict[int, Optional[List[Face]]] = {}
+
+	def track_faces(shift : int) -> None:
+		process_manager.set_frame_number(0)
+		set_tracker_faces(create_vision_frame(shift), [ create_face(shift) ])
+		barrier.wait()
+		process_manager.set_frame_number(1)
+		tracker_faces_set[shift] = get_tracker_faces(create_vision_frame(shift + 4))
+		process_manager.set_frame_number(None)
+
+	threads = [ threading.Thread(target = track_faces, args = (shift,)) for shift in [ 0, 100 ] ]
+
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	for shift, tracker_faces in tracker_faces_set.items():
+		assert numpy.allclose(tracker_faces[0].bounding_box, create_face(shift + 4).bounding_box, atol = 0.5)
+
+	process_manager.set_frame_number(1)
+
+	assert get_tracker_faces(create_vision_frame(4)) is None
+
+
+def test_inherit_faces() -> None:
+	process_manager.set_frame_number(0)
+	set_tracker_faces(create_vision_frame(0), [ create_face(0) ])
+	process_manager.set_frame_number(1)
+	lazy_face = create_face(4)._replace(embedding = None, normed_embedding = None, gender = None, age = None, race = None)
+	distant_face = create_face(200)._replace(embedding = None)
+	faces = inherit_faces(create_vision_frame(4), [ lazy_face, distant_face ])
+
+	assert faces[0].embedding is not None
+	assert faces[0].gender == 'female'
+	assert faces[1].embedding is None
+
+
+def test_inherit_faces_with_overlapping_faces() -> None:
+	process_manager.set_frame_number(0)
+	set_tracker_faces(create_vision_frame(0), [ create_face(0), create_face(40) ])
+	process_manager.set_frame_number(1)
+	lazy_face = create_face(4)._replace(embedding = None, normed_embedding = None)
+	faces = inherit_faces(create_vision_frame(4), [ lazy_face ])
+
+	assert faces[0].embedding is None
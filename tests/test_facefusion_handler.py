@@ -0,0 +1,183 @@
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import facefusion_handler
+import numpy
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.face_analyser import get_face_detector_angle, set_face_detector_angle
+from facefusion.face_profile import get_face_profile_set
+from facefusion.face_selector import REFERENCE_MATRIX_SET, get_reference_matrix
+from facefusion.face_track import get_face_track
+from facefusion.face_tracker import get_face_tracker
+from facefusion.types import Face
+from facefusion.vision import read_static_image, write_image
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each(monkeypatch : pytest.MonkeyPatch) -> List[int]:
+	pre_checks : List[int] = []
+
+	def pre_check() -> bool:
+		pre_checks.append(1)
+		return True
+
+	def conditional_process() -> int:
+		with open(state_manager.get_item('output_path'), 'wb') as output_file:
+			output_file.write(b'output')
+		return 0
+
+	monkeypatch.chdir(os.getcwd())
+	monkeypatch.setattr(facefusion_handler, 'FACEFUSION_PATH', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+	monkeypatch.setattr(facefusion_handler, 'FACEFUSION_CONFIG', os.path.join(facefusion_handler.FACEFUSION_PATH, 'facefusion.ini'))
+	monkeypatch.setattr(facefusion_handler, 'FACEFUSION_WORKER_MODE', 'in_process')
+	monkeypatch.setattr(facefusion_handler, 'FACEFUSION_WORKER',
+	{
+		'ready': False,
+		'warm_up_seconds': 0.0,
+		'programs': {},
+		'pre_checked': set()
+	})
+	monkeypatch.setattr('facefusion.core.pre_check', pre_check)
+	monkeypatch.setattr('facefusion.core.common_pre_check', lambda: True)
+	monkeypatch.setattr('facefusion.core.processors_pre_check', lambda: True)
+	monkeypatch.setattr('facefusion.core.conditional_process', conditional_process)
+	return pre_checks
+
+
+def create_job_args(output_path : str) -> Dict[str, Any]:
+	return\
+	{
+		'processors': [ 'face_swapper' ],
+		'face_swapper_model': 'inswapper_128',
+		'execution_providers': [ 'cpu' ],
+		'source_paths': [ 'source.jpg' ],
+		'target_path': 'target.mp4',
+		'output_path': output_path
+	}
+
+
+def create_face() -> Face:
+	return Face(
+		bounding_box = numpy.array([ 0, 0, 1, 1 ]),
+		score_set = {},
+		landmark_set = {},
+		angle = 0,
+		embedding = numpy.ones(512),
+		normed_embedding = numpy.ones(512),
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_run_facefusion_job(before_each : List[int]) -> None:
+	output_path = os.path.join(tempfile.mkdtemp(), 'test-run-facefusion-job.mp4')
+	result = facefusion_handler.run_facefusion_job(create_job_args(output_path))
+
+	assert result.get('status') == 'completed'
+	assert result.get('error_code') == 0
+	assert result.get('output_path') == output_path
+	assert result.get('warm') is False
+	assert set(result.get('timings').keys()) == { 'warm_up_seconds', 'pre_check_seconds', 'process_seconds', 'total_seconds' }
+
+	result = facefusion_handler.run_facefusion_job(create_job_args(output_path))
+
+	assert result.get('status') == 'completed'
+	assert result.get('warm') is True
+	assert result.get('timings').get('warm_up_seconds') == 0.0
+	assert len(before_each) == 1
+	assert len(facefusion_handler.FACEFUSION_WORKER.get('programs')) == 1
+
+
+def test_run_facefusion_job_with_reset(monkeypatch : pytest.MonkeyPatch) -> None:
+	output_path = os.path.join(tempfile.mkdtemp(), 'test-run-facefusion-job-with-reset.mp4')
+	image_path = os.path.join(tempfile.gettempdir(), 'test-run-facefusion-job-with-reset.png')
+	job_caches : List[List[int]] = []
+
+	def conditional_process() -> int:
+		job_caches.append(
+		[
+			len(get_face_profile_set()),
+			len(REFERENCE_MATRIX_SET),
+			len(get_face_track().get('faces')),
+			len(get_face_tracker()),
+			read_static_image.cache_info().currsize
+		])
+		assert get_face_detector_angle() is None
+
+		write_image(image_path, numpy.zeros((8, 8, 3), dtype = numpy.uint8))
+		read_static_image(image_path)
+		get_face_profile_set()['test'] = { 'face': create_face(), 'crop_vision_frames': {}, 'source_hash': None }
+		get_reference_matrix('test', [ create_face() ])
+		get_face_track().get('faces')[0] = [ create_face() ]
+		get_face_tracker()[0] = { 'keyframe_number': 0, 'vision_frame': numpy.zeros((8, 8, 3), dtype = numpy.uint8), 'histogram': numpy.zeros(8), 'faces': [ create_face() ] }
+		set_face_detector_angle(90)
+
+		with open(state_manager.get_item('output_path'), 'wb') as output_file:
+			output_file.write(b'output')
+		return 0
+
+	monkeypatch.setattr('facefusion.core.conditional_process', conditional_process)
+
+	for _ in range(2):
+		assert facefusion_handler.run_facefusion_job(create_job_args(output_path)).get('status') == 'completed'
+
+	assert job_caches == [ [ 0, 0, 0, 0, 0 ], [ 0, 0, 0, 0, 0 ] ]
+	assert get_face_profile_set() == {}
+	assert get_face_detector_angle() is None
+
+
+def test_run_facefusion_job_with_timeout(monkeypatch : pytest.MonkeyPatch) -> None:
+	output_path = os.path.join(tempfile.mkdtemp(), 'test-run-facefusion-job-with-timeout.mp4')
+
+	def conditional_process() -> int:
+		process_manager.start()
+
+		while process_manager.is_processing():
+			time.sleep(0.01)
+		return 4
+
+	monkeypatch.setattr(facefusion_handler, 'FACEFUSION_JOB_TIMEOUT', 0.1)
+	monkeypatch.setattr('facefusion.core.conditional_process', conditional_process)
+	result = facefusion_handler.run_facefusion_job(create_job_args(output_path))
+
+	assert result.get('status') == 'failed'
+	assert result.get('error') == 'FaceFusion timed out'
+	assert process_manager.is_pending()
+
+
+def test_run_local_event_loop(before_each : List[int], monkeypatch : pytest.MonkeyPatch) -> None:
+	def download_file(url : str, local_path : str) -> bool:
+		with open(local_path, 'wb') as local_file:
+			local_file.write(url.encode())
+		return True
+
+	def load_facefusion_job(job_args : Dict[str, Any]) -> bool:
+		state_manager.init_item('output_path', job_args.get('output_path'))
+		return True
+
+	monkeypatch.setattr(facefusion_handler, 'download_file', download_file)
+	monkeypatch.setattr(facefusion_handler, 'upload_to_minio', lambda local_path, object_name: 'http://minio/' + object_name)
+	monkeypatch.setattr(facefusion_handler, 'load_facefusion_job', load_facefusion_job)
+	events =\
+	[
+		{
+			'input':
+			{
+				'source_image_url': 'http://example/source.jpg',
+				'target_video_url': 'http://example/target.mp4'
+			}
+		}
+		for _ in range(2)
+	]
+	results = facefusion_handler.run_local_event_loop(events)
+
+	assert [ result.get('status') for result in results ] == [ 'completed', 'completed' ]
+	assert [ result.get('worker').get('warm') for result in results ] == [ False, True ]
+	assert results[0].get('output_video_url').startswith('http://minio/faceswap_uniface_256_local-0_')
+	assert set(results[1].get('timings').keys()) == { 'warm_up_seconds', 'pre_check_seconds', 'process_seconds', 'total_seconds' }
+	assert len(before_each) == 1
@@ -7,10 +7,11 @@ import pytest
 import facefusion.ffmpeg
 from facefusion import process_manager, state_manager
 from facefusion.download import conditional_download
-from facefusion.ffmpeg import concat_video, extract_frames, merge_video, read_audio_buffer, replace_audio, restore_audio
+from facefusion.ffmpeg import close_stream, concat_video, detect_video_keyframes, extract_frames, merge_video, open_extract_stream, read_audio_buffer, read_stream_frame, replace_audio, restore_audio, stack_video
 from facefusion.filesystem import copy_file
 from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, resolve_temp_frame_paths
 from facefusion.types import EncoderSet
+from facefusion.vision import detect_video_resolution
 from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
 
@@ -64,6 +65,14 @@ def test_get_available_encoder_set() -> None:
 	assert 'libx264' in available_encoder_set.get('video')
 
 
+def test_detect_video_keyframes() -> None:
+	keyframe_numbers = detect_video_keyframes(get_test_example_file('target-240p.mp4'))
+
+	assert keyframe_numbers[0] == 0
+	assert keyframe_numbers == sorted(keyframe_numbers)
+	assert detect_video_keyframes('invalid.mp4') == []
+
+
 def test_extract_frames() -> None:
 	test_set =\
 	[
@@ -90,6 +99,20 @@ def test_extract_frames() -> None:
 		clear_temp_directory(target_path)
 
 
+def test_read_stream_frame() -> None:
+	extract_process = open_extract_stream(get_test_example_file('target-240p.mp4'), '452x240', 30.0, 0, 2)
+	vision_frame = read_stream_frame(extract_process, '452x240')
+
+	assert vision_frame.shape == (240, 452, 3)
+	assert vision_frame.flags.writeable is True
+
+	vision_frame[:] = 0
+
+	assert vision_frame.max() == 0
+
+	close_stream(extract_process, False)
+
+
 def test_merge_video() -> None:
 	target_paths =\
 	[
@@ -126,6 +149,13 @@ def test_concat_video() -> None:
 	assert concat_video(output_path, temp_output_paths) is True
 
 
+def test_stack_video() -> None:
+	output_path = get_test_output_file('test-stack-video.mp4')
+
+	assert stack_video(get_test_example_file('target-240p.mp4'), output_path, 2) is True
+	assert detect_video_resolution(output_path) == (904, 240)
+
+
 def test_read_audio_buffer() -> None:
 	assert isinstance(read_audio_buffer(get_test_example_file('source.mp3'), 1, 16, 1), bytes)
 	assert isinstance(read_audio_buffer(get_test_example_file('source.wav'), 1, 16, 1), bytes)
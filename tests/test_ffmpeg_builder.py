@@ -1,7 +1,7 @@
 from shutil import which
 
 from facefusion import ffmpeg_builder
-from facefusion.ffmpeg_builder import chain, run, select_frame_range, set_audio_quality, set_audio_sample_size, set_stream_mode, set_video_quality
+from facefusion.ffmpeg_builder import chain, pipe_video, run, select_frame_range, set_audio_quality, set_audio_sample_size, set_stream_mode, set_video_quality, stack_video
 
 
 def test_run() -> None:
@@ -81,3 +81,11 @@ def test_set_video_quality() -> None:
 	assert set_video_quality('hevc_videotoolbox', 0) == [ '-b:v', '1024k' ]
 	assert set_video_quality('hevc_videotoolbox', 50) == [ '-b:v', '25768k' ]
 	assert set_video_quality('hevc_videotoolbox', 100) == [ '-b:v', '50512k' ]
+
+
+def test_pipe_video() -> None:
+	assert pipe_video() == [ '-f', 'rawvideo', '-pix_fmt', 'bgr24' ]
+
+
+def test_stack_video() -> None:
+	assert stack_video(2) == [ '-filter_complex', 'hstack=inputs=2' ]
@@ -0,0 +1,63 @@
+import tempfile
+from typing import List
+
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.frame_manifest import clear_frame_manifest, create_frame_manifest, filter_frame_manifest_payloads, finish_frame_manifest_stage, init_frame_manifest, remove_frame_manifest, start_frame_manifest_stage
+from facefusion.temp_helper import create_temp_directory
+from facefusion.types import QueuePayload
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('temp_path', tempfile.gettempdir())
+	create_temp_directory('test-frame-manifest.mp4')
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	init_frame_manifest('test-frame-manifest.mp4', 'test')
+	remove_frame_manifest()
+
+
+def test_init_frame_manifest() -> None:
+	assert init_frame_manifest('test-frame-manifest.mp4', 'test') is False
+
+	create_frame_manifest()
+
+	assert init_frame_manifest('test-frame-manifest.mp4', 'test') is True
+	assert init_frame_manifest('test-frame-manifest.mp4', 'invalid') is False
+
+
+def test_resume_frame_manifest() -> None:
+	queue_payloads : List[QueuePayload] =\
+	[
+		{
+			'frame_number': frame_number,
+			'frame_path': str(frame_number).zfill(8) + '.png'
+		}
+		for frame_number in range(4)
+	]
+
+	create_frame_manifest()
+	process_manager.start()
+
+	assert start_frame_manifest_stage('face_swapper') is True
+
+	for queue_payload in process_manager.manage(queue_payloads):
+		if queue_payload.get('frame_number') == 2:
+			break
+
+	process_manager.end()
+	init_frame_manifest('test-frame-manifest.mp4', 'test')
+
+	assert start_frame_manifest_stage('face_swapper') is True
+	assert [ queue_payload.get('frame_number') for queue_payload in filter_frame_manifest_payloads(queue_payloads) ] == [ 2, 3 ]
+	assert finish_frame_manifest_stage('face_swapper') is True
+	assert start_frame_manifest_stage('face_swapper') is False
+
+	clear_frame_manifest()
+
+	assert start_frame_manifest_stage('face_swapper') is True
+	assert filter_frame_manifest_payloads(queue_payloads) == queue_payloads
@@ -1,8 +1,23 @@
 import os
 
-from facefusion.jobs.job_helper import get_step_output_path
+from facefusion.jobs.job_helper import create_segment_ranges, filter_keyframe_numbers, get_step_output_path
 
 
 def test_get_step_output_path() -> None:
 	assert get_step_output_path('test-job', 0, 'test.mp4') == 'test-test-job-0.mp4'
 	assert get_step_output_path('test-job', 0, 'test/test.mp4') == os.path.join('test', 'test-test-job-0.mp4')
+
+
+def test_create_segment_ranges() -> None:
+	assert create_segment_ranges([ 0, 100, 200, 300 ], 0, 400, 150) == [ (0, 200), (200, 400) ]
+	assert create_segment_ranges([ 0, 100, 200, 300 ], 50, 320, 100) == [ (50, 200), (200, 300), (300, 320) ]
+	assert create_segment_ranges([ 0, 100, 200, 300 ], 0, 400, 1000) == [ (0, 400) ]
+	assert create_segment_ranges([], 0, 400, 100) == [ (0, 400) ]
+	assert create_segment_ranges([ 0 ], 0, 0, 100) == []
+
+
+def test_filter_keyframe_numbers() -> None:
+	assert filter_keyframe_numbers([ 0, 100, 250, 300 ], 30.0, 30.0) == [ 0, 100, 250, 300 ]
+	assert filter_keyframe_numbers([ 0, 100, 250, 300 ], 30.0, 25.0) == [ 0, 300 ]
+	assert filter_keyframe_numbers([ 0, 100, 250, 301 ], 30.0, 15.0) == [ 0, 100, 250 ]
+	assert filter_keyframe_numbers([ 0, 1001, 2002 ], 29.97, 24.0) == [ 0 ]
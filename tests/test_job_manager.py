@@ -3,7 +3,7 @@ from time import sleep
 import pytest
 
 from facefusion.jobs.job_helper import get_step_output_path
-from facefusion.jobs.job_manager import add_step, clear_jobs, count_step_total, create_job, delete_job, delete_jobs, find_job_ids, find_jobs, get_steps, init_jobs, insert_step, move_job_file, remix_step, remove_step, set_step_status, set_steps_status, submit_job, submit_jobs
+from facefusion.jobs.job_manager import add_segment_steps, add_step, clear_jobs, count_step_total, create_job, delete_job, delete_jobs, find_job_ids, find_jobs, get_steps, init_jobs, insert_step, move_job_file, remix_step, remove_step, set_step_status, set_steps_status, submit_job, submit_jobs
 from .helper import get_test_jobs_directory
 
 
@@ -185,6 +185,31 @@ def test_add_step() -> None:
 	assert count_step_total('job-test-add-step') == 2
 
 
+def test_add_segment_steps() -> None:
+	args =\
+	{
+		'source_path': 'source.jpg',
+		'target_path': 'target.mp4',
+		'output_path': 'output.mp4'
+	}
+
+	assert add_segment_steps('job-invalid', args, [ (0, 250) ]) is False
+
+	create_job('job-test-add-segment-steps')
+
+	assert add_segment_steps('job-test-add-segment-steps', args, []) is False
+	assert add_segment_steps('job-test-add-segment-steps', args, [ (0, 250), (250, 400) ]) is True
+
+	steps = get_steps('job-test-add-segment-steps')
+
+	assert steps[0].get('args').get('trim_frame_start') == 0
+	assert steps[0].get('args').get('trim_frame_end') == 250
+	assert steps[1].get('args').get('trim_frame_start') == 250
+	assert steps[1].get('args').get('trim_frame_end') == 400
+	assert steps[1].get('args').get('output_path') == 'output.mp4'
+	assert count_step_total('job-test-add-segment-steps') == 2
+
+
 def test_remix_step() -> None:
 	args_1 =\
 	{
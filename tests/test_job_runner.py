@@ -2,9 +2,10 @@ import subprocess
 
 import pytest
 
+from facefusion import state_manager
 from facefusion.download import conditional_download
 from facefusion.filesystem import copy_file
-from facefusion.jobs.job_manager import add_step, clear_jobs, create_job, init_jobs, move_job_file, submit_job, submit_jobs
+from facefusion.jobs.job_manager import add_step, clear_jobs, create_job, get_steps, init_jobs, move_job_file, submit_job, submit_jobs
 from facefusion.jobs.job_runner import collect_output_set, finalize_steps, retry_job, retry_jobs, run_job, run_jobs, run_steps
 from facefusion.types import Args
 from .helper import get_test_example_file, get_test_examples_directory, get_test_jobs_directory, get_test_output_file, is_test_output_file, prepare_test_output_directory
@@ -124,6 +125,38 @@ def test_retry_job() -> None:
 	assert retry_job('job-test-retry-job', process_step) is True
 
 
+def test_retry_job_with_completed_steps() -> None:
+	args_1 =\
+	{
+		'source_path': get_test_example_file('source.jpg'),
+		'target_path': get_test_example_file('target-240p.mp4'),
+		'output_path': get_test_output_file('output-1.mp4')
+	}
+	step_indices = []
+
+	def fail_step(job_id : str, step_index : int, step_args : Args) -> bool:
+		step_indices.append(step_index)
+		return step_index == 0 and process_step(job_id, step_index, step_args)
+
+	def count_step(job_id : str, step_index : int, step_args : Args) -> bool:
+		step_indices.append(step_index)
+		return process_step(job_id, step_index, step_args)
+
+	create_job('job-test-retry-job-with-completed-steps')
+	add_step('job-test-retry-job-with-completed-steps', args_1)
+	add_step('job-test-retry-job-with-completed-steps', args_1)
+	submit_job('job-test-retry-job-with-completed-steps')
+
+	assert run_job('job-test-retry-job-with-completed-steps', fail_step) is False
+	assert get_steps('job-test-retry-job-with-completed-steps')[0].get('status') == 'completed'
+
+	step_indices.clear()
+
+	assert retry_job('job-test-retry-job-with-completed-steps', count_step) is True
+	assert step_indices == [ 1 ]
+	assert is_test_output_file('output-1.mp4') is True
+
+
 def test_retry_jobs() -> None:
 	args_1 =\
 	{
@@ -193,6 +226,36 @@ def test_run_steps() -> None:
 	assert run_steps('job-test-run-steps', process_step) is True
 
 
+def test_run_steps_with_step_worker_count() -> None:
+	args_1 =\
+	{
+		'source_path': get_test_example_file('source.jpg'),
+		'target_path': get_test_example_file('target-240p.mp4'),
+		'output_path': get_test_output_file('output-1.mp4')
+	}
+	args_2 =\
+	{
+		'source_path': get_test_example_file('source.jpg'),
+		'target_path': get_test_example_file('target-240p.jpg'),
+		'output_path': get_test_output_file('output-2.jpg')
+	}
+
+	state_manager.init_item('log_level', 'info')
+	state_manager.init_item('step_worker_count', 2)
+	create_job('job-test-run-steps-with-step-worker-count')
+	add_step('job-test-run-steps-with-step-worker-count', args_1)
+	add_step('job-test-run-steps-with-step-worker-count', args_1)
+	add_step('job-test-run-steps-with-step-worker-count', args_2)
+
+	assert run_steps('job-test-run-steps-with-step-worker-count', process_step) is True
+	assert [ step.get('status') for step in get_steps('job-test-run-steps-with-step-worker-count') ] == [ 'completed', 'completed', 'completed' ]
+	assert is_test_output_file('output-1-job-test-run-steps-with-step-worker-count-0.mp4') is True
+	assert is_test_output_file('output-1-job-test-run-steps-with-step-worker-count-1.mp4') is True
+	assert is_test_output_file('output-2-job-test-run-steps-with-step-worker-count-2.jpg') is True
+
+	state_manager.init_item('step_worker_count', 1)
+
+
 def test_finalize_steps() -> None:
 	args_1 =\
 	{
@@ -1,4 +1,7 @@
-from facefusion.process_manager import end, is_pending, is_processing, is_stopping, set_process_state, start, stop
+from typing import List
+
+from facefusion.process_manager import end, get_frame_number, is_pending, is_processing, is_stopping, manage, set_process_state, start, stop
+from facefusion.types import QueuePayload
 
 
 def test_start() -> None:
@@ -20,3 +23,23 @@ def test_end() -> None:
 	end()
 
 	assert is_pending()
+
+
+def test_manage() -> None:
+	set_process_state('processing')
+	queue_payloads : List[QueuePayload] =\
+	[
+		{
+			'frame_number': 0,
+			'frame_path': '00000000.png'
+		},
+		{
+			'frame_number': 1,
+			'frame_path': '00000001.png'
+		}
+	]
+
+	for queue_payload in manage(queue_payloads):
+		assert get_frame_number() == queue_payload.get('frame_number')
+
+	assert get_frame_number() is None
@@ -0,0 +1,145 @@
+import os
+import tempfile
+from typing import List
+
+import numpy
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.face_track import clear_face_track, get_face_track
+from facefusion.frame_manifest import clear_frame_manifest, create_frame_manifest, init_frame_manifest, read_frame_manifest_stage, remove_frame_manifest, start_frame_manifest_stage
+from facefusion.process_pool import create_shared_frame, destroy_shared_frame, multi_process_pool_frames, read_shared_frame, update_shared_frame
+from facefusion.processors.core import get_process_chain
+from facefusion.profiler import clear_profile, get_profile, init_profile, profile_span
+from facefusion.temp_helper import create_temp_directory
+from facefusion.types import QueuePayload, UpdateProgress
+
+
+def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in process_manager.manage(queue_payloads):
+		with open(queue_payload.get('frame_path'), 'w') as frame_file:
+			frame_file.write(str(os.getpid()))
+		update_progress(1)
+
+
+@profile_span('write')
+def write_frame(frame_path : str) -> None:
+	with open(frame_path, 'w') as frame_file:
+		frame_file.write(str(os.getpid()))
+
+
+def process_profile_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in process_manager.manage(queue_payloads):
+		write_frame(queue_payload.get('frame_path'))
+		update_progress(1)
+
+
+def process_track_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in process_manager.manage(queue_payloads):
+		get_face_track().get('faces')[queue_payload.get('frame_number')] = []
+		update_progress(1)
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('log_level', 'error')
+
+
+def test_shared_frame() -> None:
+	vision_frame = numpy.random.randint(0, 255, (32, 64, 3), dtype = numpy.uint8)
+	shared_frame = create_shared_frame(vision_frame)
+
+	assert numpy.array_equal(read_shared_frame(shared_frame), vision_frame)
+	assert update_shared_frame(shared_frame, vision_frame[::-1]) == shared_frame
+	assert numpy.array_equal(read_shared_frame(shared_frame), vision_frame[::-1])
+
+	output_shared_frame = update_shared_frame(shared_frame, numpy.zeros((64, 128, 3), dtype = numpy.uint8))
+
+	assert output_shared_frame.get('name') != shared_frame.get('name')
+	assert read_shared_frame(output_shared_frame).shape == (64, 128, 3)
+
+	destroy_shared_frame(output_shared_frame)
+	destroy_shared_frame(shared_frame)
+
+
+def test_multi_process_pool_frames() -> None:
+	frame_paths = [ os.path.join(tempfile.mkdtemp(), str(frame_number) + '.txt') for frame_number in range(8) ]
+	queue_payloads_list : List[List[QueuePayload]] =\
+	[
+		[ { 'frame_number': frame_number, 'frame_path': frame_paths[frame_number] } for frame_number in range(0, 4) ],
+		[ { 'frame_number': frame_number, 'frame_path': frame_paths[frame_number] } for frame_number in range(4, 8) ]
+	]
+	progress_total : List[int] = []
+
+	process_manager.start()
+	multi_process_pool_frames([], queue_payloads_list, process_frames, progress_total.append)
+	process_manager.end()
+
+	assert sum(progress_total) == 8
+	for frame_path in frame_paths:
+		with open(frame_path) as frame_file:
+			assert frame_file.read() != str(os.getpid())
+
+
+def test_multi_process_pool_frames_with_profile() -> None:
+	frame_paths = [ os.path.join(tempfile.mkdtemp(), str(frame_number) + '.txt') for frame_number in range(4) ]
+	queue_payloads_list : List[List[QueuePayload]] =\
+	[
+		[ { 'frame_number': frame_number, 'frame_path': frame_paths[frame_number] } for frame_number in range(0, 2) ],
+		[ { 'frame_number': frame_number, 'frame_path': frame_paths[frame_number] } for frame_number in range(2, 4) ]
+	]
+	progress_total : List[int] = []
+
+	init_profile(True)
+	process_manager.start()
+	multi_process_pool_frames([], queue_payloads_list, process_profile_frames, progress_total.append)
+	process_manager.end()
+	profile_spans = get_profile().get('spans')
+
+	assert len(profile_spans) == 4
+	assert sorted(profile_span.get('args').get('frame_number') for profile_span in profile_spans) == [ 0, 1, 2, 3 ]
+	assert os.getpid() not in [ profile_span.get('pid') for profile_span in profile_spans ]
+
+	clear_profile()
+
+
+def test_multi_process_pool_frames_with_manifest() -> None:
+	queue_payloads_list : List[List[QueuePayload]] =\
+	[
+		[ { 'frame_number': frame_number, 'frame_path': str(frame_number) + '.png' } for frame_number in range(0, 4) ],
+		[ { 'frame_number': frame_number, 'frame_path': str(frame_number) + '.png' } for frame_number in range(4, 8) ]
+	]
+	progress_total : List[int] = []
+
+	state_manager.init_item('temp_path', tempfile.gettempdir())
+	create_temp_directory('test-process-pool.mp4')
+	init_frame_manifest('test-process-pool.mp4', 'test')
+	remove_frame_manifest()
+	create_frame_manifest()
+	start_frame_manifest_stage('face_swapper')
+	process_manager.start()
+	multi_process_pool_frames([], queue_payloads_list, process_track_frames, progress_total.append)
+	process_manager.end()
+
+	assert read_frame_manifest_stage('face_swapper') == set(range(8))
+	assert sorted(get_face_track().get('faces').keys()) == list(range(8))
+
+	remove_frame_manifest()
+	clear_frame_manifest()
+	clear_face_track()
+
+
+def test_get_process_chain(monkeypatch : pytest.MonkeyPatch) -> None:
+	source_paths = [ 'source.jpg' ]
+	source_faces = []
+
+	def get_source_face(source_paths : List[str]) -> None:
+		source_faces.append(source_paths)
+
+	monkeypatch.setattr('facefusion.processors.core.get_source_face', get_source_face)
+	state_manager.init_item('processors', [])
+	state_manager.init_item('face_selector_mode', 'many')
+
+	assert get_process_chain(source_paths) is get_process_chain(source_paths)
+	assert source_faces == [ source_paths ]
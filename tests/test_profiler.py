@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+from facefusion import process_manager
+from facefusion.json import read_json
+from facefusion.profiler import clear_profile, compose_profile, get_profile, init_profile, profile_span, save_profile
+
+
+@profile_span('detect')
+def detect(value : int) -> int:
+	return value * 2
+
+
+def test_profile_span() -> None:
+	init_profile(False)
+
+	assert detect(1) == 2
+	assert get_profile().get('spans') == []
+
+	init_profile(True)
+	process_manager.set_frame_number(3)
+
+	assert detect(2) == 4
+	assert detect(3) == 6
+
+	process_manager.set_frame_number(None)
+	profile_spans = get_profile().get('spans')
+
+	assert len(profile_spans) == 2
+	assert profile_spans[0].get('name') == 'detect'
+	assert profile_spans[0].get('ph') == 'X'
+	assert profile_spans[0].get('args').get('frame_number') == 3
+
+	clear_profile()
+
+
+def test_compose_profile() -> None:
+	init_profile(True)
+	detect(1)
+	detect(2)
+	profile_headers, profile_contents = compose_profile()
+
+	assert profile_headers[0] == 'span'
+	assert profile_contents[0][0] == 'detect'
+	assert profile_contents[0][1] == 2
+
+	clear_profile()
+
+
+def test_save_profile() -> None:
+	profile_path = os.path.join(tempfile.gettempdir(), 'test-save-profile.json')
+	init_profile(True)
+	detect(1)
+
+	assert save_profile(profile_path) is True
+	assert read_json(profile_path).get('traceEvents')[0].get('name') == 'detect'
+
+	clear_profile()
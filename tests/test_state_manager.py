@@ -3,7 +3,7 @@ from typing import Union
 import pytest
 
 from facefusion.processors.types import ProcessorState
-from facefusion.state_manager import STATE_SET, get_item, init_item, set_item
+from facefusion.state_manager import STATE_SET, get_item, get_run_config, init_item, pin_run_config, set_item
 from facefusion.types import AppContext, State
 
 
@@ -33,3 +33,23 @@ def test_get_item_and_set_item() -> None:
 
 	assert get_item('video_memory_strategy') == 'tolerant'
 	assert get_state('ui').get('video_memory_strategy') is None
+
+
+def test_pin_run_config() -> None:
+	init_item('video_memory_strategy', 'tolerant')
+
+	with pin_run_config() as run_config:
+		assert run_config.get('video_memory_strategy') == 'tolerant'
+		assert get_item('face_detector_model') is None
+
+		init_item('video_memory_strategy', 'strict')
+
+		assert get_item('video_memory_strategy') == 'tolerant'
+
+		set_item('video_memory_strategy', 'strict')
+
+		assert run_config.get('video_memory_strategy') == 'strict'
+		assert get_item('video_memory_strategy') == 'strict'
+
+	assert get_run_config() is None
+	assert get_item('video_memory_strategy') == 'strict'
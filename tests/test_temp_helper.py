@@ -32,3 +32,18 @@ def test_get_temp_directory_path() -> None:
 def test_get_temp_frames_pattern() -> None:
 	temp_directory = tempfile.gettempdir()
 	assert get_temp_frames_pattern(get_test_example_file('target-240p.mp4'), '%04d') == os.path.join(temp_directory, 'facefusion', 'target-240p', '%04d.png')
+
+
+def test_get_temp_directory_path_with_trim_frame() -> None:
+	temp_directory = tempfile.gettempdir()
+	state_manager.init_item('trim_frame_start', 0)
+	state_manager.init_item('trim_frame_end', 100)
+
+	assert get_temp_directory_path(get_test_example_file('target-240p.mp4')) == os.path.join(temp_directory, 'facefusion', 'target-240p-0-100')
+
+	state_manager.init_item('trim_frame_end', None)
+
+	assert get_temp_directory_path(get_test_example_file('target-240p.mp4')) == os.path.join(temp_directory, 'facefusion', 'target-240p-0-None')
+
+	state_manager.init_item('trim_frame_start', None)
+	state_manager.init_item('trim_frame_end', None)
@@ -3,6 +3,7 @@ import subprocess
 import pytest
 
 from facefusion.download import conditional_download
+from facefusion.filesystem import is_file
 from facefusion.vision import calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, match_frame_color, normalize_resolution, pack_resolution, predict_video_frame_total, read_image, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
 from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
@@ -44,6 +45,7 @@ def test_write_image() -> None:
 
 	assert write_image(get_test_output_file('target-240p.jpg'), vision_frame) is True
 	assert write_image(get_test_output_file('目标-240p.webp'), vision_frame) is True
+	assert is_file(get_test_output_file('target-240p.jpg') + '.tmp') is False
 
 
 def test_detect_image_resolution() -> None: